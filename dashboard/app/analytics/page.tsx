@@ -1,46 +1,27 @@
 'use client';
 
-import { useState, useEffect } from 'react';
-import { BarChart3, TrendingUp, Target, Award } from 'lucide-react';
+import { useEffect, useState } from 'react';
+import { BarChart3, TrendingUp, Target, Award, MapPin, Swords } from 'lucide-react';
 import Image from 'next/image';
-
-interface Branch {
-  bank_name: string;
-  lat: number;
-  long: number;
-}
+import { loadAnalytics, type Analytics } from '@/lib/analytics';
 
 export default function AnalyticsPage() {
-  const [branches, setBranches] = useState<Branch[]>([]);
+  const [data, setData] = useState<Analytics | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetch('/branches.json')
-      .then((res) => res.json())
-      .then((data) => {
-        setBranches(data);
+    loadAnalytics()
+      .then((analytics) => {
+        setData(analytics);
         setLoading(false);
       })
       .catch((err) => {
-        console.error('Error loading branches:', err);
+        console.error('Error loading analytics:', err);
         setLoading(false);
       });
   }, []);
 
-  // Calculate statistics
-  const bankCounts: { [key: string]: number } = {};
-  branches.forEach((branch) => {
-    bankCounts[branch.bank_name] = (bankCounts[branch.bank_name] || 0) + 1;
-  });
-  const sortedBanks = Object.entries(bankCounts).sort((a, b) => b[1] - a[1]);
-  const top5Banks = sortedBanks.slice(0, 5);
-
-  const totalBranches = branches.length;
-  const bobBranches = branches.filter((b) => b.bank_name === 'Bank of Baku').length;
-  const bobRank = sortedBanks.findIndex(([bank]) => bank === 'Bank of Baku') + 1;
-  const marketShare = totalBranches > 0 ? ((bobBranches / totalBranches) * 100).toFixed(1) : '0';
-
-  if (loading) {
+  if (loading || !data || data.banks.length === 0) {
     return (
       <div className="min-h-screen flex items-center justify-center">
         <div className="text-center">
@@ -53,6 +34,20 @@ export default function AnalyticsPage() {
     );
   }
 
+  // Everything below is precomputed by the analysis pipeline
+  const sortedBanks = data.banks;
+  const top5Banks = sortedBanks.slice(0, 5);
+
+  const focus = data.focus;
+  const bobBranches = focus.count;
+  const bobRank = focus.rank;
+  const marketShare = focus.share.toFixed(1);
+  const targetStyles = [
+    { box: 'bg-blue-50 border-blue-100', text: 'text-blue-600' },
+    { box: 'bg-purple-50 border-purple-100', text: 'text-purple-600' },
+    { box: 'bg-green-50 border-green-100', text: 'text-green-600' },
+  ];
+
   return (
     <div className="min-h-screen bg-gray-50">
       {/* Page Header */}
@@ -81,8 +76,8 @@ export default function AnalyticsPage() {
 
           <div className="glass rounded-2xl p-8 border border-white/30">
             <div className="space-y-4">
-              {top5Banks.map(([bank, count], index) => {
-                const percentage = ((count / totalBranches) * 100).toFixed(1);
+              {top5Banks.map(({ name: bank, count, share }, index) => {
+                const percentage = share.toFixed(1);
                 const isBankOfBaku = bank === 'Bank of Baku';
 
                 return (
@@ -190,24 +185,17 @@ export default function AnalyticsPage() {
               <div>
                 <h3 className="text-xl font-bold text-gray-900 mb-4">Potential Expansion</h3>
                 <div className="space-y-3">
-                  <div className="p-4 bg-blue-50 rounded-xl border border-blue-100">
-                    <p className="text-sm text-gray-600 mb-1">To reach 5% market share</p>
-                    <p className="text-2xl font-extrabold text-blue-600">
-                      +{Math.ceil((totalBranches * 0.05) - bobBranches)} branches needed
-                    </p>
-                  </div>
-                  <div className="p-4 bg-purple-50 rounded-xl border border-purple-100">
-                    <p className="text-sm text-gray-600 mb-1">To reach 10% market share</p>
-                    <p className="text-2xl font-extrabold text-purple-600">
-                      +{Math.ceil((totalBranches * 0.10) - bobBranches)} branches needed
-                    </p>
-                  </div>
-                  <div className="p-4 bg-green-50 rounded-xl border border-green-100">
-                    <p className="text-sm text-gray-600 mb-1">To reach Top 5 position</p>
-                    <p className="text-2xl font-extrabold text-green-600">
-                      +{Math.max(0, top5Banks[4][1] - bobBranches + 1)} branches needed
-                    </p>
-                  </div>
+                  {focus.targets.map((target, index) => {
+                    const style = targetStyles[index % targetStyles.length];
+                    return (
+                      <div key={target.label} className={`p-4 ${style.box} rounded-xl border`}>
+                        <p className="text-sm text-gray-600 mb-1">To reach {target.label}</p>
+                        <p className={`text-2xl font-extrabold ${style.text}`}>
+                          +{target.needed} branches needed
+                        </p>
+                      </div>
+                    );
+                  })}
                 </div>
               </div>
 
@@ -216,18 +204,18 @@ export default function AnalyticsPage() {
                 <div className="space-y-3">
                   <div className="p-4 bg-orange-50 rounded-xl border border-orange-100">
                     <p className="text-sm text-gray-600 mb-1">Market Leader</p>
-                    <p className="text-lg font-bold text-orange-600">{sortedBanks[0][0]}</p>
-                    <p className="text-sm text-gray-600">{sortedBanks[0][1]} branches • {((sortedBanks[0][1] / totalBranches) * 100).toFixed(1)}%</p>
+                    <p className="text-lg font-bold text-orange-600">{sortedBanks[0].name}</p>
+                    <p className="text-sm text-gray-600">{sortedBanks[0].count} branches • {sortedBanks[0].share.toFixed(1)}%</p>
                   </div>
                   <div className="p-4 bg-pink-50 rounded-xl border border-pink-100">
                     <p className="text-sm text-gray-600 mb-1">Average per Bank</p>
-                    <p className="text-lg font-bold text-pink-600">{Math.round(totalBranches / sortedBanks.length)} branches</p>
+                    <p className="text-lg font-bold text-pink-600">{Math.round(data.averagePerBank)} branches</p>
                     <p className="text-sm text-gray-600">Across {sortedBanks.length} banks</p>
                   </div>
                   <div className="p-4 bg-cyan-50 rounded-xl border border-cyan-100">
                     <p className="text-sm text-gray-600 mb-1">Top 3 Market Control</p>
                     <p className="text-lg font-bold text-cyan-600">
-                      {((sortedBanks.slice(0, 3).reduce((sum, [, count]) => sum + count, 0) / totalBranches) * 100).toFixed(1)}%
+                      {data.concentration.top3.toFixed(1)}%
                     </p>
                     <p className="text-sm text-gray-600">Of total market</p>
                   </div>
@@ -237,6 +225,108 @@ export default function AnalyticsPage() {
           </div>
         </section>
 
+        {/* Regional Zones */}
+        <section className="mb-12">
+          <div className="flex items-center space-x-3 mb-6">
+            <div className="p-3 bg-gradient-to-br from-blue-500 to-cyan-500 rounded-xl shadow-lg">
+              <MapPin className="w-6 h-6 text-white" strokeWidth={2.5} />
+            </div>
+            <h2 className="text-3xl font-extrabold bg-gradient-to-r from-blue-600 to-cyan-600 bg-clip-text text-transparent">
+              Regional Market Position
+            </h2>
+          </div>
+
+          <div className="glass rounded-2xl p-8 border border-white/30 overflow-x-auto">
+            <table className="w-full text-sm">
+              <thead>
+                <tr className="text-left text-gray-600 border-b border-gray-200">
+                  <th className="py-2 pr-4 font-semibold">Zone</th>
+                  <th className="py-2 pr-4 font-semibold text-right">Branches</th>
+                  <th className="py-2 pr-4 font-semibold text-right">{focus.name}</th>
+                  <th className="py-2 pr-4 font-semibold text-right">Share</th>
+                  <th className="py-2 pr-4 font-semibold text-right">Rank</th>
+                  <th className="py-2 font-semibold">Leader</th>
+                </tr>
+              </thead>
+              <tbody>
+                {data.zones.map((zone) => (
+                  <tr key={zone.zone} className="border-b border-gray-100 last:border-0">
+                    <td className="py-3 pr-4 font-bold text-gray-900">{zone.zone}</td>
+                    <td className="py-3 pr-4 text-right text-gray-700">{zone.total}</td>
+                    <td className="py-3 pr-4 text-right font-bold text-red-600">{zone.focusCount}</td>
+                    <td className="py-3 pr-4 text-right text-gray-700">{zone.focusShare.toFixed(1)}%</td>
+                    <td className="py-3 pr-4 text-right text-gray-700">{zone.focusRank ? `#${zone.focusRank}` : 'N/A'}</td>
+                    <td className="py-3 text-gray-700">{zone.leader} ({zone.leaderCount})</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </section>
+
+        {/* Competitive Landscape */}
+        <section className="mb-12">
+          <div className="flex items-center space-x-3 mb-6">
+            <div className="p-3 bg-gradient-to-br from-orange-500 to-red-500 rounded-xl shadow-lg">
+              <Swords className="w-6 h-6 text-white" strokeWidth={2.5} />
+            </div>
+            <h2 className="text-3xl font-extrabold bg-gradient-to-r from-orange-600 to-red-600 bg-clip-text text-transparent">
+              Competitive Landscape
+            </h2>
+          </div>
+
+          <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
+            <div className="glass rounded-2xl p-6 border border-white/30">
+              <h3 className="text-lg font-bold text-gray-900 mb-4">Nearest Competitors</h3>
+              <div className="space-y-2">
+                {focus.nearestCompetitors.map((competitor) => (
+                  <div key={competitor.name} className="flex items-center justify-between">
+                    <span className="text-sm text-gray-700">{competitor.name}</span>
+                    <span className="text-sm font-bold text-orange-600">{competitor.count} branches</span>
+                  </div>
+                ))}
+              </div>
+              {focus.competitorDistanceKm.median !== null && (
+                <p className="text-xs text-gray-500 mt-4">
+                  Median distance to the nearest competitor: {focus.competitorDistanceKm.median.toFixed(2)} km
+                </p>
+              )}
+            </div>
+
+            <div className="glass rounded-2xl p-6 border border-white/30">
+              <h3 className="text-lg font-bold text-gray-900 mb-4">Competitive Intensity</h3>
+              <p className="text-4xl font-extrabold bg-gradient-to-r from-orange-600 to-red-600 bg-clip-text text-transparent mb-2">
+                {focus.avgIntensity.toFixed(1)}
+              </p>
+              <p className="text-sm text-gray-600 mb-4">Branches within ~10 km of an average {focus.name} branch</p>
+              <div className="space-y-2">
+                {[...sortedBanks].sort((a, b) => b.avgIntensity - a.avgIntensity).slice(0, 3).map((bank) => (
+                  <div key={bank.name} className="flex items-center justify-between">
+                    <span className="text-sm text-gray-700">{bank.name}</span>
+                    <span className="text-sm font-bold text-gray-900">{bank.avgIntensity.toFixed(1)}</span>
+                  </div>
+                ))}
+              </div>
+            </div>
+
+            <div className="glass rounded-2xl p-6 border border-white/30">
+              <h3 className="text-lg font-bold text-gray-900 mb-4">Coverage Gaps</h3>
+              <p className="text-4xl font-extrabold bg-gradient-to-r from-green-600 to-emerald-600 bg-clip-text text-transparent mb-2">
+                {data.gaps.count}
+              </p>
+              <p className="text-sm text-gray-600 mb-4">Competitor branches over 30 km from the nearest {focus.name} branch</p>
+              <div className="space-y-2">
+                {data.gaps.top.slice(0, 3).map((gap) => (
+                  <div key={`${gap.lat},${gap.long}`} className="flex items-center justify-between">
+                    <span className="text-sm text-gray-700">{gap.bank} ({gap.lat.toFixed(2)}, {gap.long.toFixed(2)})</span>
+                    <span className="text-sm font-bold text-green-600">{gap.distanceKm.toFixed(0)} km</span>
+                  </div>
+                ))}
+              </div>
+            </div>
+          </div>
+        </section>
+
         {/* Charts Section - Link to Python generated charts */}
         <section>
           <div className="flex items-center space-x-3 mb-6">
@@ -33,6 +33,7 @@ export const viewport: Viewport = {
 
 import Navigation from '@/components/Navigation';
 import InstallPWA from '@/components/InstallPWA';
+import BranchDataProvider from '@/components/BranchDataProvider';
 
 export default function RootLayout({
   children,
@@ -49,9 +50,11 @@ export default function RootLayout({
         <meta name="apple-mobile-web-app-title" content="Bank Network AZ" />
       </head>
       <body className="antialiased">
-        <Navigation />
-        {children}
-        <InstallPWA />
+        <BranchDataProvider>
+          <Navigation />
+          {children}
+          <InstallPWA />
+        </BranchDataProvider>
       </body>
     </html>
   );
@@ -1,47 +1,21 @@
 'use client';
 
-import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import StatsCard from '@/components/StatsCard';
 import FunFacts from '@/components/FunFacts';
 import { Building2, MapPin, TrendingUp, Layers, ArrowRight, Map, BarChart3 } from 'lucide-react';
-
-interface Branch {
-  bank_name: string;
-  lat: number;
-  long: number;
-}
+import { useBranchData } from '@/components/BranchDataProvider';
 
 export default function Home() {
-  const [branches, setBranches] = useState<Branch[]>([]);
-  const [loading, setLoading] = useState(true);
-
-  useEffect(() => {
-    fetch('/branches.json')
-      .then((res) => res.json())
-      .then((data) => {
-        setBranches(data);
-        setLoading(false);
-      })
-      .catch((err) => {
-        console.error('Error loading branches:', err);
-        setLoading(false);
-      });
-  }, []);
-
-  // Calculate statistics
-  const totalBranches = branches.length;
-  const totalBanks = new Set(branches.map((b) => b.bank_name)).size;
-  const bobBranches = branches.filter((b) => b.bank_name === 'Bank of Baku').length;
-  const marketShare = totalBranches > 0 ? ((bobBranches / totalBranches) * 100).toFixed(1) : '0';
-
-  // Get bank ranking
-  const bankCounts: { [key: string]: number } = {};
-  branches.forEach((branch) => {
-    bankCounts[branch.bank_name] = (bankCounts[branch.bank_name] || 0) + 1;
-  });
-  const sortedBanks = Object.entries(bankCounts).sort((a, b) => b[1] - a[1]);
-  const bobRank = sortedBanks.findIndex(([bank]) => bank === 'Bank of Baku') + 1;
+  const { data, loading } = useBranchData();
+
+  // Statistics come precomputed with the shared dataset
+  const totalBranches = data?.totalBranches ?? 0;
+  const totalBanks = data?.banks.length ?? 0;
+  const bob = data?.bankStats.get('Bank of Baku');
+  const bobBranches = bob?.count ?? 0;
+  const bobRank = bob?.rank ?? 0;
+  const marketShare = (bob?.share ?? 0).toFixed(1);
 
   if (loading) {
     return (
@@ -1,13 +1,8 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useMemo, useState } from 'react';
 import { Building2, TrendingUp, Search } from 'lucide-react';
-
-interface Branch {
-  bank_name: string;
-  lat: number;
-  long: number;
-}
+import { useBranchData } from '@/components/BranchDataProvider';
 
 interface BankSelectorProps {
   selectedBank: string | null;
@@ -15,22 +10,14 @@ interface BankSelectorProps {
 }
 
 export default function BankSelector({ selectedBank, onSelectBank }: BankSelectorProps) {
-  const [bankCounts, setBankCounts] = useState<{ [key: string]: number }>({});
-  const [loading, setLoading] = useState(true);
+  const { data, loading } = useBranchData();
   const [searchTerm, setSearchTerm] = useState('');
 
-  useEffect(() => {
-    fetch('/branches.json')
-      .then((res) => res.json())
-      .then((data: Branch[]) => {
-        const counts: { [key: string]: number } = {};
-        data.forEach((branch) => {
-          counts[branch.bank_name] = (counts[branch.bank_name] || 0) + 1;
-        });
-        setBankCounts(counts);
-        setLoading(false);
-      });
-  }, []);
+  // Banks arrive sorted by branch count (descending) with their ranks
+  const filteredBanks = useMemo(() => {
+    const term = searchTerm.toLowerCase();
+    return (data?.banks ?? []).filter((bank) => bank.name.toLowerCase().includes(term));
+  }, [data, searchTerm]);
 
   if (loading) {
     return (
@@ -45,15 +32,7 @@ export default function BankSelector({ selectedBank, onSelectBank }: BankSelecto
     );
   }
 
-  // Sort banks by branch count (descending)
-  const sortedBanks = Object.entries(bankCounts).sort((a, b) => b[1] - a[1]);
-
-  // Filter banks based on search
-  const filteredBanks = sortedBanks.filter(([bank]) =>
-    bank.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
-  const totalBranches = Object.values(bankCounts).reduce((a, b) => a + b, 0);
+  const totalBranches = data?.totalBranches ?? 0;
 
   return (
     <div className="glass rounded-2xl shadow-xl p-6 border border-white/30 animate-fadeIn sticky top-4">
@@ -111,10 +90,9 @@ export default function BankSelector({ selectedBank, onSelectBank }: BankSelecto
         </button>
 
         {/* Individual Banks */}
-        {filteredBanks.map(([bank, count], index) => {
+        {filteredBanks.map(({ name: bank, count, share, rank }, index) => {
           const isSelected = selectedBank === bank;
           const isBankOfBaku = bank === 'Bank of Baku';
-          const rank = sortedBanks.findIndex(([b]) => b === bank) + 1;
 
           return (
             <button
@@ -155,7 +133,7 @@ export default function BankSelector({ selectedBank, onSelectBank }: BankSelecto
                 <span className={`text-xs font-semibold ${
                   isSelected ? 'text-white/90' : 'text-gray-600'
                 }`}>
-                  {((count / totalBranches) * 100).toFixed(1)}%
+                  {share.toFixed(1)}%
                 </span>
               </div>
             </button>
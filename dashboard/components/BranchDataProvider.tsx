@@ -0,0 +1,56 @@
+'use client';
+
+import { createContext, useCallback, useContext, useEffect, useRef, useState } from 'react';
+import { loadDataset, type BranchDataset } from '@/lib/branches';
+
+interface BranchDataState {
+  data: BranchDataset | null;
+  loading: boolean;
+  error: Error | null;
+}
+
+interface BranchDataContextValue {
+  state: BranchDataState;
+  request: () => void;
+}
+
+const BranchDataContext = createContext<BranchDataContextValue | null>(null);
+
+// Shares one branch dataset with every page below the root layout. Nothing is
+// fetched until a page calls useBranchData(), so pages that only need the
+// precomputed analytics never download the shards.
+export default function BranchDataProvider({ children }: { children: React.ReactNode }) {
+  const [state, setState] = useState<BranchDataState>({ data: null, loading: true, error: null });
+  const requested = useRef(false);
+
+  const request = useCallback(() => {
+    if (requested.current) return;
+    requested.current = true;
+
+    loadDataset()
+      .then((data) => {
+        setState({ data, loading: false, error: null });
+      })
+      .catch((err) => {
+        console.error('Error loading branches:', err);
+        requested.current = false;
+        setState({ data: null, loading: false, error: err });
+      });
+  }, []);
+
+  return <BranchDataContext.Provider value={{ state, request }}>{children}</BranchDataContext.Provider>;
+}
+
+export function useBranchData(): BranchDataState {
+  const context = useContext(BranchDataContext);
+  if (!context) {
+    throw new Error('useBranchData must be used inside BranchDataProvider');
+  }
+
+  const { state, request } = context;
+  useEffect(() => {
+    request();
+  }, [request]);
+
+  return state;
+}
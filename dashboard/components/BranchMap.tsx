@@ -1,14 +1,10 @@
 'use client';
 
-import { MapContainer, TileLayer, Marker, Popup } from 'react-leaflet';
+import { MapContainer, TileLayer, useMap, useMapEvents } from 'react-leaflet';
 import L from 'leaflet';
-import { useEffect, useState } from 'react';
-
-interface Branch {
-  bank_name: string;
-  lat: number;
-  long: number;
-}
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { loadTile, loadTileIndex, visibleTiles, type TileIndex } from '@/lib/tiles';
+import { MarkerCanvasLayer, type CanvasMarker } from '@/lib/markerCanvas';
 
 interface BranchMapProps {
   selectedBank?: string | null;
@@ -36,38 +32,115 @@ const bankColors: { [key: string]: string } = {
   'default': '#78909C'              // Grey for any other bank
 };
 
-// Create custom icons for different banks
-const createIcon = (color: string, isHighlighted: boolean = false) => {
-  const size = isHighlighted ? 35 : 25;
-  return L.divIcon({
-    className: 'custom-marker',
-    html: `<div style="
-      background-color: ${color};
-      width: ${size}px;
-      height: ${size}px;
-      border-radius: 50%;
-      border: ${isHighlighted ? '4px' : '2px'} solid white;
-      box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-      ${isHighlighted ? 'transform: scale(1.1); z-index: 1000;' : ''}
-    "></div>`,
-    iconSize: [size, size],
-    iconAnchor: [size / 2, size / 2],
-  });
-};
+const escapeHtml = (text: string) =>
+  text.replace(/[&<>"']/g, (c) => `&#${c.charCodeAt(0)};`);
+
+interface TiledBranchesProps {
+  index: TileIndex;
+  selectedBank?: string | null;
+}
+
+// Loads only the tiles covering the current view and draws their contents on one canvas
+function TiledBranches({ index, selectedBank }: TiledBranchesProps) {
+  const map = useMap();
+  const [layer, setLayer] = useState<MarkerCanvasLayer | null>(null);
+  const requestId = useRef(0);
+
+  useEffect(() => {
+    const canvasLayer = new MarkerCanvasLayer({
+      onClick: (marker) => {
+        if (marker.count > 1) {
+          map.flyTo([marker.lat, marker.long], Math.min(map.getZoom() + 2, map.getMaxZoom()));
+          return;
+        }
+        L.popup()
+          .setLatLng([marker.lat, marker.long])
+          .setContent(
+            `<div class="font-semibold text-sm">${escapeHtml(marker.bankName ?? '')}</div>` +
+            `<div class="text-xs text-gray-600">${marker.lat.toFixed(4)}, ${marker.long.toFixed(4)}</div>`
+          )
+          .openOn(map);
+      },
+    });
+    canvasLayer.addTo(map);
+    setLayer(canvasLayer);
+    return () => {
+      canvasLayer.remove();
+    };
+  }, [map]);
+
+  const update = useCallback(() => {
+    if (!layer) return;
+
+    const bounds = map.getBounds();
+    const coords = visibleTiles(
+      index,
+      map.getZoom(),
+      bounds.getSouth(),
+      bounds.getWest(),
+      bounds.getNorth(),
+      bounds.getEast()
+    );
+    const bankCode = selectedBank && selectedBank !== 'all' ? index.banks.indexOf(selectedBank) : null;
+    const id = ++requestId.current;
+
+    Promise.all(coords.map((coord) => loadTile(index, coord)))
+      .then((tiles) => {
+        // A newer pan/zoom superseded this request
+        if (id !== requestId.current) return;
+
+        const markers: CanvasMarker[] = [];
+        const push = (lat: number, long: number, count: number, bankName: string | null) => {
+          markers.push({
+            lat,
+            long,
+            count,
+            bankName,
+            color: bankName ? bankColors[bankName] || bankColors['default'] : '#6D28D9',
+            // Make Bank of Baku and selected banks larger
+            highlighted: count === 1 && (bankName === 'Bank of Baku' || selectedBank === bankName),
+          });
+        };
+
+        for (const tile of tiles) {
+          if (bankCode === null) {
+            for (const [lat, long, count, bank] of tile.all) {
+              push(lat, long, count, bank >= 0 ? index.banks[bank] : null);
+            }
+          } else {
+            for (const [lat, long, count] of tile.banks[String(bankCode)] || []) {
+              push(lat, long, count, selectedBank ?? null);
+            }
+          }
+        }
+        layer.setMarkers(markers);
+      })
+      .catch((err) => {
+        console.error('Error loading map tiles:', err);
+      });
+  }, [map, layer, index, selectedBank]);
+
+  useEffect(() => {
+    update();
+  }, [update]);
+
+  useMapEvents({ moveend: update });
+
+  return null;
+}
 
 export default function BranchMap({ selectedBank }: BranchMapProps) {
-  const [branches, setBranches] = useState<Branch[]>([]);
+  const [index, setIndex] = useState<TileIndex | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetch('/branches.json')
-      .then((res) => res.json())
+    loadTileIndex()
       .then((data) => {
-        setBranches(data);
+        setIndex(data);
         setLoading(false);
       })
       .catch((err) => {
-        console.error('Error loading branches:', err);
+        console.error('Error loading map tiles:', err);
         setLoading(false);
       });
   }, []);
@@ -80,11 +153,6 @@ export default function BranchMap({ selectedBank }: BranchMapProps) {
     );
   }
 
-  // Filter branches based on selected bank
-  const displayedBranches = selectedBank && selectedBank !== 'all'
-    ? branches.filter((b) => b.bank_name === selectedBank)
-    : branches;
-
   // Default center (Azerbaijan center)
   const center: [number, number] = [40.4093, 47.5769];
 
@@ -101,31 +169,7 @@ export default function BranchMap({ selectedBank }: BranchMapProps) {
           url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
         />
 
-        {displayedBranches.map((branch, idx) => {
-          const color = bankColors[branch.bank_name] || bankColors['default'];
-          const isBankOfBaku = branch.bank_name === 'Bank of Baku';
-          const isSelected = selectedBank === branch.bank_name;
-
-          // Make Bank of Baku and selected banks larger
-          const isHighlighted = isBankOfBaku || isSelected;
-
-          return (
-            <Marker
-              key={idx}
-              position={[branch.lat, branch.long]}
-              icon={createIcon(color, isHighlighted)}
-            >
-              <Popup>
-                <div className="font-semibold text-sm">
-                  {branch.bank_name}
-                </div>
-                <div className="text-xs text-gray-600">
-                  {branch.lat.toFixed(4)}, {branch.long.toFixed(4)}
-                </div>
-              </Popup>
-            </Marker>
-          );
-        })}
+        {index && <TiledBranches index={index} selectedBank={selectedBank} />}
       </MapContainer>
     </div>
   );
@@ -0,0 +1,70 @@
+// Precomputed aggregates written by scripts/analytics_export.py (run_analysis.py)
+
+export interface BankAnalytics {
+  name: string;
+  count: number;
+  share: number;         // percent of all branches
+  rank: number;
+  bakuShare: number;     // percent of the bank's branches inside Baku
+  avgIntensity: number;  // branches within ~10 km, averaged over the bank's branches
+}
+
+export interface GrowthTarget {
+  label: string;
+  needed: number;
+}
+
+export interface FocusAnalytics extends BankAnalytics {
+  targets: GrowthTarget[];
+  competitorDistanceKm: { mean: number | null; median: number | null };
+  nearestCompetitors: { name: string; count: number }[];
+}
+
+export interface ZoneAnalytics {
+  zone: string;
+  total: number;
+  focusCount: number;
+  focusShare: number;
+  focusRank: number | null;
+  leader: string;
+  leaderCount: number;
+}
+
+export interface GapLocation {
+  lat: number;
+  long: number;
+  bank: string;
+  distanceKm: number;
+}
+
+export interface Analytics {
+  version: number;
+  generated: string;
+  totalBranches: number;
+  totalBanks: number;
+  averagePerBank: number;
+  concentration: { top1: number; top3: number; top5: number };
+  banks: BankAnalytics[];  // sorted by branch count, descending
+  focus: FocusAnalytics;
+  zones: ZoneAnalytics[];
+  gaps: { count: number; top: GapLocation[] };
+}
+
+export const ANALYTICS_URL = '/data/analytics.json';
+
+let analyticsPromise: Promise<Analytics> | null = null;
+
+export function loadAnalytics(): Promise<Analytics> {
+  if (!analyticsPromise) {
+    analyticsPromise = fetch(ANALYTICS_URL).then((res) => {
+      if (!res.ok) {
+        throw new Error(`Failed to load analytics: HTTP ${res.status}`);
+      }
+      return res.json();
+    });
+    analyticsPromise.catch(() => {
+      analyticsPromise = null;
+    });
+  }
+  return analyticsPromise;
+}
@@ -0,0 +1,130 @@
+export interface Branch {
+  bank_name: string;
+  lat: number;
+  long: number;
+}
+
+// Per-bank shard list written by scripts/dashboard_export.py
+export interface ManifestBank {
+  name: string;
+  count: number;
+  file: string;   // content-hashed, never changes once published
+  hash: string;
+}
+
+export interface Manifest {
+  version: number;
+  hash: string;
+  count: number;
+  scale: number;
+  banks: ManifestBank[];
+}
+
+// Columnar payload of one bank's shard
+export interface PackedShard {
+  version: number;
+  scale: number;
+  lat: number[];   // delta-encoded, quantized to 1/scale degree
+  long: number[];  // delta-encoded, quantized to 1/scale degree
+}
+
+export const DATA_URL = '/data';
+export const MANIFEST_URL = `${DATA_URL}/manifest.json`;
+
+export function decodeShard(bankName: string, packed: PackedShard): Branch[] {
+  const count = packed.lat.length;
+  const branches: Branch[] = new Array(count);
+  let lat = 0;
+  let long = 0;
+
+  for (let i = 0; i < count; i++) {
+    lat += packed.lat[i];
+    long += packed.long[i];
+    branches[i] = {
+      bank_name: bankName,
+      lat: lat / packed.scale,
+      long: long / packed.scale,
+    };
+  }
+
+  return branches;
+}
+
+export async function loadManifest(): Promise<Manifest> {
+  const res = await fetch(MANIFEST_URL);
+  if (!res.ok) {
+    throw new Error(`Failed to load data manifest: HTTP ${res.status}`);
+  }
+  return res.json();
+}
+
+export async function loadBankBranches(bank: ManifestBank): Promise<Branch[]> {
+  const res = await fetch(`${DATA_URL}/${bank.file}`);
+  if (!res.ok) {
+    throw new Error(`Failed to load branches of ${bank.name}: HTTP ${res.status}`);
+  }
+  return decodeShard(bank.name, await res.json());
+}
+
+export interface BankStats {
+  name: string;
+  count: number;
+  share: number;  // percent of all branches
+  rank: number;   // 1 = most branches
+}
+
+// Decoded dataset with the indexes and aggregates every page needs, built once
+export interface BranchDataset {
+  hash: string;
+  branches: Branch[];
+  byBank: Map<string, Branch[]>;
+  banks: BankStats[];              // sorted by branch count, descending
+  bankStats: Map<string, BankStats>;
+  totalBranches: number;
+}
+
+export function buildDataset(hash: string, shards: [string, Branch[]][]): BranchDataset {
+  const byBank = new Map(shards);
+  const branches = shards.flatMap(([, bankBranches]) => bankBranches);
+  const totalBranches = branches.length;
+
+  const banks = shards
+    .map(([name, bankBranches]) => ({
+      name,
+      count: bankBranches.length,
+      share: totalBranches > 0 ? (bankBranches.length / totalBranches) * 100 : 0,
+      rank: 0,
+    }))
+    .sort((a, b) => b.count - a.count);
+  banks.forEach((bank, i) => {
+    bank.rank = i + 1;
+  });
+
+  return {
+    hash,
+    branches,
+    byBank,
+    banks,
+    bankStats: new Map(banks.map((bank) => [bank.name, bank])),
+    totalBranches,
+  };
+}
+
+let datasetPromise: Promise<BranchDataset> | null = null;
+
+// Fetches and decodes the data once per page load; every caller shares the result
+export function loadDataset(): Promise<BranchDataset> {
+  if (!datasetPromise) {
+    datasetPromise = loadManifest().then(async (manifest) => {
+      const shards = await Promise.all(manifest.banks.map(loadBankBranches));
+      return buildDataset(
+        manifest.hash,
+        manifest.banks.map((bank, i): [string, Branch[]] => [bank.name, shards[i]])
+      );
+    });
+    datasetPromise.catch(() => {
+      datasetPromise = null;
+    });
+  }
+  return datasetPromise;
+}
@@ -0,0 +1,207 @@
+import L from 'leaflet';
+
+// One branch or tile cluster to draw
+export interface CanvasMarker {
+  lat: number;
+  long: number;
+  count: number;
+  color: string;
+  highlighted: boolean;
+  bankName: string | null; // null when a cluster spans several banks
+}
+
+interface MarkerCanvasOptions {
+  onClick?: (marker: CanvasMarker) => void;
+}
+
+// Screen-space cell size of the hit-test grid, in CSS pixels
+const HIT_CELL = 32;
+
+// Same sizes as the former divIcon markers: diameter 25 px, 35 px highlighted,
+// clusters grow with the log of their branch count
+export function markerRadius(marker: CanvasMarker): number {
+  if (marker.count > 1) {
+    return Math.round(30 + Math.min(Math.log10(marker.count), 3) * 12) / 2;
+  }
+  return marker.highlighted ? 17.5 : 12.5;
+}
+
+/**
+ * Draws every marker on a single canvas instead of one DOM node each.
+ * The canvas sits in the overlay pane, so panning only moves it with the map;
+ * it is redrawn once per moveend. Clicks are resolved through a grid of
+ * screen cells built during drawing.
+ */
+export class MarkerCanvasLayer extends L.Layer {
+  private map: L.Map | null = null;
+  private canvas: HTMLCanvasElement | null = null;
+  private markers: CanvasMarker[] = [];
+  private points: L.Point[] = [];
+  private hitGrid = new Map<string, number[]>();
+  private onClick?: (marker: CanvasMarker) => void;
+
+  constructor(options: MarkerCanvasOptions = {}) {
+    super();
+    this.onClick = options.onClick;
+  }
+
+  onAdd(map: L.Map): this {
+    this.map = map;
+    this.canvas = L.DomUtil.create('canvas', 'leaflet-marker-canvas') as HTMLCanvasElement;
+    this.canvas.style.pointerEvents = 'none';
+    map.getPane('overlayPane')!.appendChild(this.canvas);
+
+    map.on('moveend resize', this.redraw, this);
+    map.on('zoomstart', this.hide, this);
+    map.on('click', this.handleClick, this);
+    map.on('mousemove', this.handleMouseMove, this);
+    this.redraw();
+    return this;
+  }
+
+  onRemove(map: L.Map): this {
+    map.off('moveend resize', this.redraw, this);
+    map.off('zoomstart', this.hide, this);
+    map.off('click', this.handleClick, this);
+    map.off('mousemove', this.handleMouseMove, this);
+    this.canvas?.remove();
+    this.canvas = null;
+    this.map = null;
+    return this;
+  }
+
+  setMarkers(markers: CanvasMarker[]): this {
+    // Highlighted markers go last so they are drawn on top and win hit tests
+    this.markers = [...markers].sort((a, b) => Number(a.highlighted) - Number(b.highlighted));
+    this.redraw();
+    return this;
+  }
+
+  private hide(): void {
+    // Positions are stale while the zoom animation runs
+    if (this.canvas) {
+      this.canvas.style.visibility = 'hidden';
+    }
+  }
+
+  private redraw(): void {
+    const map = this.map;
+    const canvas = this.canvas;
+    if (!map || !canvas) return;
+
+    const size = map.getSize();
+    const ratio = window.devicePixelRatio || 1;
+    canvas.width = size.x * ratio;
+    canvas.height = size.y * ratio;
+    canvas.style.width = `${size.x}px`;
+    canvas.style.height = `${size.y}px`;
+    L.DomUtil.setPosition(canvas, map.containerPointToLayerPoint([0, 0]));
+    canvas.style.visibility = 'visible';
+
+    const ctx = canvas.getContext('2d');
+    if (!ctx) return;
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, size.x, size.y);
+
+    this.points = this.markers.map((m) => map.latLngToContainerPoint([m.lat, m.long]));
+    this.hitGrid.clear();
+
+    // Batch fills by colour: one path per colour and size class
+    const batches = new Map<string, number[]>();
+    this.markers.forEach((marker, i) => {
+      const p = this.points[i];
+      const r = markerRadius(marker);
+      if (p.x < -r || p.y < -r || p.x > size.x + r || p.y > size.y + r) return;
+
+      const key = `${marker.highlighted ? 1 : 0}|${marker.count > 1 ? 1 : 0}|${marker.color}`;
+      let batch = batches.get(key);
+      if (!batch) {
+        batch = [];
+        batches.set(key, batch);
+      }
+      batch.push(i);
+
+      const cellX = Math.floor(p.x / HIT_CELL);
+      const cellY = Math.floor(p.y / HIT_CELL);
+      const cell = `${cellX}/${cellY}`;
+      const members = this.hitGrid.get(cell);
+      if (members) {
+        members.push(i);
+      } else {
+        this.hitGrid.set(cell, [i]);
+      }
+    });
+
+    // Map keeps insertion order; sort so highlighted batches are drawn last
+    const ordered = [...batches.entries()].sort(([a], [b]) => a.localeCompare(b));
+    ctx.shadowColor = 'rgba(0, 0, 0, 0.3)';
+    ctx.shadowBlur = 8;
+    ctx.shadowOffsetY = 2;
+    ctx.strokeStyle = 'white';
+
+    for (const [key, indices] of ordered) {
+      const [highlighted, cluster, color] = key.split('|');
+      ctx.beginPath();
+      for (const i of indices) {
+        const p = this.points[i];
+        const r = markerRadius(this.markers[i]);
+        ctx.moveTo(p.x + r, p.y);
+        ctx.arc(p.x, p.y, r, 0, Math.PI * 2);
+      }
+      ctx.fillStyle = color;
+      ctx.fill();
+      ctx.shadowColor = 'transparent';
+      ctx.lineWidth = cluster === '1' ? 3 : highlighted === '1' ? 4 : 2;
+      ctx.stroke();
+      ctx.shadowColor = 'rgba(0, 0, 0, 0.3)';
+    }
+
+    // Cluster counts
+    ctx.shadowColor = 'transparent';
+    ctx.fillStyle = 'white';
+    ctx.font = '700 12px sans-serif';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'middle';
+    for (const indices of batches.values()) {
+      for (const i of indices) {
+        if (this.markers[i].count > 1) {
+          ctx.fillText(String(this.markers[i].count), this.points[i].x, this.points[i].y);
+        }
+      }
+    }
+  }
+
+  // Topmost marker under a container point, or -1
+  private hitTest(point: L.Point): number {
+    const cellX = Math.floor(point.x / HIT_CELL);
+    const cellY = Math.floor(point.y / HIT_CELL);
+    let best = -1;
+
+    // Markers are at most 2 cells wide, so the neighbouring cells cover them
+    for (let dx = -2; dx <= 2; dx++) {
+      for (let dy = -2; dy <= 2; dy++) {
+        for (const i of this.hitGrid.get(`${cellX + dx}/${cellY + dy}`) || []) {
+          const r = markerRadius(this.markers[i]);
+          if (i > best && this.points[i].distanceTo(point) <= r) {
+            best = i;
+          }
+        }
+      }
+    }
+    return best;
+  }
+
+  private handleClick(e: L.LeafletMouseEvent): void {
+    const hit = this.hitTest(e.containerPoint);
+    if (hit >= 0 && this.onClick) {
+      this.onClick(this.markers[hit]);
+    }
+  }
+
+  private handleMouseMove(e: L.LeafletMouseEvent): void {
+    const container = this.map?.getContainer();
+    if (container) {
+      container.style.cursor = this.hitTest(e.containerPoint) >= 0 ? 'pointer' : '';
+    }
+  }
+}
@@ -0,0 +1,116 @@
+// Static JSON tile pyramid written by scripts/tile_export.py
+
+export interface TileIndex {
+  version: number;
+  hash: string;
+  tileSize: number;
+  minZoom: number;
+  maxZoom: number;
+  clusterMaxZoom: number;
+  banks: string[];
+  bounds: [[number, number], [number, number]];
+  tiles: { [zoom: string]: [number, number][] };
+}
+
+// [lat, long, count, bank index or -1 for clusters spanning several banks]
+export type AllEntry = [number, number, number, number];
+// [lat, long, count]
+export type BankEntry = [number, number, number];
+
+export interface Tile {
+  all: AllEntry[];
+  banks: { [bank: string]: BankEntry[] };
+}
+
+export interface TileCoord {
+  z: number;
+  x: number;
+  y: number;
+}
+
+const TILES_URL = '/tiles';
+
+let indexPromise: Promise<TileIndex> | null = null;
+const availableTiles = new Map<number, Set<string>>();
+const tileCache = new Map<string, Promise<Tile>>();
+
+export function loadTileIndex(): Promise<TileIndex> {
+  if (!indexPromise) {
+    indexPromise = fetch(`${TILES_URL}/index.json`).then((res) => {
+      if (!res.ok) {
+        throw new Error(`Failed to load tile index: HTTP ${res.status}`);
+      }
+      return res.json();
+    });
+    indexPromise.catch(() => {
+      indexPromise = null;
+    });
+  }
+  return indexPromise;
+}
+
+export function loadTile(index: TileIndex, { z, x, y }: TileCoord): Promise<Tile> {
+  const key = `${z}/${x}/${y}`;
+  let tile = tileCache.get(key);
+  if (!tile) {
+    // The index hash changes whenever any tile does, so it doubles as a cache buster
+    tile = fetch(`${TILES_URL}/${key}.json?v=${index.hash}`).then((res) => {
+      if (!res.ok) {
+        throw new Error(`Failed to load tile ${key}: HTTP ${res.status}`);
+      }
+      return res.json();
+    });
+    tile.catch(() => tileCache.delete(key));
+    tileCache.set(key, tile);
+  }
+  return tile;
+}
+
+function lonToTileX(lon: number, zoom: number): number {
+  return Math.floor(((lon + 180) / 360) * 2 ** zoom);
+}
+
+function latToTileY(lat: number, zoom: number): number {
+  const clamped = Math.max(Math.min(lat, 85.05112878), -85.05112878);
+  const rad = (clamped * Math.PI) / 180;
+  return Math.floor(((1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) / Math.PI) / 2) * 2 ** zoom);
+}
+
+// Tile level to use at a map zoom: beyond maxZoom the deepest tiles are over-zoomed
+export function tileZoom(index: TileIndex, mapZoom: number): number {
+  return Math.max(index.minZoom, Math.min(index.maxZoom, Math.round(mapZoom)));
+}
+
+export function visibleTiles(
+  index: TileIndex,
+  mapZoom: number,
+  south: number,
+  west: number,
+  north: number,
+  east: number
+): TileCoord[] {
+  const z = tileZoom(index, mapZoom);
+
+  let available = availableTiles.get(z);
+  if (!available) {
+    available = new Set((index.tiles[String(z)] || []).map(([x, y]) => `${x}/${y}`));
+    availableTiles.set(z, available);
+  }
+
+  const coords: TileCoord[] = [];
+  const xMin = lonToTileX(west, z);
+  const xMax = lonToTileX(east, z);
+  const yMin = latToTileY(north, z);
+  const yMax = latToTileY(south, z);
+
+  for (let x = xMin; x <= xMax; x++) {
+    for (let y = yMin; y <= yMax; y++) {
+      // Only request tiles that exist; empty areas have no file
+      if (available.has(`${x}/${y}`)) {
+        coords.push({ z, x, y });
+      }
+    }
+  }
+
+  return coords;
+}
@@ -2,6 +2,23 @@
 const nextConfig = {
   reactStrictMode: true,
   turbopack: {},
+  async headers() {
+    return [
+      {
+        // Shard file names carry a content hash, so they never change
+        source: '/data/shards/:path*',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+      {
+        source: '/data/manifest.json',
+        headers: [{ key: 'Cache-Control', value: 'no-cache' }],
+      },
+      {
+        source: '/data/analytics.json',
+        headers: [{ key: 'Cache-Control', value: 'no-cache' }],
+      },
+    ];
+  },
   webpack: (config) => {
     config.externals = [...(config.externals || []), { canvas: 'canvas' }];
     return config;
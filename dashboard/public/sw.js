@@ -1,48 +1,129 @@
-const CACHE_NAME = 'bank-network-az-v1';
-const urlsToCache = [
-  '/',
-  '/branches.json',
-  '/manifest.json'
-];
-
-// Install service worker
-self.addEventListener('install', (event) => {
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then((cache) => {
-        console.log('Opened cache');
-        return cache.addAll(urlsToCache);
-      })
-  );
-});
-
-// Fetch from cache
-self.addEventListener('fetch', (event) => {
-  event.respondWith(
-    caches.match(event.request)
-      .then((response) => {
-        // Cache hit - return response
-        if (response) {
-          return response;
-        }
-        return fetch(event.request);
-      }
-    )
-  );
-});
-
-// Update service worker
-self.addEventListener('activate', (event) => {
-  const cacheWhitelist = [CACHE_NAME];
-  event.waitUntil(
-    caches.keys().then((cacheNames) => {
-      return Promise.all(
-        cacheNames.map((cacheName) => {
-          if (cacheWhitelist.indexOf(cacheName) === -1) {
-            return caches.delete(cacheName);
-          }
-        })
-      );
-    })
-  );
-});
+const CACHE_NAME = 'bank-network-az-v3';
+const DATA_CACHE_NAME = 'bank-network-az-data-v1';
+const MANIFEST_PATH = '/data/manifest.json';
+const ANALYTICS_PATH = '/data/analytics.json';
+const SHARD_PREFIX = '/data/shards/';
+const urlsToCache = [
+  '/',
+  MANIFEST_PATH,
+  '/manifest.json'
+];
+
+// Install service worker
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(CACHE_NAME)
+      .then((cache) => {
+        console.log('Opened cache');
+        return cache.addAll(urlsToCache);
+      })
+  );
+});
+
+// Drop cached shards that neither the latest data manifest nor the one just
+// served from cache references: the page is still loading the served one
+function pruneShards(latestResponse, servedResponse) {
+  const manifests = [latestResponse, servedResponse]
+    .filter(Boolean)
+    .map((response) => response.json().catch(() => ({ banks: [] })));
+  return Promise.all(manifests).then((loaded) => {
+    const current = new Set();
+    loaded.forEach((manifest) => manifest.banks.forEach((bank) => current.add(`/data/${bank.file}`)));
+    return caches.open(DATA_CACHE_NAME).then((cache) =>
+      cache.keys().then((requests) =>
+        Promise.all(
+          requests
+            .filter((request) => !current.has(new URL(request.url).pathname))
+            .map((request) => cache.delete(request))
+        )
+      )
+    );
+  });
+}
+
+// Data manifest and analytics: answer from cache at once, refresh in the background
+function staleWhileRevalidate(event, onUpdate) {
+  return caches.open(CACHE_NAME).then((cache) =>
+    cache.match(event.request).then((cached) => {
+      const served = cached && cached.clone();
+      const network = fetch(event.request).then((response) => {
+        if (response.ok) {
+          const copy = response.clone();
+          event.waitUntil(
+            cache.put(event.request, response.clone()).then(() => onUpdate && onUpdate(copy, served))
+          );
+        }
+        return response;
+      });
+      if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+      }
+      return network;
+    })
+  );
+}
+
+// Shards: file names carry a content hash, so a cached copy is never stale
+function cacheFirstImmutable(event) {
+  return caches.open(DATA_CACHE_NAME).then((cache) =>
+    cache.match(event.request).then((cached) => {
+      if (cached) {
+        return cached;
+      }
+      return fetch(event.request).then((response) => {
+        if (response.ok) {
+          event.waitUntil(cache.put(event.request, response.clone()));
+        }
+        return response;
+      });
+    })
+  );
+}
+
+// Fetch from cache
+self.addEventListener('fetch', (event) => {
+  const url = new URL(event.request.url);
+  if (event.request.method === 'GET' && url.origin === self.location.origin) {
+    if (url.pathname === MANIFEST_PATH) {
+      event.respondWith(staleWhileRevalidate(event, pruneShards));
+      return;
+    }
+    if (url.pathname === ANALYTICS_PATH) {
+      event.respondWith(staleWhileRevalidate(event));
+      return;
+    }
+    if (url.pathname.startsWith(SHARD_PREFIX)) {
+      event.respondWith(cacheFirstImmutable(event));
+      return;
+    }
+  }
+
+  event.respondWith(
+    caches.match(event.request)
+      .then((response) => {
+        // Cache hit - return response
+        if (response) {
+          return response;
+        }
+        return fetch(event.request);
+      }
+    )
+  );
+});
+
+// Update service worker
+self.addEventListener('activate', (event) => {
+  const cacheWhitelist = [CACHE_NAME, DATA_CACHE_NAME];
+  event.waitUntil(
+    caches.keys().then((cacheNames) => {
+      return Promise.all(
+        cacheNames.map((cacheName) => {
+          if (cacheWhitelist.indexOf(cacheName) === -1) {
+            return caches.delete(cacheName);
+          }
+        })
+      );
+    })
+  );
+});
@@ -0,0 +1,75 @@
+"""
+Bank branch network analysis as a graph of cached nodes.
+
+    from analysis import DEFAULT_PARAMS, TARGETS, Pipeline, run_pipelines
+
+    pipeline = Pipeline(DEFAULT_PARAMS)
+    pipeline.run(TARGETS)           # only out-of-date nodes recompute
+    gaps = pipeline.value('gaps')   # any metric, from the cache when valid
+
+    # Another focus bank: the fork reuses everything not specific to the bank
+    other = pipeline.fork({'focus_bank': 'Kapital Bank'}, output_dir='reports/kapital_bank')
+    run_pipelines([pipeline, other], TARGETS)
+
+Modules:
+    dag         node registry, cache keys and the Pipeline runner
+    data        branch loading (the root node)
+    metrics     clusters, density, gaps, intensity, rivals, zones, opportunity grids
+    geo         great-circle km distances, km KD-tree queries, local projection
+    spatial     batched KD-tree neighbour counts and per-group nearest
+    clustering  haversine DBSCAN / HDBSCAN on a cached neighbour graph
+    density     kernel density in km (exact, or binned FFT for many points)
+    grid        chunked lattice scoring and adaptive top-site search
+    roads       contracted OSM road graph and multi-source drive times
+    population  memory-mapped population raster and km-grid disc sums
+    siting      lazy-greedy / MILP maximal-coverage and p-median site selection
+    markets     incremental Voronoi market areas clipped to the country outline
+    charts      charts/01-15
+    report      docs/STRATEGIC_INSIGHTS.txt and dashboard analytics.json
+
+Zone labels and the country outline come from boundaries.py beside this
+package, which validation.py in the combine stage also imports.
+"""
+
+from .dag import CACHE_DIR, REGISTRY, Pipeline, fingerprint, node, run_pipelines
+from . import data, metrics, charts, report  # noqa: F401  (registers the nodes)
+
+
+# Parameters that metric nodes declare; part of their cache keys
+DEFAULT_PARAMS = {
+    'focus_bank': 'Bank of Baku',       # bank the charts and reports are written for
+    'cluster_method': 'dbscan',         # or 'hdbscan' (cluster_min_samples = minimum cluster size)
+    'cluster_eps_km': 50.0,             # DBSCAN neighbourhood, great-circle km
+    'cluster_min_samples': 5,
+    'cluster_graph_radius_km': 100.0,   # cached neighbour graph; any eps up to this reuses it
+    'gap_threshold_km': 30.0,           # from the nearest focus bank branch
+    'intensity_radius_km': 10.0,
+    'rival_k': 3,                       # nearest branches of every bank kept per branch (rival_matrix)
+    'drive_minutes': 15.0,              # drive-time catchment limit (needs data/roads.osm)
+    'opportunity_resolution': 400,      # lattice points per side of the Chart 13 heatmaps
+    'density_bandwidth_km': None,       # Gaussian KDE bandwidth; None = Scott's rule
+    'population_cell_km': 0.5,          # population grid cell (needs data/population.tif or .npy)
+    'population_weight': 0.0,           # opportunity score per 1,000 residents within the radius
+    'expansion_sites': 15,              # new branches picked together by expansion_plan
+    'expansion_objective': 'coverage',  # or 'median' (demand-weighted km, capped at the radius)
+    'expansion_radius_km': 5.0,
+    'expansion_method': 'greedy',       # or 'milp' (exact, small instances only)
+}
+
+CHARTS = [
+    'chart_01', 'chart_02', 'chart_03', 'chart_04', 'chart_05', 'chart_06', 'chart_07',
+    'chart_08', 'chart_09', 'chart_10', 'chart_11', 'chart_12', 'chart_13a', 'chart_13b',
+    'chart_14', 'chart_15',
+]
+
+REPORTS = ['strategic_insights', 'dashboard_analytics']
+
+TARGETS = CHARTS + REPORTS
+
+# Every cached node that computes numbers rather than writing files
+METRICS = [name for name, n in REGISTRY.items() if n.cache and not n.outputs]
+
+__all__ = [
+    'CACHE_DIR', 'CHARTS', 'DEFAULT_PARAMS', 'METRICS', 'Pipeline', 'REGISTRY', 'REPORTS', 'TARGETS',
+    'fingerprint', 'node', 'run_pipelines',
+]
@@ -0,0 +1,1281 @@
+"""
+Chart nodes: one function per chart in charts/.
+
+Each chart only reads the metric nodes it needs, so editing one chart
+re-renders that chart alone, and a chart is skipped while its inputs,
+its code and its PNG are unchanged.
+"""
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+from .dag import node
+from .data import BAKU_CITIES, REGIONAL_CITIES
+from .metrics import BAKU_ABSHERON_LAT, BAKU_ABSHERON_LONG
+
+# Set style
+plt.style.use('seaborn-v0_8-darkgrid')
+sns.set_palette("husl")
+
+# Set figure defaults
+plt.rcParams['figure.figsize'] = (12, 6)
+plt.rcParams['font.size'] = 10
+
+
+@node(title='Chart 1: Branch Count Comparison', params=['focus_bank'], outputs=['charts/01_branch_count_comparison.png'])
+def chart_01(branches, focus_bank, path):
+    """Branches per bank, the focus bank highlighted."""
+    print("Generating Chart 1: Branch Count Comparison...")
+    df = branches
+    fig, ax = plt.subplots(figsize=(14, 7))
+
+    branch_counts = df['bank_name'].value_counts().sort_values(ascending=True)
+    colors = ['#e74c3c' if bank == focus_bank else '#3498db' for bank in branch_counts.index]
+
+    branch_counts.plot(kind='barh', ax=ax, color=colors)
+    ax.set_xlabel('Number of Branches', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Bank Name', fontsize=12, fontweight='bold')
+    ax.set_title(f'Branch Network Size Comparison - {focus_bank} vs Competitors',
+                 fontsize=14, fontweight='bold', pad=20)
+
+    # Add value labels
+    for i, v in enumerate(branch_counts.values):
+        ax.text(v + 2, i, str(v), va='center', fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    # Key insight
+    bob_count = df[df['bank_name'] == focus_bank].shape[0]
+    total_count = len(df)
+    bob_rank = (df['bank_name'].value_counts() > bob_count).sum() + 1
+
+    print(f"✓ Chart 1 saved")
+    print(f"  {focus_bank}: {bob_count} branches, Rank #{bob_rank}, Market share: {bob_count/total_count*100:.1f}%")
+    print()
+
+
+@node(title='Chart 2: Market Share Analysis', params=['focus_bank'], outputs=['charts/02_market_share_analysis.png'])
+def chart_02(branches, focus_bank, path):
+    """Market ranking, share distribution and the focus bank vs the top 5."""
+    print("Generating Chart 2: Market Share Analysis...")
+    df = branches
+    total_count = len(df)
+    fig = plt.figure(figsize=(18, 10))
+    gs = fig.add_gridspec(2, 2, hspace=0.35, wspace=0.3)
+
+    market_share = df['bank_name'].value_counts()
+
+    # 1. Complete market ranking - horizontal bar chart (top left, spans 2 rows)
+    ax1 = plt.subplot(gs[:, 0])
+    colors_rank = ['#e74c3c' if bank == focus_bank else '#3498db' for bank in market_share.index]
+    y_pos = range(len(market_share))
+
+    bars = ax1.barh(y_pos, market_share.values, color=colors_rank, edgecolor='black', linewidth=1.2, alpha=0.85)
+    ax1.set_yticks(y_pos)
+    ax1.set_yticklabels(market_share.index, fontsize=11, fontweight='bold')
+    ax1.set_xlabel('Number of Branches', fontsize=12, fontweight='bold')
+    ax1.set_title('Complete Market Rankings - All Banks', fontsize=14, fontweight='bold', pad=15)
+    ax1.invert_yaxis()
+
+    # Add value and percentage labels
+    for i, (bar, bank) in enumerate(zip(bars, market_share.index)):
+        width = bar.get_width()
+        pct = width / total_count * 100
+        label = f'{int(width)} ({pct:.1f}%)'
+        ax1.text(width + 3, bar.get_y() + bar.get_height()/2, label,
+                ha='left', va='center', fontweight='bold', fontsize=10,
+                color='#e74c3c' if bank == focus_bank else '#2c3e50')
+
+    ax1.grid(True, alpha=0.3, axis='x')
+    ax1.set_xlim(0, market_share.max() * 1.15)
+
+    # 2. Market share percentage - horizontal stacked bar (top right)
+    ax2 = plt.subplot(gs[0, 1])
+    market_pct = (market_share / total_count * 100).sort_values(ascending=False)
+
+    # Create stacked bar
+    left = 0
+    colors_stack = []
+    labels_stack = []
+    for bank in market_pct.index:
+        if bank == focus_bank:
+            color = '#e74c3c'
+        elif market_pct[bank] >= 5:
+            color = '#3498db'
+        else:
+            color = '#95a5a6'
+
+        colors_stack.append(color)
+
+        width = market_pct[bank]
+        ax2.barh(0, width, left=left, color=color, edgecolor='white', linewidth=2, height=0.6)
+
+        # Add label if segment is large enough
+        if width >= 3:
+            ax2.text(left + width/2, 0, f'{bank}\n{width:.1f}%',
+                    ha='center', va='center', fontsize=9, fontweight='bold', color='white')
+
+        left += width
+
+    ax2.set_xlim(0, 100)
+    ax2.set_ylim(-0.5, 0.5)
+    ax2.set_xlabel('Market Share (%)', fontsize=12, fontweight='bold')
+    ax2.set_title('Market Share Distribution', fontsize=14, fontweight='bold', pad=15)
+    ax2.set_yticks([])
+    ax2.grid(True, alpha=0.3, axis='x')
+
+    # 3. Focus bank vs Top 5 Competitors (bottom right)
+    ax3 = plt.subplot(gs[1, 1])
+
+    # Get top 5 competitors (excluding focus bank if it's in top 5, then add it)
+    top_competitors = market_share[market_share.index != focus_bank].head(5)
+    bob_value = market_share[focus_bank]
+
+    # Create comparison data
+    comparison_banks = [focus_bank] + list(top_competitors.index[:5])
+    comparison_values = [bob_value] + list(top_competitors.values[:5])
+    comparison_pct = [v/total_count*100 for v in comparison_values]
+
+    colors_comp = ['#e74c3c'] + ['#95a5a6'] * 5
+    y_pos_comp = range(len(comparison_banks))
+
+    bars = ax3.barh(y_pos_comp, comparison_values, color=colors_comp,
+                    edgecolor='black', linewidth=1.5, alpha=0.85)
+    ax3.set_yticks(y_pos_comp)
+    ax3.set_yticklabels(comparison_banks, fontsize=11, fontweight='bold')
+    ax3.set_xlabel('Number of Branches', fontsize=12, fontweight='bold')
+    ax3.set_title(f'{focus_bank} vs Top 5 Competitors', fontsize=14, fontweight='bold', pad=15)
+    ax3.invert_yaxis()
+
+    # Add value labels
+    for i, (bar, pct) in enumerate(zip(bars, comparison_pct)):
+        width = bar.get_width()
+        ax3.text(width + 2, bar.get_y() + bar.get_height()/2,
+                f'{int(width)} ({pct:.1f}%)',
+                ha='left', va='center', fontweight='bold', fontsize=10,
+                color='#e74c3c' if i == 0 else '#2c3e50')
+
+    ax3.grid(True, alpha=0.3, axis='x')
+    ax3.set_xlim(0, max(comparison_values) * 1.15)
+
+    # Add gap annotation
+    if len(comparison_values) > 1:
+        gap = comparison_values[1] - comparison_values[0]
+        ax3.annotate(f'Gap: {gap} branches',
+                    xy=(comparison_values[0], 0.5), xytext=(comparison_values[0] + gap/2, 1.5),
+                    fontsize=10, fontweight='bold', color='#e74c3c',
+                    ha='center',
+                    arrowprops=dict(arrowstyle='->', color='#e74c3c', lw=2))
+
+    plt.suptitle(f'Market Share Analysis - {focus_bank} Position',
+                 fontsize=16, fontweight='bold', y=0.98)
+
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 2 saved")
+    print()
+
+
+@node(title='Chart 3: Geographic Distribution', params=['focus_bank'], outputs=['charts/03_geographic_distribution_all.png'])
+def chart_03(branches, focus_bank, path):
+    """Every branch on one map, one colour and marker per bank."""
+    print("Generating Chart 3: Geographic Distribution...")
+    df = branches
+    fig, ax = plt.subplots(figsize=(18, 12))
+
+    # Define distinct color palette for better visibility (20 distinct colors)
+    distinct_colors = [
+        '#e74c3c',  # Red - focus bank
+        '#3498db',  # Blue
+        '#2ecc71',  # Green
+        '#f39c12',  # Orange
+        '#9b59b6',  # Purple
+        '#1abc9c',  # Turquoise
+        '#e67e22',  # Carrot
+        '#34495e',  # Dark gray
+        '#16a085',  # Green sea
+        '#c0392b',  # Dark red
+        '#8e44ad',  # Wisteria
+        '#27ae60',  # Nephritis
+        '#d35400',  # Pumpkin
+        '#2c3e50',  # Midnight blue
+        '#f1c40f',  # Sunflower
+        '#95a5a6',  # Concrete
+        '#7f8c8d',  # Asbestos
+        '#c39bd3',  # Light purple
+        '#76d7c4',  # Light turquoise
+        '#f8c471',  # Light orange
+    ]
+
+    # Different marker styles for additional distinction
+    marker_styles = ['o', 'o', 'o', 'o', 'o', 'v', 'v', 'v', 'v', 'v',
+                     '^', '^', '^', '^', '^', 'D', 'D', 'D', 'D', 'D']
+
+    # Sort banks by count (largest first) for better layering
+    bank_counts_sorted = df['bank_name'].value_counts()
+
+    # Plot all banks with distinct colors and markers
+    for idx, bank in enumerate(bank_counts_sorted.index):
+        bank_data = df[df['bank_name'] == bank]
+
+        if bank == focus_bank:
+            # Focus bank - highlighted prominently
+            ax.scatter(bank_data['long'], bank_data['lat'],
+                      s=200, alpha=0.95, label=bank,
+                      color=distinct_colors[0],
+                      edgecolors='black', linewidth=2.5, marker='s', zorder=100)
+        else:
+            # Other banks - use distinct colors and varying markers
+            color_idx = idx % len(distinct_colors)
+            marker_idx = idx % len(marker_styles)
+
+            ax.scatter(bank_data['long'], bank_data['lat'],
+                      s=70, alpha=0.75, label=f'{bank} ({len(bank_data)})',
+                      color=distinct_colors[color_idx],
+                      marker=marker_styles[marker_idx],
+                      edgecolors='white', linewidth=0.5, zorder=idx)
+
+    ax.set_xlabel('Longitude', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Latitude', fontsize=12, fontweight='bold')
+    ax.set_title(f'Geographic Distribution of Bank Branches in Azerbaijan\\n({focus_bank} highlighted as red squares)',
+                 fontsize=14, fontweight='bold', pad=20)
+
+    # Improved legend with branch counts
+    ax.legend(bbox_to_anchor=(1.02, 1), loc='upper left', fontsize=8,
+              ncol=1, frameon=True, fancybox=True, shadow=True)
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.5)
+
+    # Set background color for better contrast
+    ax.set_facecolor('#f8f9fa')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 3 saved")
+    print()
+
+
+@node(title='Chart 4: Focus Bank vs Top Competitors', params=['focus_bank'], outputs=['charts/04_bob_vs_competitors_geographic.png'])
+def chart_04(branches, focus_bank, path):
+    """Coverage maps of the focus bank and the three largest banks."""
+    print(f"Generating Chart 4: {focus_bank} vs Top Competitors...")
+    df = branches
+    top_3_competitors = df['bank_name'].value_counts().head(3).index.tolist()
+    comparison_banks = [focus_bank] + [b for b in top_3_competitors if b != focus_bank][:3]
+
+    fig, axes = plt.subplots(2, 2, figsize=(16, 14))
+    axes = axes.flatten()
+
+    competitor_colors = ['#e74c3c', '#3498db', '#2ecc71', '#f39c12']
+
+    for idx, bank in enumerate(comparison_banks):
+        ax = axes[idx]
+
+        # Plot all branches with light background
+        ax.scatter(df['long'], df['lat'], s=15, alpha=0.15, color='#95a5a6', label='Other banks')
+
+        # Highlight this bank
+        bank_data = df[df['bank_name'] == bank]
+        color = competitor_colors[idx]
+        marker = 's' if bank == focus_bank else 'o'
+
+        ax.scatter(bank_data['long'], bank_data['lat'],
+                  s=120, alpha=0.9, color=color, label=bank,
+                  marker=marker, edgecolors='black', linewidth=1.5, zorder=5)
+
+        ax.set_title(f'{bank} - {len(bank_data)} branches',
+                    fontsize=12, fontweight='bold')
+        ax.set_xlabel('Longitude', fontsize=10)
+        ax.set_ylabel('Latitude', fontsize=10)
+        ax.legend(fontsize=9, frameon=True, fancybox=True)
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.set_facecolor('#f8f9fa')
+
+    plt.suptitle(f'Geographic Coverage Comparison: {focus_bank} vs Top Competitors',
+                 fontsize=16, fontweight='bold', y=1.00)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 4 saved")
+    print()
+
+
+@node(title='Chart 5: Regional Clustering', params=['focus_bank'], outputs=['charts/05_regional_clustering.png'])
+def chart_05(branches, clusters, cluster_table, focus_bank, path):
+    """DBSCAN regional clusters and focus bank presence in each."""
+    print("Generating Chart 5: Regional Clustering...")
+    df = branches.assign(cluster=clusters)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Define distinct colors for clusters
+    cluster_colors = ['#95a5a6',  # Gray for outliers (cluster -1)
+                     '#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6',
+                     '#1abc9c', '#e67e22', '#34495e', '#16a085', '#c0392b',
+                     '#8e44ad', '#27ae60', '#d35400', '#2c3e50', '#f1c40f',
+                     '#c39bd3', '#76d7c4', '#f8c471', '#ec7063']
+
+    # Plot clusters with distinct colors
+    unique_clusters = sorted(df['cluster'].unique())
+    for cluster_id in unique_clusters:
+        cluster_data = df[df['cluster'] == cluster_id]
+        color_idx = (cluster_id + 1) % len(cluster_colors)
+
+        if cluster_id == -1:
+            # Outliers - smaller and lighter
+            ax1.scatter(cluster_data['long'], cluster_data['lat'],
+                       s=40, alpha=0.4, color=cluster_colors[0],
+                       label=f'Outliers ({len(cluster_data)})',
+                       edgecolors='white', linewidth=0.3, zorder=1)
+        else:
+            # Clustered branches - larger and more visible
+            ax1.scatter(cluster_data['long'], cluster_data['lat'],
+                       s=80, alpha=0.85, color=cluster_colors[color_idx],
+                       label=f'Cluster {cluster_id} ({len(cluster_data)})',
+                       edgecolors='white', linewidth=0.8, zorder=2)
+
+    ax1.set_title('Regional Clusters - All Banks', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Longitude', fontsize=11)
+    ax1.set_ylabel('Latitude', fontsize=11)
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.legend(bbox_to_anchor=(1.02, 1), loc='upper left', fontsize=8, ncol=1, frameon=True, fancybox=True)
+    ax1.set_facecolor('#f8f9fa')
+
+    # Focus bank presence in clusters
+    cluster_df = cluster_table
+
+    cluster_df.plot(kind='bar', ax=ax2, color=['#3498db', '#e74c3c'])
+    ax2.set_title(f'{focus_bank} Presence by Regional Cluster', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Cluster ID (-1 = outliers)', fontsize=11)
+    ax2.set_ylabel('Number of Branches', fontsize=11)
+    ax2.legend(fontsize=10)
+    ax2.tick_params(axis='x', rotation=0)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 5 saved")
+    print(f"  Identified {df['cluster'].nunique() - 1} major regional clusters")
+    print()
+
+
+@node(title='Chart 6: Baku City Analysis', params=['focus_bank'], outputs=['charts/06_baku_city_analysis.png'])
+def chart_06(branches, focus_bank, path):
+    """Branch map and counts inside Baku City."""
+    print("Generating Chart 6: Baku City Analysis...")
+    df = branches
+    baku_df = df[df['region'] == 'Baku'].copy()
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Use same distinct colors as Chart 3
+    baku_distinct_colors = [
+        '#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6',
+        '#1abc9c', '#e67e22', '#34495e', '#16a085', '#c0392b',
+        '#8e44ad', '#27ae60', '#d35400', '#2c3e50', '#f1c40f',
+        '#95a5a6', '#7f8c8d', '#c39bd3', '#76d7c4', '#f8c471'
+    ]
+
+    # Different marker styles for distinction
+    baku_marker_styles = ['o', 'o', 'o', 'o', 'v', 'v', 'v', 'v',
+                          '^', '^', '^', '^', 'D', 'D', 'D', 'D',
+                          's', 's', 's', 's']
+
+    # Sort banks by count in Baku for better layering
+    baku_bank_counts = baku_df['bank_name'].value_counts()
+
+    # Baku branch distribution
+    for idx, bank in enumerate(baku_bank_counts.index):
+        bank_data = baku_df[baku_df['bank_name'] == bank]
+        color_idx = idx % len(baku_distinct_colors)
+        marker_idx = idx % len(baku_marker_styles)
+
+        if bank == focus_bank:
+            ax1.scatter(bank_data['long'], bank_data['lat'],
+                       s=180, alpha=0.95, label=f'{bank} ({len(bank_data)})',
+                       color=baku_distinct_colors[0],
+                       edgecolors='black', linewidth=2.5, marker='s', zorder=100)
+        else:
+            ax1.scatter(bank_data['long'], bank_data['lat'],
+                       s=80, alpha=0.8, label=f'{bank} ({len(bank_data)})',
+                       color=baku_distinct_colors[color_idx],
+                       marker=baku_marker_styles[marker_idx],
+                       edgecolors='white', linewidth=0.8, zorder=idx)
+
+    ax1.set_xlabel('Longitude', fontsize=11)
+    ax1.set_ylabel('Latitude', fontsize=11)
+    ax1.set_title(f'Baku City - Branch Distribution\n({focus_bank} highlighted as red squares)',
+                 fontsize=14, fontweight='bold')
+    ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8,
+              frameon=True, fancybox=True, shadow=True)
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.set_facecolor('#f8f9fa')
+
+    # Baku market share
+    baku_counts = baku_df['bank_name'].value_counts()
+    colors = ['#e74c3c' if bank == focus_bank else '#3498db' for bank in baku_counts.index]
+    baku_counts.plot(kind='barh', ax=ax2, color=colors)
+    ax2.set_xlabel('Number of Branches', fontsize=11)
+    ax2.set_ylabel('Bank Name', fontsize=11)
+    ax2.set_title('Baku City - Branch Count by Bank', fontsize=14, fontweight='bold')
+
+    for i, v in enumerate(baku_counts.values):
+        ax2.text(v + 0.5, i, str(v), va='center', fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    bob_baku = len(baku_df[baku_df['bank_name'] == focus_bank])
+    total_baku = len(baku_df)
+
+    print(f"✓ Chart 6 saved")
+    print(f"  Baku: {bob_baku} {focus_bank} branches out of {total_baku} total ({bob_baku/total_baku*100:.1f}%)")
+    print()
+
+
+@node(title='Chart 7: Baku vs Regions', params=['focus_bank'], outputs=['charts/07_baku_vs_regions.png'])
+def chart_07(branches, focus_bank, path):
+    """Baku / Regions split for every bank and for the focus bank."""
+    print("Generating Chart 7: Baku vs Regions...")
+    df = branches
+
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+
+    # Regional distribution for all banks
+    region_dist = df.groupby(['bank_name', 'region']).size().unstack(fill_value=0)
+    region_dist.plot(kind='bar', ax=axes[0], color=['#3498db', '#e74c3c'], width=0.8)
+    axes[0].set_title('Baku vs Regions - All Banks', fontsize=12, fontweight='bold')
+    axes[0].set_xlabel('Bank', fontsize=10)
+    axes[0].set_ylabel('Number of Branches', fontsize=10)
+    axes[0].tick_params(axis='x', rotation=45)
+    axes[0].legend(title='Region')
+
+    # Focus bank specific
+    bob_region = df[df['bank_name'] == focus_bank]['region'].value_counts()
+    bob_region.plot(kind='pie', ax=axes[1], autopct='%1.1f%%',
+                    colors=['#3498db', '#e74c3c'], startangle=90)
+    axes[1].set_title(f'{focus_bank}: Baku vs Regions', fontsize=12, fontweight='bold')
+    axes[1].set_ylabel('')
+
+    # Percentage in regions
+    region_pct = region_dist.div(region_dist.sum(axis=1), axis=0) * 100
+    region_pct['Regions'].sort_values(ascending=True).plot(kind='barh', ax=axes[2], color='#2ecc71')
+    axes[2].set_title('Regional Coverage - % of Branches Outside Baku', fontsize=12, fontweight='bold')
+    axes[2].set_xlabel('Percentage (%)', fontsize=10)
+    axes[2].set_ylabel('Bank', fontsize=10)
+
+    for i, v in enumerate(region_pct['Regions'].sort_values(ascending=True).values):
+        axes[2].text(v + 1, i, f'{v:.1f}%', va='center')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 7 saved")
+    print()
+
+
+@node(title='Chart 8: Competitive Density', params=['focus_bank'], outputs=['charts/08_competitive_density.png'])
+def chart_08(branches, density, competitor_density, focus_bank, path):
+    """Branch density for all banks and the focus bank over competitor density."""
+    print("Generating Chart 8: Competitive Density...")
+    df = branches
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Density for all banks
+    z_all = density['all']
+    scatter1 = ax1.scatter(df['long'], df['lat'], c=z_all, s=65, cmap='YlOrRd', alpha=0.7, edgecolors='white', linewidth=0.5)
+    ax1.set_title('Branch Density Heatmap - All Banks', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Longitude', fontsize=11)
+    ax1.set_ylabel('Latitude', fontsize=11)
+    plt.colorbar(scatter1, ax=ax1, label='Density (per km²)')
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.set_facecolor('#f8f9fa')
+
+    # Focus bank branches overlaid on competition density
+    competitors_df = df[df['bank_name'] != focus_bank]
+    z_comp = competitor_density
+
+    scatter2 = ax2.scatter(competitors_df['long'], competitors_df['lat'],
+                           c=z_comp, s=40, cmap='Blues', alpha=0.5, edgecolors='white', linewidth=0.3)
+    bob_df = df[df['bank_name'] == focus_bank]
+    ax2.scatter(bob_df['long'], bob_df['lat'],
+               s=280, alpha=0.95, color='#e74c3c',
+               edgecolors='black', linewidth=2.5, marker='*',
+               label=focus_bank, zorder=10)
+
+    ax2.set_title(f'{focus_bank} Locations vs Competitor Density', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Longitude', fontsize=11)
+    ax2.set_ylabel('Latitude', fontsize=11)
+    plt.colorbar(scatter2, ax=ax2, label='Competitor Density (per km²)')
+    ax2.legend(fontsize=11, frameon=True, fancybox=True, shadow=True)
+    ax2.grid(True, alpha=0.3, linestyle='--')
+    ax2.set_facecolor('#f8f9fa')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 8 saved")
+    print()
+
+
+@node(title='Chart 9: Gap Analysis', params=['focus_bank'], outputs=['charts/09_gap_analysis.png'])
+def chart_09(branches, gaps, focus_bank, path):
+    """Competitor locations far from the focus bank and the top 15 by distance."""
+    print("Generating Chart 9: Gap Analysis...")
+    df = branches
+    bob_coords = df[df['bank_name'] == focus_bank][['lat', 'long']].values
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Map of gaps
+    ax1.scatter(df['long'], df['lat'], s=20, alpha=0.2, color='gray', label='All branches')
+    ax1.scatter(bob_coords[:, 1], bob_coords[:, 0],
+               s=100, alpha=0.8, color='#e74c3c',
+               edgecolors='black', linewidth=1, marker='s', label=focus_bank, zorder=5)
+    ax1.scatter(gaps['long'], gaps['lat'],
+               s=gaps['distance_to_bob_km']*2, alpha=0.6, color='#f39c12',
+               edgecolors='black', linewidth=1, label='Gap opportunities', zorder=3)
+
+    ax1.set_xlabel('Longitude', fontsize=11)
+    ax1.set_ylabel('Latitude', fontsize=11)
+    ax1.set_title(f'Market Gaps - Competitor Locations Far from {focus_bank}\\n(Larger circles = greater distance)',
+                 fontsize=13, fontweight='bold')
+    ax1.legend(fontsize=10)
+    ax1.grid(True, alpha=0.3)
+
+    # Top gap opportunities - Enhanced horizontal bar chart
+    top_gaps = gaps.head(15).reset_index(drop=True)
+
+    # Create gradient colors (farther = greener, closer = redder)
+    colors_gaps = ['#2ecc71', '#27ae60', '#16a085', '#1abc9c', '#3498db',
+                   '#2980b9', '#8e44ad', '#9b59b6', '#e67e22', '#f39c12',
+                   '#f1c40f', '#e74c3c', '#c0392b', '#d35400', '#c0392b']
+
+    # Reverse for bar chart (top is best)
+    y_positions = range(len(top_gaps)-1, -1, -1)
+    distances = top_gaps['distance_to_bob_km'].values
+
+    bars = ax2.barh(y_positions, distances, color=colors_gaps[:len(top_gaps)],
+                    edgecolor='black', linewidth=1.5, alpha=0.85)
+
+    # Add value labels and bank names
+    for i, (y_pos, distance, bank) in enumerate(zip(y_positions, distances, top_gaps['bank'].values)):
+        # Add distance label at end of bar
+        ax2.text(distance + 2, y_pos, f'{distance:.1f} km',
+                va='center', ha='left', fontweight='bold', fontsize=9)
+
+        # Add bank name inside bar
+        bank_label = bank if len(bank) <= 15 else bank[:13] + '..'
+        ax2.text(distance * 0.5, y_pos, bank_label,
+                va='center', ha='center', fontweight='bold', fontsize=8,
+                color='white', bbox=dict(boxstyle='round,pad=0.3',
+                facecolor='black', alpha=0.3, edgecolor='none'))
+
+    ax2.set_yticks(y_positions)
+    ax2.set_yticklabels([f'#{i+1}' for i in range(len(top_gaps))], fontsize=10, fontweight='bold')
+    ax2.set_xlabel(f'Distance to Nearest {focus_bank} Branch (km)',
+                  fontsize=11, fontweight='bold')
+    ax2.set_ylabel('Opportunity Rank', fontsize=11, fontweight='bold')
+    ax2.set_title(f'Top 15 Expansion Opportunities by Distance\n(Greener bars = farther from {focus_bank} = higher priority)',
+                 fontsize=13, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='x', linestyle='--')
+    ax2.set_facecolor('#f8f9fa')
+
+    # Add average line
+    avg_distance = gaps['distance_to_bob_km'].mean()
+    ax2.axvline(x=avg_distance, color='#e74c3c', linestyle='--',
+               label=f'Average gap: {avg_distance:.1f} km',
+               linewidth=3, zorder=10, alpha=0.9)
+    ax2.legend(fontsize=10, frameon=True, fancybox=True, shadow=True, loc='lower right')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 9 saved")
+    print(f"  Found {len(gaps)} expansion opportunity locations")
+    print()
+
+
+@node(title='Chart 10: Nearest Competitor Analysis', params=['focus_bank'], outputs=['charts/10_nearest_competitor_analysis.png'])
+def chart_10(nearest, focus_bank, path):
+    """Distance to and identity of the nearest competitor of each focus bank branch."""
+    print("Generating Chart 10: Nearest Competitor Analysis...")
+    bob_analysis = nearest
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Distribution of distances - Enhanced histogram
+    n, bins, patches = ax1.hist(bob_analysis['dist_to_competitor_km'], bins=15,
+                                 edgecolor='black', linewidth=1.5, alpha=0.85)
+
+    # Color bars with gradient based on distance (closer = red, farther = green)
+    colors = ['#e74c3c', '#e67e22', '#f39c12', '#f1c40f', '#2ecc71',
+              '#27ae60', '#16a085', '#1abc9c', '#3498db', '#2980b9',
+              '#8e44ad', '#9b59b6', '#34495e', '#7f8c8d', '#95a5a6']
+    for i, patch in enumerate(patches):
+        patch.set_facecolor(colors[i % len(colors)])
+
+    # Add prominent mean and median lines
+    mean_val = bob_analysis['dist_to_competitor_km'].mean()
+    median_val = bob_analysis['dist_to_competitor_km'].median()
+
+    ax1.axvline(mean_val, color='#e74c3c', linestyle='--', linewidth=3.5,
+               label=f'Mean: {mean_val:.2f} km', zorder=10, alpha=0.9)
+    ax1.axvline(median_val, color='#2ecc71', linestyle='--', linewidth=3.5,
+               label=f'Median: {median_val:.2f} km', zorder=10, alpha=0.9)
+
+    # Add value labels on top of bars
+    for i, (count, bin_edge) in enumerate(zip(n, bins[:-1])):
+        if count > 0:
+            ax1.text(bin_edge + (bins[1]-bins[0])/2, count + max(n)*0.02,
+                    int(count), ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    ax1.set_xlabel('Distance to Nearest Competitor (km)',
+                  fontsize=11, fontweight='bold')
+    ax1.set_ylabel(f'Number of {focus_bank} Branches', fontsize=11, fontweight='bold')
+    ax1.set_title(f'{focus_bank}: Distance to Nearest Competitor Distribution\n(Redder bars = closer, Greener bars = farther)',
+                 fontsize=13, fontweight='bold')
+    ax1.legend(fontsize=10, frameon=True, fancybox=True, shadow=True, loc='upper right')
+    ax1.grid(True, alpha=0.3, axis='y', linestyle='--')
+    ax1.set_facecolor('#f8f9fa')
+
+    # Nearest competitor frequency
+    nearest_comp_counts = bob_analysis['nearest_competitor'].value_counts()
+    nearest_comp_counts.plot(kind='barh', ax=ax2, color='#9b59b6')
+    ax2.set_xlabel('Number of Times as Nearest Competitor', fontsize=11)
+    ax2.set_ylabel('Bank Name', fontsize=11)
+    ax2.set_title(f'Most Frequent Direct Competitors to {focus_bank} Branches',
+                 fontsize=13, fontweight='bold')
+
+    for i, v in enumerate(nearest_comp_counts.values):
+        ax2.text(v + 0.2, i, str(v), va='center', fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 10 saved")
+    print()
+
+
+@node(title='Chart 11: Competitive Intensity', params=['focus_bank'], outputs=['charts/11_competitive_intensity.png'])
+def chart_11(intensity, focus_bank, path):
+    """Average competitive intensity by bank and its distribution for the focus bank."""
+    print("Generating Chart 11: Competitive Intensity...")
+
+    intensity_data = intensity
+
+    # Create comparison dataframe
+    intensity_comparison = pd.DataFrame([
+        {
+            'Bank': bank,
+            'Avg_Competitors_Nearby': np.mean(intensities),
+            'Max_Competitors_Nearby': np.max(intensities),
+            'Min_Competitors_Nearby': np.min(intensities)
+        }
+        for bank, intensities in intensity_data.items()
+    ]).sort_values('Avg_Competitors_Nearby', ascending=False)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Average competitive intensity
+    colors = ['#e74c3c' if bank == focus_bank else '#3498db'
+              for bank in intensity_comparison['Bank']]
+    ax1.barh(intensity_comparison['Bank'], intensity_comparison['Avg_Competitors_Nearby'],
+            color=colors)
+    ax1.set_xlabel('Average Number of Competitors Within 10km', fontsize=11)
+    ax1.set_ylabel('Bank', fontsize=11)
+    ax1.set_title('Average Competitive Intensity by Bank', fontsize=13, fontweight='bold')
+
+    for i, v in enumerate(intensity_comparison['Avg_Competitors_Nearby'].values):
+        ax1.text(v + 0.5, i, f'{v:.1f}', va='center', fontweight='bold')
+
+    # Focus bank intensity distribution - Enhanced histogram
+    bob_intensities = intensity_data[focus_bank]
+    n, bins, patches = ax2.hist(bob_intensities, bins=15, edgecolor='black', linewidth=1.5, alpha=0.85)
+
+    # Color bars with gradient: fewer competitors = green (good), more = red (high pressure)
+    colors_intensity = ['#2ecc71', '#27ae60', '#16a085', '#1abc9c', '#3498db',
+                       '#2980b9', '#8e44ad', '#9b59b6', '#e67e22', '#f39c12',
+                       '#f1c40f', '#e74c3c', '#c0392b', '#d35400', '#c0392b']
+    for i, patch in enumerate(patches):
+        patch.set_facecolor(colors_intensity[i % len(colors_intensity)])
+
+    # Add prominent mean and median lines
+    mean_intensity = np.mean(bob_intensities)
+    median_intensity = np.median(bob_intensities)
+
+    ax2.axvline(mean_intensity, color='#e74c3c', linestyle='--', linewidth=3.5,
+               label=f'Mean: {mean_intensity:.1f} competitors', zorder=10, alpha=0.9)
+    ax2.axvline(median_intensity, color='#2ecc71', linestyle='--', linewidth=3.5,
+               label=f'Median: {median_intensity:.1f} competitors', zorder=10, alpha=0.9)
+
+    # Add value labels on top of bars
+    for i, (count, bin_edge) in enumerate(zip(n, bins[:-1])):
+        if count > 0:
+            ax2.text(bin_edge + (bins[1]-bins[0])/2, count + max(n)*0.02,
+                    int(count), ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    ax2.set_xlabel('Number of Competitors Within 10km', fontsize=11, fontweight='bold')
+    ax2.set_ylabel(f'Number of {focus_bank} Branches', fontsize=11, fontweight='bold')
+    ax2.set_title(f'{focus_bank}: Competitive Intensity Distribution\n(Greener bars = lower competition, Redder bars = higher competition)',
+                 fontsize=13, fontweight='bold')
+    ax2.legend(fontsize=10, frameon=True, fancybox=True, shadow=True, loc='upper right')
+    ax2.grid(True, alpha=0.3, axis='y', linestyle='--')
+    ax2.set_facecolor('#f8f9fa')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    bob_avg_intensity = intensity_comparison[intensity_comparison['Bank'] == focus_bank]['Avg_Competitors_Nearby'].values[0]
+
+    print(f"✓ Chart 11 saved")
+    print(f"  {focus_bank} avg competitive intensity: {bob_avg_intensity:.1f} competitors within 10km")
+    print()
+
+
+@node(title='Chart 12: Regional Market Dominance', params=['focus_bank'], outputs=['charts/12_regional_market_dominance.png'])
+def chart_12(branches, zone_analysis, focus_bank, path):
+    """Geographic zones and the focus bank against each zone leader."""
+    print("Generating Chart 12: Regional Market Dominance...")
+    df = branches
+    zone_analysis_df = zone_analysis
+
+    # Analyze market dominance by zone
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+
+    # Left panel: Geographic map with zones colored by dominant bank
+    zone_colors = {
+        'Baku City': '#e74c3c', 'Absheron': '#3498db', 'North': '#2ecc71',
+        'Northwest': '#f39c12', 'Central': '#9b59b6', 'South': '#1abc9c',
+        'West': '#e67e22', 'Other': '#95a5a6'
+    }
+
+    for zone, color in zone_colors.items():
+        zone_data = df[df['zone'] == zone]
+        if len(zone_data) > 0:
+            # Get dominant bank in this zone
+            dominant_bank = zone_data['bank_name'].value_counts().index[0]
+            bob_count_zone = len(zone_data[zone_data['bank_name'] == focus_bank])
+
+            # Plot all branches in this zone
+            ax1.scatter(zone_data['long'], zone_data['lat'],
+                       s=60, alpha=0.6, color=color,
+                       label=f'{zone} ({len(zone_data)} br.)',
+                       edgecolors='white', linewidth=0.5)
+
+    # Highlight focus bank branches on top
+    bob_df = df[df['bank_name'] == focus_bank]
+    ax1.scatter(bob_df['long'], bob_df['lat'],
+               s=200, alpha=0.95, color='#e74c3c',
+               marker='s', edgecolors='black', linewidth=2.5,
+               label=focus_bank, zorder=100)
+
+    ax1.set_xlabel('Longitude', fontsize=11, fontweight='bold')
+    ax1.set_ylabel('Latitude', fontsize=11, fontweight='bold')
+    ax1.set_title(f'Azerbaijan Geographic Zones\n({focus_bank} branches highlighted as red squares)',
+                 fontsize=14, fontweight='bold')
+    ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9,
+              frameon=True, fancybox=True, shadow=True)
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.set_facecolor('#f8f9fa')
+
+    # Right panel: Market share analysis by zone
+
+    # Create grouped bar chart
+    x_pos = np.arange(len(zone_analysis_df))
+    width = 0.35
+
+    bars1 = ax2.bar(x_pos - width/2, zone_analysis_df['BoB_Count'], width,
+                    label=focus_bank, color='#e74c3c', edgecolor='black', linewidth=1.2)
+    bars2 = ax2.bar(x_pos + width/2, zone_analysis_df['Leader_Count'], width,
+                    label='Zone Leader', color='#3498db', edgecolor='black', linewidth=1.2, alpha=0.7)
+
+    ax2.set_xlabel('Geographic Zone', fontsize=11, fontweight='bold')
+    ax2.set_ylabel('Number of Branches', fontsize=11, fontweight='bold')
+    ax2.set_title(f'{focus_bank} vs Zone Leaders\n(Comparison by region)',
+                 fontsize=14, fontweight='bold')
+    ax2.set_xticks(x_pos)
+    ax2.set_xticklabels(zone_analysis_df['Zone'], rotation=45, ha='right', fontsize=10)
+    ax2.legend(fontsize=10, loc='upper right')
+    ax2.grid(True, alpha=0.3, axis='y', linestyle='--')
+    ax2.set_facecolor('#f8f9fa')
+
+    # Add value labels on bars
+    for i, (b1, b2) in enumerate(zip(bars1, bars2)):
+        height1 = b1.get_height()
+        height2 = b2.get_height()
+
+        if height1 > 0:
+            ax2.text(b1.get_x() + b1.get_width()/2., height1,
+                    f'{int(height1)}', ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+        if height2 > 0:
+            # Add leader bank name above bar
+            leader_name = zone_analysis_df.iloc[i]['Leader']
+            if len(leader_name) > 12:
+                leader_name = leader_name[:10] + '..'
+            ax2.text(b2.get_x() + b2.get_width()/2., height2,
+                    f'{int(height2)}\n({leader_name})', ha='center', va='bottom',
+                    fontsize=8, fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    # Print insights
+    print(f"✓ Chart 12 saved")
+    print(f"  Regional Analysis:")
+    for _, row in zone_analysis_df.iterrows():
+        if row['BoB_Count'] > 0:
+            print(f"    {row['Zone']:12s}: {focus_bank} has {int(row['BoB_Count'])} branches ({row['BoB_Share']:.1f}% share, Rank #{row['BoB_Rank']})")
+        else:
+            print(f"    {row['Zone']:12s}: {focus_bank} has NO presence (Leader: {row['Leader']} with {int(row['Leader_Count'])} branches)")
+    print()
+
+
+@node(title='Chart 13a: Growth Opportunity Score (Baku-Absheron)', params=['focus_bank'], outputs=['charts/13a_growth_opportunity_baku_absheron.png'])
+def chart_13a(branches, opportunity_baku, focus_bank, path):
+    """Opportunity heatmap and top expansion sites in Baku-Absheron."""
+    print("Generating Chart 13a: Growth Opportunity Score (Baku-Absheron)...")
+
+    df = branches
+    baku_cities = BAKU_CITIES
+    baku_lat_min, baku_lat_max, baku_long_min, baku_long_max = opportunity_baku['bounds']
+    lat_grid_baku = opportunity_baku['lat_grid']
+    long_grid_baku = opportunity_baku['long_grid']
+    opportunity_scores_baku = opportunity_baku['scores']
+    bob_coords_baku = opportunity_baku['bob_coords']
+    comp_coords_baku = opportunity_baku['comp_coords']
+
+    # Filter data for Baku-Absheron
+    df_baku = df[(df['lat'] >= baku_lat_min) & (df['lat'] <= baku_lat_max) &
+                 (df['long'] >= baku_long_min) & (df['long'] <= baku_long_max)]
+    bob_baku = df_baku[df_baku['bank_name'] == focus_bank]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Heatmap of opportunity scores for Baku
+    im = ax1.contourf(long_grid_baku, lat_grid_baku, opportunity_scores_baku, levels=20, cmap='YlOrRd', alpha=0.8)
+    if len(bob_coords_baku) > 0:
+        ax1.scatter(bob_coords_baku[:, 1], bob_coords_baku[:, 0], s=140, color='#e74c3c',
+                   marker='s', edgecolors='black', linewidth=2.5, label=focus_bank, zorder=5)
+    ax1.scatter(comp_coords_baku[:, 1], comp_coords_baku[:, 0], s=15, color='gray',
+               alpha=0.4, label='Competitors', edgecolors='white', linewidth=0.2)
+
+    # Add city labels for Baku-Absheron on heatmap
+    for city_name, (lat, lon) in baku_cities.items():
+        if baku_lat_min <= lat <= baku_lat_max and baku_long_min <= lon <= baku_long_max:
+            ax1.annotate(city_name, (lon, lat), fontsize=8, fontweight='bold', color='#2c3e50',
+                        ha='center', va='bottom', zorder=15,
+                        bbox=dict(boxstyle='round,pad=0.2', facecolor='white', edgecolor='#3498db', alpha=0.85))
+            ax1.scatter(lon, lat, s=60, color='#3498db', marker='o', edgecolors='white', linewidth=1.5, zorder=10)
+
+    ax1.set_xlabel('Longitude', fontsize=11)
+    ax1.set_ylabel('Latitude', fontsize=11)
+    ax1.set_title('Baku-Absheron: Expansion Opportunity Heatmap\n(Warmer colors = higher opportunity)',
+                 fontsize=13, fontweight='bold')
+    ax1.legend(fontsize=9, frameon=True, fancybox=True, loc='upper right')
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.set_facecolor('#f8f9fa')
+    plt.colorbar(im, ax=ax1, label='Opportunity Score')
+
+    # Top opportunity locations for Baku
+    top_n_baku = 15
+    top_opportunities_baku = opportunity_baku['top']
+
+    # Plot top opportunities for Baku
+    ax2.scatter(df_baku['long'], df_baku['lat'], s=18, alpha=0.2, color='#95a5a6', label='Existing branches')
+    if len(bob_coords_baku) > 0:
+        ax2.scatter(bob_coords_baku[:, 1], bob_coords_baku[:, 0], s=140, color='#e74c3c',
+                   marker='s', edgecolors='black', linewidth=2.5, label=focus_bank, zorder=5)
+
+    # Add city labels for Baku-Absheron on recommendations
+    for city_name, (lat, lon) in baku_cities.items():
+        if baku_lat_min <= lat <= baku_lat_max and baku_long_min <= lon <= baku_long_max:
+            ax2.annotate(city_name, (lon, lat), fontsize=8, fontweight='bold', color='#2c3e50',
+                        ha='center', va='bottom', zorder=15,
+                        bbox=dict(boxstyle='round,pad=0.2', facecolor='white', edgecolor='#3498db', alpha=0.85))
+            ax2.scatter(lon, lat, s=60, color='#3498db', marker='o', edgecolors='white', linewidth=1.5, zorder=8)
+
+    # Plot top 3 opportunities with markers, rest as small dots
+    for i in range(len(top_opportunities_baku)):
+        lat, lon = top_opportunities_baku[i, 0], top_opportunities_baku[i, 1]
+        if i < 3:
+            # Top 3: diamond markers with numbers
+            ax2.scatter(lon, lat, s=200, color='#e74c3c', marker='D', edgecolors='white', linewidth=2, zorder=12)
+            ax2.annotate(str(i+1), (lon, lat), fontsize=9, fontweight='bold', ha='center', va='center',
+                        color='white', zorder=13)
+        else:
+            # Rest: small green dots
+            ax2.scatter(lon, lat, s=40, color='#27ae60', marker='o', edgecolors='white', linewidth=0.5, zorder=10, alpha=0.7)
+
+    # Add dummy scatter for legend
+    ax2.scatter([], [], s=120, color='#e74c3c', marker='D', edgecolors='white', linewidth=2, label='Top 3 priorities')
+    ax2.scatter([], [], s=40, color='#27ae60', marker='o', edgecolors='white', linewidth=0.5, label='Other opportunities')
+
+    ax2.set_xlabel('Longitude', fontsize=11)
+    ax2.set_ylabel('Latitude', fontsize=11)
+    ax2.set_title(f'Baku-Absheron: Top {top_n_baku} Recommended Expansion Locations', fontsize=13, fontweight='bold')
+    ax2.legend(fontsize=9, frameon=True, fancybox=True, shadow=True, loc='upper right')
+    ax2.grid(True, alpha=0.3, linestyle='--')
+    ax2.set_facecolor('#f8f9fa')
+
+    plt.tight_layout()
+
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 13a (Baku-Absheron) saved")
+
+    # Print top 5 Baku-Absheron opportunities
+    print("  Top 5 Baku-Absheron expansion opportunities:")
+    for i in range(min(5, len(top_opportunities_baku))):
+        print(f"    {i+1}. Lat: {top_opportunities_baku[i, 0]:.4f}, Long: {top_opportunities_baku[i, 1]:.4f}")
+    print(f"  Baku-Absheron: {len(df_baku)} total branches, {len(bob_baku)} {focus_bank} branches")
+    print()
+
+
+@node(title='Chart 13b: Growth Opportunity Score (Regions)', params=['focus_bank'], outputs=['charts/13b_growth_opportunity_regions.png'])
+def chart_13b(branches, opportunity_regions, focus_bank, path):
+    """Opportunity heatmap and top expansion sites outside Baku-Absheron."""
+    print("Generating Chart 13b: Growth Opportunity Score (Regions)...")
+
+    df = branches
+    regional_cities = REGIONAL_CITIES
+    baku_lat_min, baku_lat_max = BAKU_ABSHERON_LAT
+    baku_long_min, baku_long_max = BAKU_ABSHERON_LONG
+    region_lat_min, region_lat_max, region_long_min, region_long_max = opportunity_regions['bounds']
+    lat_grid_regions = opportunity_regions['lat_grid']
+    long_grid_regions = opportunity_regions['long_grid']
+    opportunity_scores_regions = opportunity_regions['scores']
+    bob_coords_regions = opportunity_regions['bob_coords']
+    comp_coords_regions = opportunity_regions['comp_coords']
+
+    # Filter data for Regions (outside Baku-Absheron)
+    df_regions = df[~((df['lat'] >= baku_lat_min) & (df['lat'] <= baku_lat_max) &
+                      (df['long'] >= baku_long_min) & (df['long'] <= baku_long_max))]
+    bob_regions = df_regions[df_regions['bank_name'] == focus_bank]
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 7))
+
+    # Heatmap of opportunity scores for Regions
+    im = ax1.contourf(long_grid_regions, lat_grid_regions, opportunity_scores_regions, levels=20, cmap='YlOrRd', alpha=0.8)
+    if len(bob_coords_regions) > 0:
+        ax1.scatter(bob_coords_regions[:, 1], bob_coords_regions[:, 0], s=140, color='#e74c3c',
+                   marker='s', edgecolors='black', linewidth=2.5, label=focus_bank, zorder=5)
+    ax1.scatter(comp_coords_regions[:, 1], comp_coords_regions[:, 0], s=15, color='gray',
+               alpha=0.4, label='Competitors', edgecolors='white', linewidth=0.2)
+
+    # Add major city labels for Regions on heatmap (selected major cities only to avoid clutter)
+    major_regional_cities = ['Gəncə', 'Mingəçevir', 'Lənkəran', 'Şəki', 'Şirvan', 'Xaçmaz', 'Quba',
+                             'Naxçıvan', 'Zaqatala', 'Bərdə', 'Yevlax', 'Şamaxı', 'Masallı', 'Tovuz', 'Qazax', 'Şuşa']
+    for city_name, (lat, lon) in regional_cities.items():
+        if city_name in major_regional_cities:
+            if region_lat_min <= lat <= region_lat_max and region_long_min <= lon <= region_long_max:
+                ax1.annotate(city_name, (lon, lat), fontsize=7, fontweight='bold', color='#2c3e50',
+                            ha='center', va='bottom', zorder=15,
+                            bbox=dict(boxstyle='round,pad=0.2', facecolor='white', edgecolor='#3498db', alpha=0.85))
+                ax1.scatter(lon, lat, s=50, color='#3498db', marker='o', edgecolors='white', linewidth=1.5, zorder=10)
+
+    ax1.set_xlabel('Longitude', fontsize=11)
+    ax1.set_ylabel('Latitude', fontsize=11)
+    ax1.set_title('Regions (Outside Baku): Expansion Opportunity Heatmap\n(Warmer colors = higher opportunity)',
+                 fontsize=13, fontweight='bold')
+    ax1.legend(fontsize=9, frameon=True, fancybox=True, loc='upper right')
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.set_facecolor('#f8f9fa')
+    plt.colorbar(im, ax=ax1, label='Opportunity Score')
+
+    # Top opportunity locations for Regions
+    top_opportunities_regions = opportunity_regions['top']
+
+    # Plot top opportunities for Regions
+    ax2.scatter(df_regions['long'], df_regions['lat'], s=18, alpha=0.2, color='#95a5a6', label='Existing branches')
+    if len(bob_coords_regions) > 0:
+        ax2.scatter(bob_coords_regions[:, 1], bob_coords_regions[:, 0], s=140, color='#e74c3c',
+                   marker='s', edgecolors='black', linewidth=2.5, label=focus_bank, zorder=5)
+
+    # Add major city labels for Regions on recommendations
+    for city_name, (lat, lon) in regional_cities.items():
+        if city_name in major_regional_cities:
+            if region_lat_min <= lat <= region_lat_max and region_long_min <= lon <= region_long_max:
+                ax2.annotate(city_name, (lon, lat), fontsize=7, fontweight='bold', color='#2c3e50',
+                            ha='center', va='bottom', zorder=15,
+                            bbox=dict(boxstyle='round,pad=0.2', facecolor='white', edgecolor='#3498db', alpha=0.85))
+                ax2.scatter(lon, lat, s=50, color='#3498db', marker='o', edgecolors='white', linewidth=1.5, zorder=8)
+
+    # Plot top 3 opportunities with markers, rest as small dots
+    for i in range(len(top_opportunities_regions)):
+        lat, lon = top_opportunities_regions[i, 0], top_opportunities_regions[i, 1]
+        if i < 3:
+            # Top 3: diamond markers with numbers
+            ax2.scatter(lon, lat, s=200, color='#e74c3c', marker='D', edgecolors='white', linewidth=2, zorder=12)
+            ax2.annotate(str(i+1), (lon, lat), fontsize=9, fontweight='bold', ha='center', va='center',
+                        color='white', zorder=13)
+        else:
+            # Rest: small green dots
+            ax2.scatter(lon, lat, s=40, color='#27ae60', marker='o', edgecolors='white', linewidth=0.5, zorder=10, alpha=0.7)
+
+    # Add dummy scatter for legend
+    ax2.scatter([], [], s=120, color='#e74c3c', marker='D', edgecolors='white', linewidth=2, label='Top 3 priorities')
+    ax2.scatter([], [], s=40, color='#27ae60', marker='o', edgecolors='white', linewidth=0.5, label='Other opportunities')
+
+    ax2.set_xlabel('Longitude', fontsize=11)
+    ax2.set_ylabel('Latitude', fontsize=11)
+    ax2.set_title(f'Regions: Top {len(top_opportunities_regions)} Recommended Expansion Locations', fontsize=13, fontweight='bold')
+    ax2.legend(fontsize=9, frameon=True, fancybox=True, shadow=True, loc='upper right')
+    ax2.grid(True, alpha=0.3, linestyle='--')
+    ax2.set_facecolor('#f8f9fa')
+
+    plt.tight_layout()
+
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 13b (Regions) saved")
+
+    # Print top 5 Regional opportunities
+    print("  Top 5 Regional expansion opportunities:")
+    for i in range(min(5, len(top_opportunities_regions))):
+        print(f"    {i+1}. Lat: {top_opportunities_regions[i, 0]:.4f}, Long: {top_opportunities_regions[i, 1]:.4f}")
+    print(f"  Regions: {len(df_regions)} total branches, {len(bob_regions)} {focus_bank} branches")
+    print()
+
+
+@node(title='Chart 14: Multi-Metric Comparison', params=['focus_bank'], outputs=['charts/14_multimetric_comparison.png'])
+def chart_14(multi_metrics, focus_bank, path):
+    """Radar chart and table of the focus bank against the market leaders."""
+    print("Generating Chart 14: Multi-Metric Comparison...")
+
+    metrics_df = multi_metrics
+
+    # Normalize metrics for radar chart
+    metrics_normalized = metrics_df.copy()
+    for col in ['Branch_Count', 'Geographic_Spread', 'Baku_Percentage', 'Avg_Competitive_Intensity']:
+        max_val = metrics_normalized[col].max()
+        if max_val > 0:
+            metrics_normalized[col] = metrics_normalized[col] / max_val * 100
+
+    # Create radar chart
+    categories = ['Branch Count', 'Geographic\\nSpread', 'Baku\\nFocus', 'Competitive\\nIntensity']
+    N = len(categories)
+
+    fig = plt.figure(figsize=(18, 8))
+    ax1 = plt.subplot(121, projection='polar')
+    ax2 = plt.subplot(122)
+
+    angles = [n / float(N) * 2 * np.pi for n in range(N)]
+    angles += angles[:1]
+
+    # Plot each bank
+    for idx, row in metrics_normalized.iterrows():
+        values = row[['Branch_Count', 'Geographic_Spread', 'Baku_Percentage',
+                     'Avg_Competitive_Intensity']].values.tolist()
+        values += values[:1]
+
+        if row['Bank'] == focus_bank:
+            ax1.plot(angles, values, 'o-', linewidth=3, label=row['Bank'], color='#e74c3c')
+            ax1.fill(angles, values, alpha=0.15, color='#e74c3c')
+        else:
+            ax1.plot(angles, values, 'o-', linewidth=1.5, label=row['Bank'], alpha=0.7)
+
+    ax1.set_xticks(angles[:-1])
+    ax1.set_xticklabels(categories, fontsize=10)
+    ax1.set_ylim(0, 100)
+    ax1.set_title(f'Multi-Metric Comparison: {focus_bank} vs Leaders\\n(Normalized to 100)',
+                 fontsize=13, fontweight='bold', pad=20)
+    ax1.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=9)
+    ax1.grid(True)
+
+    # Comparison table
+    ax2.axis('tight')
+    ax2.axis('off')
+
+    table_data = []
+    for idx, row in metrics_df.iterrows():
+        table_data.append([
+            row['Bank'],
+            f"{int(row['Branch_Count'])}",
+            f"{row['Geographic_Spread']:.0f} km",
+            f"{row['Baku_Percentage']:.1f}%",
+            f"{row['Avg_Competitive_Intensity']:.1f}"
+        ])
+
+    table = ax2.table(cellText=table_data,
+                     colLabels=['Bank', 'Branches', 'Geo Spread', 'Baku %', 'Comp. Intensity'],
+                     cellLoc='center',
+                     loc='center',
+                     bbox=[0, 0, 1, 1])
+
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    table.scale(1, 2)
+
+    # Color focus bank row
+    for i, row in enumerate(table_data):
+        if row[0] == focus_bank:
+            for j in range(5):
+                table[(i+1, j)].set_facecolor('#ffcccc')
+
+    # Header style
+    for j in range(5):
+        table[(0, j)].set_facecolor('#3498db')
+        table[(0, j)].set_text_props(weight='bold', color='white')
+
+    ax2.set_title('Detailed Metrics Comparison', fontsize=13, fontweight='bold', pad=20)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 14 saved")
+    print()
+
+
+@node(title='Chart 15: Executive Summary Dashboard', params=['focus_bank'], outputs=['charts/15_executive_summary_dashboard.png'])
+def chart_15(branches, focus, cluster_table, gaps, nearest, intensity, focus_bank, path):
+    """One-page summary of position, opportunities and competition."""
+    print("Generating Chart 15: Executive Summary Dashboard...")
+
+    df = branches
+    bob_count, total_count, bob_region = focus['count'], focus['total'], focus['region']
+    cluster_df = cluster_table.copy()
+    nearest_comp_counts = nearest['nearest_competitor'].value_counts()
+    intensity_data = intensity
+
+    fig = plt.figure(figsize=(18, 10))
+    gs = fig.add_gridspec(2, 3, hspace=0.35, wspace=0.35)
+
+    # 1. Market Position Ranking
+    ax1 = fig.add_subplot(gs[0, 0])
+    top_banks = df['bank_name'].value_counts().head(8)
+    colors_rank = ['#e74c3c' if bank == focus_bank else '#95a5a6' for bank in top_banks.index]
+    bars = ax1.barh(range(len(top_banks)), top_banks.values, color=colors_rank, edgecolor='black', linewidth=1.2)
+    ax1.set_yticks(range(len(top_banks)))
+    ax1.set_yticklabels([f'#{i+1}. {bank}' for i, bank in enumerate(top_banks.index)], fontsize=10)
+    ax1.set_xlabel('Number of Branches', fontsize=11, fontweight='bold')
+    ax1.set_title('Market Position: Branch Count Rankings', fontsize=12, fontweight='bold')
+    ax1.invert_yaxis()
+    for i, v in enumerate(top_banks.values):
+        ax1.text(v + 2, i, str(v), va='center', fontweight='bold', fontsize=10)
+    ax1.grid(True, alpha=0.3, axis='x')
+
+    # 2. Key Metrics Comparison
+    ax2 = fig.add_subplot(gs[0, 1])
+    metric_comparison = pd.DataFrame({
+        'Metric': ['Branches', 'Market\nShare %', 'Regional\nCoverage %'],
+        focus_bank: [bob_count, bob_count/total_count*100, bob_region['Regions']/bob_count*100],
+        'Industry Avg': [
+            df.groupby('bank_name').size().mean(),
+            100/df['bank_name'].nunique(),
+            df.groupby('bank_name')['region'].apply(lambda x: (x=='Regions').sum()/len(x)*100).mean()
+        ]
+    })
+
+    x = np.arange(len(metric_comparison))
+    width = 0.35
+    bars1 = ax2.bar(x - width/2, metric_comparison[focus_bank], width, label=focus_bank,
+                    color='#e74c3c', edgecolor='black', linewidth=1.2)
+    bars2 = ax2.bar(x + width/2, metric_comparison['Industry Avg'], width, label='Industry Avg',
+                    color='#3498db', edgecolor='black', linewidth=1.2)
+    ax2.set_ylabel('Value', fontsize=11, fontweight='bold')
+    ax2.set_title(f'{focus_bank} vs Industry Average', fontsize=12, fontweight='bold')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(metric_comparison['Metric'], fontsize=10)
+    ax2.legend(fontsize=10, loc='upper right')
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    # Add value labels on bars
+    for bars in [bars1, bars2]:
+        for bar in bars:
+            height = bar.get_height()
+            ax2.text(bar.get_x() + bar.get_width()/2., height,
+                    f'{height:.1f}', ha='center', va='bottom', fontsize=8, fontweight='bold')
+
+    # 3. Expansion Opportunities
+    ax3 = fig.add_subplot(gs[0, 2])
+    cluster_df['BoB_Share'] = (cluster_df[focus_bank] / cluster_df['Total Branches'] * 100).fillna(0)
+    opportunity_summary = pd.DataFrame({
+        'Category': ['High Gap\nAreas', 'Underserved\nClusters', 'Regional\nGap'],
+        'Count': [
+            len(gaps),
+            (cluster_df['BoB_Share'] < 5).sum(),
+            df.groupby('bank_name')['region'].apply(lambda x: (x=='Regions').sum()).max() - bob_region['Regions']
+        ]
+    })
+
+    bars = ax3.bar(opportunity_summary['Category'], opportunity_summary['Count'],
+                   color='#f39c12', edgecolor='black', linewidth=1.5, alpha=0.8)
+    ax3.set_ylabel('Number of Opportunities', fontsize=11, fontweight='bold')
+    ax3.set_title('Expansion Opportunities', fontsize=12, fontweight='bold')
+    ax3.tick_params(axis='x', labelsize=10)
+
+    for i, (bar, v) in enumerate(zip(bars, opportunity_summary['Count'])):
+        height = bar.get_height()
+        ax3.text(bar.get_x() + bar.get_width()/2., height,
+                str(int(v)), ha='center', va='bottom', fontweight='bold', fontsize=11)
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    # 4. Baku vs Regional Distribution
+    ax4 = fig.add_subplot(gs[1, 0])
+    bob_region_pct = bob_region / bob_count * 100
+    colors_region = ['#3498db', '#e74c3c']
+    explode_region = [0.05, 0.05]
+    wedges, texts, autotexts = ax4.pie(bob_region_pct.values,
+                                         labels=bob_region_pct.index,
+                                         autopct=lambda pct: f'{pct:.1f}%\n({round(pct / 100 * bob_count)} br.)',
+                                         colors=colors_region,
+                                         explode=explode_region,
+                                         startangle=90,
+                                         textprops={'fontsize': 11, 'fontweight': 'bold'})
+    ax4.set_title(f'{focus_bank}: Geographic Distribution', fontsize=12, fontweight='bold')
+
+    # 5. Direct Competitors
+    ax5 = fig.add_subplot(gs[1, 1])
+    nearest_top5 = nearest_comp_counts.head(5)
+    colors_comp = plt.cm.Set3(range(len(nearest_top5)))
+    wedges, texts, autotexts = ax5.pie(nearest_top5.values,
+                                         labels=nearest_top5.index,
+                                         autopct='%1.0f%%',
+                                         colors=colors_comp,
+                                         startangle=90,
+                                         textprops={'fontsize': 9})
+    ax5.set_title('Most Frequent Direct Competitors', fontsize=12, fontweight='bold')
+
+    # 6. Competitive Intensity Distribution
+    ax6 = fig.add_subplot(gs[1, 2])
+    bob_intensities = intensity_data[focus_bank]
+    ax6.hist(bob_intensities, bins=12, color='#e74c3c', alpha=0.7,
+            edgecolor='black', linewidth=1.5)
+    ax6.axvline(np.mean(bob_intensities), color='black', linestyle='--',
+               linewidth=2.5, label=f'Mean: {np.mean(bob_intensities):.1f}', zorder=5)
+    ax6.set_xlabel('Competitors Within 10km Radius', fontsize=11, fontweight='bold')
+    ax6.set_ylabel(f'Number of {focus_bank} Branches', fontsize=11, fontweight='bold')
+    ax6.set_title('Competitive Intensity Distribution', fontsize=12, fontweight='bold')
+    ax6.legend(fontsize=10, loc='upper right')
+    ax6.grid(True, alpha=0.3, axis='y')
+
+    plt.suptitle(f'{focus_bank} - Executive Summary Dashboard',
+                 fontsize=16, fontweight='bold', y=0.98)
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+    print(f"✓ Chart 15 saved")
+    print()
+
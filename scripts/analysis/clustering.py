@@ -0,0 +1,120 @@
+"""
+Density clustering on great-circle distances.
+
+The expensive part, finding every pair of branches within some radius, is
+done once: a ball tree with the haversine metric builds a sparse
+radius-neighbour graph (distances in km) that the pipeline caches. DBSCAN
+runs on that graph for any eps up to its radius, so eps / min_samples
+sweeps only repeat the cheap labelling step:
+
+    graph = pipeline.value('neighbor_graph')
+    cluster_sweep(graph, eps_values=[10, 20, 50], min_samples_values=[3, 5, 10])
+
+HDBSCAN also runs on the sparse graph. Its hierarchy needs exact core
+distances and a connected graph, so the radius graph gains each point's
+nearest neighbours and the edges of a Delaunay triangulation (which contains
+the minimum spanning tree), all at great-circle length.
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial import Delaunay
+from sklearn.cluster import DBSCAN, HDBSCAN
+from sklearn.neighbors import NearestNeighbors
+
+from .geo import EARTH_RADIUS_KM, haversine_km, project_km
+
+# Distance given to co-located points for HDBSCAN, whose spanning tree
+# (scipy csgraph) treats zero weights as missing edges
+COLOCATED_KM = 1e-6
+
+
+def radius_graph(lat, long, radius_km: float) -> sparse.csr_matrix:
+    """
+    Sparse (n, n) km distances between every pair of points within
+    radius_km. Co-located points keep explicit zero entries.
+    """
+    coords = np.radians(np.column_stack([lat, long]).astype(np.float64))
+    tree = NearestNeighbors(radius=radius_km / EARTH_RADIUS_KM, metric='haversine', algorithm='ball_tree')
+    graph = tree.fit(coords).radius_neighbors_graph(mode='distance')
+    graph.data *= EARTH_RADIUS_KM
+    return graph
+
+
+def dbscan_labels(graph: sparse.csr_matrix, eps_km: float, min_samples: int, graph_radius_km: float = None) -> np.ndarray:
+    """DBSCAN labels (-1 = noise) from a radius graph built with radius >= eps_km."""
+    if graph_radius_km is not None and eps_km > graph_radius_km:
+        raise ValueError(f"eps {eps_km} km exceeds the neighbour graph radius {graph_radius_km} km")
+    return DBSCAN(eps=eps_km, min_samples=min_samples, metric='precomputed').fit(graph).labels_
+
+
+def _backbone_pairs(lat, long) -> np.ndarray:
+    """(m, 2) point pairs joined by an edge of the Delaunay triangulation on a local km projection."""
+    n = len(lat)
+    if n < 3:
+        return np.array([(i, j) for i in range(n) for j in range(i + 1, n)], dtype=np.int64).reshape(-1, 2)
+    # Joggling keeps duplicate and collinear points in the triangulation
+    simplices = Delaunay(project_km(lat, long), qhull_options='QJ').simplices
+    return np.vstack([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]])
+
+
+def hdbscan_graph(lat, long, graph: sparse.csr_matrix, min_samples: int) -> sparse.csr_matrix:
+    """
+    Connected sparse km distance graph for HDBSCAN: the radius graph, each
+    point's min_samples - 1 nearest neighbours and itself (so every core
+    distance is exact), and a Delaunay backbone. Every mutual reachability
+    edge no longer than the graph radius is present, so merges below it are
+    exact; farther clusters join through backbone edges.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    long = np.asarray(long, dtype=np.float64)
+    n = len(lat)
+    coo = graph.tocoo()
+    rows, cols, data = [coo.row, np.arange(n)], [coo.col, np.arange(n)], [coo.data, np.zeros(n)]
+
+    k = min(min_samples - 1, n - 1)
+    if k > 0:
+        tree = NearestNeighbors(n_neighbors=k, metric='haversine', algorithm='ball_tree')
+        distance, neighbour = tree.fit(np.radians(np.column_stack([lat, long]))).kneighbors()
+        rows.append(np.repeat(np.arange(n), k))
+        cols.append(neighbour.ravel())
+        data.append(distance.ravel() * EARTH_RADIUS_KM)
+
+    pairs = _backbone_pairs(lat, long)
+    rows.append(pairs[:, 0])
+    cols.append(pairs[:, 1])
+    data.append(haversine_km(lat[pairs[:, 0]], long[pairs[:, 0]], lat[pairs[:, 1]], long[pairs[:, 1]]))
+
+    # Symmetric, one entry per pair; co-located points COLOCATED_KM apart
+    row = np.concatenate(rows + cols).astype(np.int64)
+    col = np.concatenate(cols + rows).astype(np.int64)
+    data = np.concatenate(data + data)
+    data = np.where(row == col, 0.0, np.maximum(data, COLOCATED_KM))
+    _, first = np.unique(row * n + col, return_index=True)
+    return sparse.csr_matrix((data[first], (row[first], col[first])), shape=(n, n))
+
+
+def hdbscan_labels(lat, long, graph: sparse.csr_matrix, min_cluster_size: int) -> np.ndarray:
+    """HDBSCAN labels (-1 = noise) on the sparse hdbscan_graph of a radius graph; min_samples = min_cluster_size."""
+    connected = hdbscan_graph(lat, long, graph, min_cluster_size)
+    return HDBSCAN(min_cluster_size=min_cluster_size, metric='precomputed', copy=False).fit(connected).labels_
+
+
+def cluster_sweep(graph: sparse.csr_matrix, eps_values: Iterable[float], min_samples_values: Iterable[int]) -> pd.DataFrame:
+    """Cluster count, noise and largest cluster for each eps (km) / min_samples pair."""
+    rows = []
+    for eps_km in eps_values:
+        for min_samples in min_samples_values:
+            labels = dbscan_labels(graph, eps_km, min_samples)
+            sizes = np.bincount(labels[labels >= 0]) if (labels >= 0).any() else np.zeros(0, dtype=int)
+            rows.append({
+                'eps_km': eps_km,
+                'min_samples': min_samples,
+                'clusters': len(sizes),
+                'noise': int((labels < 0).sum()),
+                'largest': int(sizes.max()) if len(sizes) else 0,
+            })
+    return pd.DataFrame(rows)
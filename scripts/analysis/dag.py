@@ -0,0 +1,540 @@
+"""
+Computation graph with an on-disk result cache.
+
+Every metric, chart and report is a node: a function whose keyword arguments
+name the nodes it depends on. A node's cache key hashes
+    - its name, its source code and the module constants, helper functions
+      and classes (with their methods) it reads,
+    - the pipeline parameters it declares,
+    - the content hashes of the values its dependencies produced.
+A value that is an object of one of the package's classes also hashes that
+class's code. Keys use dependency *values*, not dependency keys, so a node
+that recomputes but yields the same result does not invalidate anything
+downstream. After a one-bank refresh only the metrics that actually change,
+and the charts that read them, are redone.
+
+Nodes that write files (charts, reports) only read finished metrics, so they
+are rendered last, in a process pool. Workers receive cache file paths rather
+than values and memory-map the arrays they need, so large inputs are shared
+through the page cache instead of being copied into every process.
+
+Variants of one analysis (e.g. one per focus bank) are forks of a pipeline:
+a fork keeps every resolved node that its changed parameters cannot affect,
+and run_pipelines renders the files of all of them in a single pool.
+
+Cache layout (data/analysis_cache/):
+    <node>/<key>.json   value hash and hashes of the files the node wrote
+    <node>/<key>.pkl    pickled value, with its arrays stored out of band in
+    <node>/<key>.buf    raw array buffers, memory-mapped on load
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_DIR = "data/analysis_cache"
+
+# Directory of this package and of the script modules beside it (analytics_export, ...)
+_PACKAGE = __name__.split('.')[0]
+_SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Buffer alignment inside .buf files, so mapped arrays start on cache lines
+BUFFER_ALIGN = 64
+
+
+def fingerprint(value) -> str:
+    """Content hash of a node value; stable across runs and processes."""
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()[:32]
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(b'frame')
+        digest.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(b'series')
+        digest.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.shape, str(value.dtype))).encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b'dict')
+        for key in value:
+            _update(digest, key)
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(type(value).__name__.encode('utf-8'))
+        for item in value:
+            _update(digest, item)
+    elif value is None or isinstance(value, (str, int, float, bool, np.generic)):
+        digest.update(repr(value).encode('utf-8'))
+    else:
+        # Objects of our own classes also hash the class code, since their methods shape downstream results
+        if _is_local(type(value)):
+            digest.update(code_fingerprint(type(value)).encode('utf-8'))
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _code_names(code) -> set:
+    """Global names read by a code object, including nested functions."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def _is_local(obj) -> bool:
+    """Whether a function or class is defined in this package or a script module beside it."""
+    module_name = getattr(obj, '__module__', None) or ''
+    if module_name.split('.')[0] == _PACKAGE:
+        return True
+    path = getattr(sys.modules.get(module_name), '__file__', None)
+    return path is not None and os.path.dirname(os.path.abspath(path)) == _SCRIPTS_DIR
+
+
+def _class_functions(cls) -> List[Callable]:
+    """Plain functions behind a class's methods, static/class methods and properties."""
+    functions = []
+    for member in vars(cls).values():
+        if isinstance(member, (staticmethod, classmethod)):
+            member = member.__func__
+        if isinstance(member, property):
+            functions.extend(f for f in (member.fget, member.fset, member.fdel) if f is not None)
+        elif inspect.isfunction(member):
+            functions.append(member)
+    return functions
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(func: Callable) -> str:
+    """
+    Hash of a function's or class's source plus the module-level constants,
+    helper functions and classes it reads (those of this package and the
+    scripts beside it, followed recursively through class methods and base
+    classes), so editing a palette, a threshold, a shared routine or a method
+    invalidates it.
+    """
+    parts = []
+    seen = set()
+    pending = [func]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        parts.append(inspect.getsource(current))
+        if inspect.isclass(current):
+            functions = _class_functions(current)
+            pending.extend(base for base in current.__bases__ if _is_local(base))
+        else:
+            functions = [current]
+        names = set()
+        for function in functions:
+            names |= {(function.__module__, name) for name in _code_names(function.__code__)}
+        namespaces = {function.__module__: function.__globals__ for function in functions}
+        for module_name, name in sorted(names):
+            value = namespaces[module_name].get(name)
+            if isinstance(value, (str, int, float, bool, tuple, list, dict)):
+                parts.append(f'{name}={value!r}')
+            elif (inspect.isfunction(value) or inspect.isclass(value)) and _is_local(value):
+                pending.append(value)
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _BufferPickler(pickle.Pickler):
+    """Pickles np.memmap views (e.g. from the coordinate store) like plain arrays,
+    so their data also goes out of band instead of being copied into the pickle."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, np.memmap):
+            return np.asarray(obj).__reduce_ex__(5)
+        return NotImplemented
+
+
+def _write_atomic(path: str, write: Callable):
+    """Write a file through a temporary sibling, so readers (and maps) never see it half written."""
+    temp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp, 'wb') as f:
+            write(f)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def save_value(path: str, value):
+    """
+    Pickle a value to path (.pkl). Array buffers go out of band to the .buf
+    sidecar, so load_value can map them instead of reading them into memory.
+    Both files are replaced atomically; a process still mapping an earlier
+    .buf keeps reading the old contents.
+    """
+    buffers = []
+    data = io.BytesIO()
+    _BufferPickler(data, protocol=5, buffer_callback=buffers.append).dump(value)
+    data = data.getvalue()
+    stem = os.path.splitext(path)[0]
+
+    layout = []
+
+    def write_buffers(f):
+        offset = 0
+        for buffer in buffers:
+            raw = buffer.raw()
+            padding = -offset % BUFFER_ALIGN
+            f.write(b'\0' * padding)
+            offset += padding
+            f.write(raw)
+            layout.append((offset, raw.nbytes))
+            offset += raw.nbytes
+
+    if buffers:
+        _write_atomic(stem + '.buf', write_buffers)
+    _write_atomic(path, lambda f: pickle.dump((layout, data), f, protocol=5))
+
+
+def load_value(path: str):
+    """Load a value written by save_value; its arrays are read-only memory maps."""
+    with open(path, 'rb') as f:
+        layout, data = pickle.load(f)
+    buffers = []
+    if layout:
+        mapped = np.memmap(os.path.splitext(path)[0] + '.buf', dtype=np.uint8, mode='r')
+        buffers = [mapped[offset:offset + size] for offset, size in layout]
+    return pickle.loads(data, buffers=buffers)
+
+
+def _render(name: str, inputs: Dict[str, str], params: Dict, outputs: List[str]) -> Tuple:
+    """
+    Worker entry point: run one file-writing node from cached inputs.
+    Returns its value, value hash, output hashes, run time and printed output.
+    """
+    n = REGISTRY[name]
+    kwargs = {dep: load_value(path) for dep, path in inputs.items()}
+    kwargs.update({p: params[p] for p in n.params})
+    kwargs['path'] = outputs[0]
+
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        value = n.func(**kwargs)
+    elapsed = time.perf_counter() - start
+    return value, fingerprint(value), {path: file_sha256(path) for path in outputs}, elapsed, log.getvalue()
+
+
+class Node:
+    """One step of the analysis: a function plus what its result depends on."""
+
+    def __init__(self, func: Callable, name: str, title: str, params: Tuple[str, ...],
+                 outputs: Tuple[str, ...], cache: bool):
+        self.func = func
+        self.name = name
+        self.title = title
+        self.params = params
+        self.outputs = outputs
+        self.cache = cache
+
+        signature = inspect.signature(func)
+        reserved = set(params) | ({'path'} if outputs else set())
+        self.deps = tuple(arg for arg in signature.parameters if arg not in reserved)
+        self.code_hash = code_fingerprint(func)
+
+    def __repr__(self):
+        return f"Node({self.name})"
+
+
+# Every node defined with @node, by name
+REGISTRY: Dict[str, Node] = {}
+
+
+def node(name: Optional[str] = None, title: Optional[str] = None, params: Iterable[str] = (),
+         outputs: Iterable[str] = (), cache: bool = True):
+    """
+    Register a function as a graph node. Its arguments are its dependencies,
+    except those listed in params (taken from the pipeline parameters) and
+    `path`, which receives the first output file of nodes that write files.
+    """
+    def register(func: Callable) -> Callable:
+        n = Node(func, name or func.__name__, title or (name or func.__name__),
+                 tuple(params), tuple(outputs), cache)
+        if n.name in REGISTRY:
+            raise ValueError(f"Duplicate analysis node: {n.name}")
+        REGISTRY[n.name] = n
+        return func
+    return register
+
+
+class Pipeline:
+    """
+    Resolves nodes in dependency order, reusing cached results where valid.
+    With force=True every node that is needed recomputes (and re-caches).
+    With output_dir, files are written under that directory instead of
+    relative to the working directory.
+    """
+
+    def __init__(self, params: Optional[Dict] = None, cache_dir: str = CACHE_DIR,
+                 nodes: Optional[Dict[str, Node]] = None, force: bool = False,
+                 output_dir: Optional[str] = None):
+        self.params = dict(params or {})
+        self.cache_dir = cache_dir
+        self.force = force
+        self.nodes = nodes if nodes is not None else REGISTRY
+        self.output_dir = output_dir
+
+        self._keys: Dict[str, str] = {}
+        self._hashes: Dict[str, str] = {}
+        self._values: Dict[str, object] = {}
+        # Cache files known to hold their value; shared with forks, which store to the same paths
+        self._stored = set()
+        self.stats = {'computed': [], 'cached': []}
+
+    def _node(self, name: str) -> Node:
+        if name not in self.nodes:
+            raise KeyError(f"Unknown analysis node: {name}")
+        return self.nodes[name]
+
+    def _entry_path(self, n: Node, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, n.name, f'{key}.{ext}')
+
+    def outputs(self, name: str) -> List[str]:
+        """Files a node writes in this pipeline."""
+        n = self._node(name)
+        if self.output_dir is None:
+            return list(n.outputs)
+        return [os.path.join(self.output_dir, path) for path in n.outputs]
+
+    def depends_on(self, name: str, params: Iterable[str]) -> bool:
+        """Whether any of these parameters can change a node's value."""
+        params = set(params)
+        pending, seen = [name], set()
+        while pending:
+            n = self._node(pending.pop())
+            if n.name in seen:
+                continue
+            seen.add(n.name)
+            if params & set(n.params):
+                return True
+            pending.extend(n.deps)
+        return False
+
+    def fork(self, params: Optional[Dict] = None, output_dir: Optional[str] = None) -> 'Pipeline':
+        """
+        A pipeline with some parameters (and the output directory) replaced.
+        Values already resolved here that the changed parameters cannot
+        affect are shared rather than loaded or computed again.
+        """
+        child = Pipeline({**self.params, **(params or {})}, self.cache_dir, self.nodes, self.force,
+                         output_dir if output_dir is not None else self.output_dir)
+        child._stored = self._stored
+        changed = {p for p, value in child.params.items() if self.params.get(p, object()) != value}
+        for name in self._hashes:
+            if self._node(name).outputs or self.depends_on(name, changed):
+                continue
+            child._keys[name] = self._keys[name]
+            child._hashes[name] = self._hashes[name]
+            if name in self._values:
+                child._values[name] = self._values[name]
+        return child
+
+    def key(self, name: str) -> str:
+        """Cache key of a node; resolves (and if needed computes) its dependencies."""
+        if name in self._keys:
+            return self._keys[name]
+
+        n = self._node(name)
+        missing = [p for p in n.params if p not in self.params]
+        if missing:
+            raise KeyError(f"Node {name} needs pipeline parameters: {', '.join(missing)}")
+
+        parts = {
+            'node': n.name,
+            'code': n.code_hash,
+            'params': {p: self.params[p] for p in n.params},
+            'deps': {dep: self.value_hash(dep) for dep in n.deps},
+        }
+        if n.outputs:
+            parts['outputs'] = self.outputs(name)
+        key = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:24]
+        self._keys[name] = key
+        return key
+
+    def value_hash(self, name: str) -> str:
+        """Content hash of a node's value, from the cache when possible."""
+        if name not in self._hashes:
+            self._materialize(name, need_value=False)
+        return self._hashes[name]
+
+    def value(self, name: str):
+        """The value of a node, computing it if it is not cached."""
+        if name not in self._values:
+            self._materialize(name, need_value=True)
+        return self._values[name]
+
+    def _cached_meta(self, n: Node, key: str) -> Optional[Dict]:
+        """Metadata of a usable cache entry, or None."""
+        if not n.cache or self.force:
+            return None
+        meta_path = self._entry_path(n, key, 'json')
+        if not os.path.exists(meta_path) or not os.path.exists(self._entry_path(n, key, 'pkl')):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # Output files must still exist as this node wrote them
+        for path in self.outputs(n.name):
+            if not os.path.exists(path) or file_sha256(path) != meta['outputs'].get(path):
+                return None
+        return meta
+
+    def _use_cached(self, name: str, need_value: bool) -> bool:
+        """Take a node's hash (and value) from the cache; False if it must run."""
+        n = self._node(name)
+        key = self.key(name)
+        meta = self._cached_meta(n, key)
+        if meta is None:
+            return False
+
+        self._hashes[name] = meta['value_hash']
+        if name not in self.stats['cached']:
+            self.stats['cached'].append(name)
+            if n.outputs:
+                print(f"✓ {n.title} unchanged (cached)")
+        if need_value:
+            self._values[name] = load_value(self._entry_path(n, key, 'pkl'))
+        return True
+
+    def _materialize(self, name: str, need_value: bool):
+        if self._use_cached(name, need_value):
+            return
+
+        n = self._node(name)
+        kwargs = {dep: self.value(dep) for dep in n.deps}
+        kwargs.update({p: self.params[p] for p in n.params})
+        paths = self.outputs(name)
+        if paths:
+            kwargs['path'] = paths[0]
+            for path in paths:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        start = time.perf_counter()
+        value = n.func(**kwargs)
+        elapsed = time.perf_counter() - start
+
+        outputs = {path: file_sha256(path) for path in paths}
+        self._record(name, value, fingerprint(value), outputs, elapsed)
+
+    def _record(self, name: str, value, value_hash: str, outputs: Dict[str, str], elapsed: float):
+        """Keep a freshly computed value and write its cache entry."""
+        n = self._node(name)
+        key = self.key(name)
+        self._values[name] = value
+        self._hashes[name] = value_hash
+        self.stats['computed'].append(name)
+
+        if n.cache:
+            os.makedirs(os.path.join(self.cache_dir, n.name), exist_ok=True)
+            path = self._entry_path(n, key, 'pkl')
+            save_value(path, value)
+            self._stored.add(path)
+            meta = {
+                'value_hash': value_hash,
+                'outputs': outputs,
+                'seconds': round(elapsed, 3),
+            }
+            _write_atomic(self._entry_path(n, key, 'json'),
+                          lambda f: f.write(json.dumps(meta, indent=2).encode('utf-8')))
+
+    def _stored_path(self, name: str) -> str:
+        """Path of a node's value on disk, writing it first if needed (uncached nodes)."""
+        n = self._node(name)
+        path = self._entry_path(n, self.key(name), 'pkl')
+        if path not in self._stored and not (n.cache and os.path.exists(path)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            save_value(path, self.value(name))
+        self._stored.add(path)
+        return path
+
+    def pending(self, targets: Iterable[str]) -> List[str]:
+        """
+        Resolve the metrics behind targets (in this process) and return the
+        file-writing targets that are out of date.
+        """
+        pending = []
+        for name in targets:
+            n = self._node(name)
+            if n.outputs and name not in self._hashes:
+                if not self._use_cached(name, need_value=False):
+                    pending.append(name)
+            else:
+                self.value_hash(name)
+        return pending
+
+    def run(self, targets: Iterable[str], workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Bring every target up to date; returns the computed/cached node names.
+        Metrics run in this process; out-of-date charts and reports are then
+        rendered by up to `workers` processes (default: one per CPU).
+        """
+        run_pipelines([self], targets, workers)
+        return self.stats
+
+
+def run_pipelines(pipelines: List[Pipeline], targets: Iterable[str], workers: Optional[int] = None):
+    """
+    Bring targets up to date in each pipeline (e.g. forks for several focus
+    banks). Metrics resolve pipeline by pipeline in this process, then the
+    out-of-date files of all of them share one pool of `workers` processes.
+    """
+    targets = list(targets)
+    jobs = [(pipeline, name) for pipeline in pipelines for name in pipeline.pending(targets)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1 or any(pipeline.nodes is not REGISTRY for pipeline, _ in jobs):
+        for pipeline, name in jobs:
+            pipeline._materialize(name, need_value=False)
+        return
+
+    # Every input is on disk before the first worker starts, so no file is written while it may be mapped
+    submissions = []
+    for pipeline, name in jobs:
+        outputs = pipeline.outputs(name)
+        for path in outputs:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        inputs = {dep: pipeline._stored_path(dep) for dep in pipeline._node(name).deps}
+        submissions.append((pipeline, name, inputs, outputs))
+
+    futures = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for pipeline, name, inputs, outputs in submissions:
+            futures[pool.submit(_render, name, inputs, pipeline.params, outputs)] = (pipeline, name)
+
+        for future in as_completed(futures):
+            value, value_hash, outputs, elapsed, log = future.result()
+            print(log, end='')
+            pipeline, name = futures[future]
+            pipeline._record(name, value, value_hash, outputs, elapsed)
@@ -0,0 +1,148 @@
+"""
+Branch data: the root node of the analysis graph.
+
+Region and zone labels are attached here once, from the boundary polygons in
+data/boundaries.geojson, so every metric and chart works from the same frame.
+The road network (roads.py), the population raster (population.py) and the
+country outline (the 'country' level of the boundary file) are further
+roots, present only when their local files or features are.
+"""
+
+import pandas as pd
+
+from boundaries import BOUNDARY_FILE, ZoneIndex, load_polygons
+from coordinate_store import load_store
+from .dag import node
+from .population import load_population
+from .roads import load_roads
+
+
+CSV_FILE = "data/combined_atms.csv"
+
+# Major cities/areas in Baku-Absheron with coordinates
+BAKU_CITIES = {
+    'Baku Center': (40.4093, 49.8671),
+    'Sumqayit': (40.5855, 49.6317),
+    'Khirdalan': (40.4486, 49.7553),
+    'Binəqədi': (40.4500, 49.8200),
+    'Sabunçu': (40.4400, 49.9450),
+    'Suraxanı': (40.4300, 50.0100),
+    'Nəsimi': (40.3950, 49.8500),
+    'Yasamal': (40.3850, 49.8050),
+    'Xətai': (40.3700, 49.9000),
+    'Qaradağ': (40.3200, 49.9800),
+    'Pirallahı': (40.4800, 50.1400),
+    'Mərdəkan': (40.4950, 50.1500),
+}
+
+# Major cities in Azerbaijan regions with coordinates
+REGIONAL_CITIES = {
+    'Gəncə': (40.6828, 46.3606),
+    'Sumqayıt': (40.5855, 49.6317),
+    'Mingəçevir': (40.7703, 47.0496),
+    'Lənkəran': (38.7536, 48.8511),
+    'Şəki': (41.1919, 47.1706),
+    'Şirvan': (39.9375, 48.9206),
+    'Yevlax': (40.6200, 47.1500),
+    'Xaçmaz': (41.4631, 48.8022),
+    'Şamaxı': (40.6319, 48.6414),
+    'Quba': (41.3611, 48.5128),
+    'Qusar': (41.4275, 48.4303),
+    'Zaqatala': (41.6314, 46.6439),
+    'Qax': (41.4206, 46.9219),
+    'Bərdə': (40.3747, 47.1256),
+    'Ağdam': (39.9914, 46.9928),
+    'Ağdaş': (40.6475, 47.4672),
+    'Göyçay': (40.6533, 47.7406),
+    'Naxçıvan': (39.2089, 45.4122),
+    'Ordubad': (38.9050, 46.0236),
+    'Culfa': (38.9606, 45.6297),
+    'Masallı': (39.0344, 48.6658),
+    'Astara': (38.4561, 48.8750),
+    'Salyan': (39.5936, 48.9836),
+    'Neftçala': (39.3756, 49.2467),
+    'İmişli': (39.8697, 48.0597),
+    'Saatlı': (39.9319, 48.3692),
+    'Sabirabad': (40.0081, 48.4783),
+    'Kürdəmir': (40.3397, 48.1617),
+    'Ucar': (40.5086, 47.6492),
+    'Ağsu': (40.5672, 48.3950),
+    'İsmayıllı': (40.7872, 48.1519),
+    'Qəbələ': (40.9814, 47.8458),
+    'Oğuz': (41.0728, 47.4653),
+    'Balakən': (41.7256, 46.4042),
+    'Tovuz': (40.9925, 45.6286),
+    'Qazax': (41.0922, 45.3656),
+    'Ağstafa': (41.1194, 45.4539),
+    'Samux': (40.7619, 46.4069),
+    'Göygöl': (40.5867, 46.3256),
+    'Daşkəsən': (40.5167, 46.0833),
+    'Gədəbəy': (40.5700, 45.8100),
+    'Şəmkir': (40.8297, 46.0172),
+    'Goranboy': (40.6100, 46.7900),
+    'Tərtər': (40.3439, 46.9328),
+    'Xocalı': (39.9131, 46.7914),
+    'Xocavənd': (39.7900, 47.1100),
+    'Cəbrayıl': (39.3986, 47.0264),
+    'Füzuli': (39.6008, 47.1456),
+    'Zəngilan': (39.0853, 46.6539),
+    'Qubadlı': (39.3450, 46.5800),
+    'Laçın': (39.6378, 46.5461),
+    'Kəlbəcər': (40.1025, 46.0361),
+    'Şuşa': (39.7586, 46.7489),
+    'Xankəndi': (39.8153, 46.7519),
+    'Ağcabədi': (40.0508, 47.4561),
+    'Beyləqan': (39.7742, 47.6183),
+    'Biləsuvar': (39.4597, 48.5494),
+    'Cəlilabad': (39.2081, 48.5017),
+    'Yardımlı': (38.9058, 48.2456),
+    'Lerik': (38.7736, 48.4150),
+    'Siyəzən': (41.0783, 49.1122),
+    'Şabran': (41.2158, 48.9986),
+    'Xızı': (40.9097, 49.0708),
+}
+
+
+@node(name='branches', title='Branch data', cache=False)
+def load_branches():
+    """All branches with numeric coordinates plus one column per boundary level ('region', 'zone', ...)."""
+    print("Loading data...")
+    store = load_store()
+    if store is not None:
+        # Memory-mapped binary copy written by combine.py (already validated)
+        df = store.to_frame()
+    else:
+        df = pd.read_csv(CSV_FILE)
+
+        # Convert coordinates to numeric
+        df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
+        df['long'] = pd.to_numeric(df['long'], errors='coerce')
+
+        # Remove any rows with invalid coordinates
+        df = df.dropna(subset=['lat', 'long'])
+
+    for level, labels in ZoneIndex.from_file(BOUNDARY_FILE).assign(df['lat'].values, df['long'].values).items():
+        df[level] = labels
+
+    print(f"Total branches loaded: {len(df)}")
+    print(f"Banks in dataset: {df['bank_name'].nunique()}")
+    print()
+    return df
+
+
+@node(name='road_graph', title='Road network', cache=False)
+def load_road_graph():
+    """Contracted drive-time graph from data/roads.osm, or None without an extract."""
+    return load_roads()
+
+
+@node(name='population_raster', title='Population raster', cache=False)
+def load_population_raster():
+    """Memory-mapped data/population.tif (or .npy), or None without one."""
+    return load_population()
+
+
+@node(name='country', title='Country outline', cache=False)
+def load_country():
+    """Polygons of the 'country' level of data/boundaries.geojson, or None without one."""
+    return load_polygons('country', BOUNDARY_FILE) or None
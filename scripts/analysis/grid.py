@@ -0,0 +1,156 @@
+"""
+Scoring regular lat/long lattices in memory-bounded chunks, and adaptive
+search for the best sites.
+
+A scorer receives flat lat/long arrays and returns one score per point.
+Inside it every lookup is a batched spatial index query, so a lattice costs
+a few tree queries per chunk instead of a Python call per grid point, and
+peak memory depends on the chunk size, not on the resolution.
+
+refine_sites finds top sites without a lattice: it starts from coarse cells
+and splits only those whose score upper bound can still beat the current
+top N, so evaluations concentrate around the peaks.
+"""
+
+from typing import Callable, Tuple
+
+import numpy as np
+
+from .geo import KM_PER_DEGREE_LAT, haversine_km
+
+
+# Lattice points scored per chunk (a few MB of temporaries)
+CHUNK_POINTS = 1 << 18
+
+# Candidates examined at a time when picking separated top sites
+CANDIDATE_BLOCK = 4096
+
+
+def score_lattice(lat_grid: np.ndarray, long_grid: np.ndarray,
+                  scorer: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                  chunk_points: int = CHUNK_POINTS) -> np.ndarray:
+    """(len(lat_grid), len(long_grid)) scores; row i is latitude lat_grid[i]."""
+    n_long = len(long_grid)
+    scores = np.empty((len(lat_grid), n_long))
+    rows = max(1, chunk_points // n_long)
+    for start in range(0, len(lat_grid), rows):
+        lat_rows = lat_grid[start:start + rows]
+        lat = np.repeat(lat_rows, n_long)
+        long = np.tile(long_grid, len(lat_rows))
+        scores[start:start + len(lat_rows)] = scorer(lat, long).reshape(len(lat_rows), n_long)
+    return scores
+
+
+def _select(order: np.ndarray, coords: Callable, top_n: int, min_separation_km: float,
+            exclude: Callable = None) -> np.ndarray:
+    """Greedy pick along `order` (best first) of up to top_n separated, non-excluded candidates; returns their positions."""
+    chosen = []
+    chosen_lat, chosen_long = [], []
+    for start in range(0, len(order), CANDIDATE_BLOCK):
+        block = order[start:start + CANDIDATE_BLOCK]
+        lat, long = coords(block)
+        if exclude is not None:
+            keep = ~exclude(lat, long)
+            block, lat, long = block[keep], lat[keep], long[keep]
+        for candidate, point_lat, point_long in zip(block, lat, long):
+            if chosen and min_separation_km > 0:
+                if haversine_km(np.asarray(chosen_lat), np.asarray(chosen_long),
+                                point_lat, point_long).min() < min_separation_km:
+                    continue
+            chosen.append(candidate)
+            chosen_lat.append(point_lat)
+            chosen_long.append(point_long)
+            if len(chosen) == top_n:
+                return np.array(chosen)
+    return np.array(chosen, dtype=np.int64)
+
+
+def top_sites(scores: np.ndarray, lat_grid: np.ndarray, long_grid: np.ndarray, top_n: int,
+              min_separation_km: float = 0.0,
+              exclude: Callable[[np.ndarray, np.ndarray], np.ndarray] = None) -> np.ndarray:
+    """
+    Up to top_n (lat, long) lattice points with the highest scores, best first.
+
+    Each site is at least min_separation_km from every better one, so a fine
+    lattice yields distinct locations rather than neighbouring cells of one
+    peak. `exclude(lat, long)` marks points that may not be chosen.
+    """
+    n_long = len(long_grid)
+
+    def coords(cells):
+        return lat_grid[cells // n_long], long_grid[cells % n_long]
+
+    picked = _select(np.argsort(-scores, axis=None, kind='stable'), coords, top_n, min_separation_km, exclude)
+    lat, long = coords(picked)
+    return np.column_stack([lat, long]).reshape(-1, 2)
+
+
+def refine_sites(scorer, bounds: Tuple[float, float, float, float], top_n: int,
+                 min_separation_km: float = 0.0, exclude: Callable = None,
+                 coarse: int = 32, min_cell_km: float = 0.1) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Top sites within bounds (lat_min, lat_max, long_min, long_max) by
+    quadtree branch and bound.
+
+    `scorer(lat, long)` scores points; `scorer.upper_bound(lat_lo, lat_hi,
+    long_lo, long_hi)` bounds the score anywhere in each cell. Every level
+    scores the cell centres, takes the N-th best separated site as the bar,
+    and splits the cells whose bound clears it until they are min_cell_km
+    across. With min_separation_km, cells within reach of a chosen site that
+    scores at least their bound are not split either. A cell is dropped as
+    wholly excluded when `exclude.covers(lat_lo, lat_hi, long_lo, long_hi)`
+    says so, or, if `exclude` has no such method, when all four corners are
+    excluded (exact only for a convex region). Pruning is exact for
+    unseparated sites; with separation a pruned cell could only matter if a
+    later site displaced a chosen one.
+
+    Returns ((n, 2) sites best first, their scores, points evaluated).
+    """
+    lat_min, lat_max, long_min, long_max = bounds
+    half_lat = (lat_max - lat_min) / coarse / 2
+    half_long = (long_max - long_min) / coarse / 2
+    cell_lat = np.repeat(lat_min + (2 * np.arange(coarse) + 1) * half_lat, coarse)
+    cell_long = np.tile(long_min + (2 * np.arange(coarse) + 1) * half_long, coarse)
+
+    pool_lat, pool_long, pool_score = [], [], []
+    picked = np.empty(0, dtype=np.int64)
+    while len(cell_lat):
+        pool_lat.append(cell_lat)
+        pool_long.append(cell_long)
+        pool_score.append(scorer(cell_lat, cell_long))
+        all_lat, all_long, all_score = (np.concatenate(v) for v in (pool_lat, pool_long, pool_score))
+
+        picked = _select(np.argsort(-all_score, kind='stable'), lambda i: (all_lat[i], all_long[i]),
+                         top_n, min_separation_km, exclude)
+        bar = all_score[picked[-1]] if len(picked) == top_n else -np.inf
+
+        # Smallest side of the cells in km (longitude shrinks towards the pole)
+        side_km = 2 * min(half_lat, half_long * np.cos(np.radians(max(abs(lat_min), abs(lat_max))))) * KM_PER_DEGREE_LAT
+        if side_km <= min_cell_km:
+            break
+        bound = scorer.upper_bound(cell_lat - half_lat, cell_lat + half_lat,
+                                   cell_long - half_long, cell_long + half_long)
+        if exclude is not None:
+            if hasattr(exclude, 'covers'):
+                covered = exclude.covers(cell_lat - half_lat, cell_lat + half_lat,
+                                         cell_long - half_long, cell_long + half_long)
+            else:
+                covered = np.all([exclude(cell_lat + dy, cell_long + dx)
+                                  for dy in (-half_lat, half_lat) for dx in (-half_long, half_long)], axis=0)
+            bound = np.where(covered, -np.inf, bound)
+        split = bound > bar
+        if len(picked) and min_separation_km > 0:
+            # A chosen site scoring at least the bound, close enough to
+            # suppress every point of the cell, leaves nothing to find there
+            reach = np.maximum(haversine_km(cell_lat, cell_long, cell_lat - half_lat, cell_long + half_long),
+                               haversine_km(cell_lat, cell_long, cell_lat + half_lat, cell_long + half_long))
+            site_km = haversine_km(cell_lat[:, None], cell_long[:, None], all_lat[picked], all_long[picked])
+            dominated = (site_km + reach[:, None] < min_separation_km) & (all_score[picked] >= bound[:, None])
+            split &= ~dominated.any(axis=1)
+        half_lat, half_long = half_lat / 2, half_long / 2
+        cell_lat = np.repeat(cell_lat[split], 4) + np.tile([-half_lat, -half_lat, half_lat, half_lat], split.sum())
+        cell_long = np.repeat(cell_long[split], 4) + np.tile([-half_long, half_long, -half_long, half_long], split.sum())
+
+    all_lat, all_long, all_score = (np.concatenate(v) for v in (pool_lat, pool_long, pool_score))
+    sites = np.column_stack([all_lat[picked], all_long[picked]]).reshape(-1, 2)
+    return sites, all_score[picked], len(all_score)
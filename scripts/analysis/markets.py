@@ -0,0 +1,354 @@
+"""
+Voronoi market areas.
+
+Every branch site gets the part of the country that is nearer to it than to
+any other site (co-located branches share one site and split its market
+equally), and two sites are Delaunay neighbours when their cells share an
+edge. Cells come from Qhull (scipy.spatial.Voronoi, O(n log n)) on a local
+km projection, with four far ghost sites so every real cell is bounded. Each
+convex cell is clipped against the country polygons by Sutherland-Hodgman,
+the cell being the clip window, and measured with the shoelace formula.
+
+MarketAreas.add and .remove update the diagram for one branch at a time and
+recompute only the cells that change:
+    remove  the cells that change are the removed site's neighbours; they are
+            rebuilt from a Voronoi diagram of those sites and their neighbours
+    add     the cells that change are those with a vertex nearer to the new
+            site than to their own, found by walking the Delaunay graph out
+            from the nearest site; they are rebuilt from a diagram of the new
+            site, those sites and their neighbours
+Both local diagrams hold every site a changed cell can border, so the result
+is the same as a full rebuild, at a cost set by the handful of sites around
+the change rather than the size of the network.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import Voronoi, cKDTree
+
+from boundaries import ZoneIndex
+from .geo import project_km
+
+
+# Ghost sites sit this many times the half-extent of the country from its centre
+GHOST_SCALE = 10.0
+
+
+def _clip(ring: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """The part of an open (m, 2) ring inside a convex counter-clockwise window, by Sutherland-Hodgman."""
+    for a, b in zip(window, np.roll(window, -1, axis=0)):
+        if not len(ring):
+            break
+        side = (b[0] - a[0]) * (ring[:, 1] - a[1]) - (b[1] - a[1]) * (ring[:, 0] - a[0])
+        side_next = np.roll(side, -1)
+        inside, inside_next = side >= 0, side_next >= 0
+        crosses = inside != inside_next
+        t = np.divide(side, side - side_next, out=np.zeros_like(side), where=crosses)
+        following = np.roll(ring, -1, axis=0)
+        # Per edge: the crossing point if it enters or leaves, then its end if that is inside
+        points = np.stack([ring + (following - ring) * t[:, None], following], axis=1)
+        ring = points[np.column_stack([crosses, inside_next])]
+    return ring
+
+
+def _signed_area(ring: np.ndarray) -> float:
+    """Shoelace area of an open (m, 2) ring; positive when counter-clockwise."""
+    if len(ring) < 3:
+        return 0.0
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+class MarketAreas:
+    """Voronoi cells of branch sites clipped to the country, with the Delaunay graph and per-site demand."""
+
+    def __init__(self, lat, long, banks, country: List[List[np.ndarray]],
+                 demand_lat=None, demand_long=None, demand_weights=None):
+        """
+        country: polygons as lists of closed long, lat rings, exterior first
+        (zones.load_polygons). Demand points outside the country are ignored;
+        without demand every site's demand is NaN.
+        """
+        outline = np.vstack([ring for polygon in country for ring in polygon])
+        self.origin = ((outline[:, 1].min() + outline[:, 1].max()) / 2.0,
+                       (outline[:, 0].min() + outline[:, 0].max()) / 2.0)
+
+        # Exterior rings counter-clockwise and holes clockwise, so clipped areas simply add up
+        self.rings = []
+        for polygon in country:
+            for i, ring in enumerate(polygon):
+                xy = project_km(ring[:-1, 1], ring[:-1, 0], self.origin)
+                if (_signed_area(xy) > 0) == (i > 0):
+                    xy = xy[::-1]
+                self.rings.append((xy, xy.min(axis=0), xy.max(axis=0)))
+        self.country_km2 = sum(_signed_area(xy) for xy, _, _ in self.rings)
+        # Point-in-country index in km; also tells which cells lie clear of the border
+        edges = np.vstack([np.hstack([xy, np.roll(xy, -1, axis=0)]) for xy, _, _ in self.rings])
+        self.outline = ZoneIndex({'country': [('in', edges)]}, {'country': 'out'})
+
+        low = np.min([lo for _, lo, _ in self.rings], axis=0)
+        high = np.max([hi for _, _, hi in self.rings], axis=0)
+        centre, reach = (low + high) / 2.0, GHOST_SCALE * (high - low).max()
+        ghosts = centre + reach * np.array([[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [0.0, -1.0]])
+
+        # Sites for every distinct coordinate (ghosts first), then one diagram over all of them
+        lat, long = np.asarray(lat, dtype=np.float64), np.asarray(long, dtype=np.float64)
+        coords, branch_site = np.unique(np.column_stack([lat, long]), axis=0, return_inverse=True)
+        self.n_ghosts = len(ghosts)
+        self.n_sites = self.n_ghosts + len(coords)
+        self._xy = np.vstack([ghosts, project_km(coords[:, 0], coords[:, 1], self.origin)])
+        self.site_key: List[Optional[tuple]] = [None] * self.n_ghosts + [tuple(c) for c in coords.tolist()]
+        self._site_at: Dict[tuple, int] = {key: s for s, key in enumerate(self.site_key) if key is not None}
+        self.site_branches: List[List[int]] = [[] for _ in range(self.n_sites)]
+        self.branch_site: List[int] = (branch_site.ravel() + self.n_ghosts).tolist()
+        self.branch_bank: List[str] = list(banks)
+        for branch, site in enumerate(self.branch_site):
+            self.site_branches[site].append(branch)
+        self.cells: List[Optional[np.ndarray]] = [None] * self.n_sites
+        self.area: List[float] = [0.0] * self.n_sites
+        self.site_demand: List[float] = [0.0] * self.n_sites
+        sites = np.arange(self.n_sites)
+        cells, neighbours = self._voronoi(sites)
+        self.neighbours: List[Set[int]] = [neighbours[s] for s in sites]
+        for s in sites[self.n_ghosts:]:
+            self._set_cell(s, cells[s])
+
+        self.has_demand = demand_weights is not None
+        self.demand_xy = np.zeros((0, 2))
+        self.demand_weights = np.zeros(0)
+        if self.has_demand:
+            dem_lat = np.asarray(demand_lat, dtype=np.float64)
+            dem_long = np.asarray(demand_long, dtype=np.float64)
+            xy = project_km(dem_lat, dem_long, self.origin)
+            inside = self.outline.assign(xy[:, 1], xy[:, 0])['country'] == 'in'
+            self.demand_xy = xy[inside]
+            self.demand_weights = np.asarray(demand_weights, dtype=np.float64)[inside]
+        self.demand_site = np.full(len(self.demand_weights), -1, dtype=np.int64)
+        real = np.arange(self.n_ghosts, self.n_sites)
+        if len(real) and len(self.demand_weights):
+            _, nearest = cKDTree(self.site_xy[real]).query(self.demand_xy)
+            self.demand_site = real[nearest]
+            sums = np.bincount(self.demand_site, weights=self.demand_weights, minlength=len(self.site_xy))
+            self.site_demand = [float(v) for v in sums]
+
+    @property
+    def site_xy(self) -> np.ndarray:
+        """(n_sites, 2) km coordinates of every site, ghosts first."""
+        return self._xy[:self.n_sites]
+
+    def _place(self, lat: float, long: float, bank: str) -> tuple:
+        """Record a branch; (branch id, site, whether the site is new)."""
+        branch = len(self.branch_site)
+        site = self._site_at.get((lat, long))
+        new = site is None
+        if new:
+            site = self.n_sites
+            if site == len(self._xy):
+                self._xy = np.vstack([self._xy, np.zeros_like(self._xy)])
+            self._xy[site] = project_km([lat], [long], self.origin)[0]
+            self.n_sites += 1
+            self.site_key.append((lat, long))
+            self._site_at[(lat, long)] = site
+            self.site_branches.append([])
+            self.neighbours.append(set())
+            self.cells.append(None)
+            self.area.append(0.0)
+            self.site_demand.append(0.0)
+        self.site_branches[site].append(branch)
+        self.branch_site.append(site)
+        self.branch_bank.append(bank)
+        return branch, site, new
+
+    def _voronoi(self, sites: np.ndarray):
+        """Counter-clockwise bounded cells and Delaunay neighbours of a set of sites, among themselves."""
+        diagram = Voronoi(self.site_xy[sites])
+        neighbours = {s: set() for s in sites}
+        for a, b in sites[diagram.ridge_points]:
+            neighbours[a].add(b)
+            neighbours[b].add(a)
+        cells = {}
+        for i, s in enumerate(sites):
+            region = diagram.regions[diagram.point_region[i]]
+            if region and -1 not in region:
+                vertices = diagram.vertices[region]
+                offset = vertices - self.site_xy[s]
+                cells[s] = vertices[np.argsort(np.arctan2(offset[:, 1], offset[:, 0]))]
+        return cells, neighbours
+
+    def _set_cell(self, site: int, cell: np.ndarray):
+        self.cells[site] = cell
+        low, high = cell.min(axis=0), cell.max(axis=0)
+        label = self.outline.box_label('country', low, high)
+        if label is not None:
+            self.area[site] = _signed_area(cell) if label == 'in' else 0.0
+            return
+        self.area[site] = sum(_signed_area(_clip(xy, cell)) for xy, lo, hi in self.rings
+                              if (lo <= high).all() and (low <= hi).all())
+
+    def _relink(self, site: int, neighbours: Set[int]):
+        """Replace a site's neighbour set, keeping the graph symmetric."""
+        for other in self.neighbours[site] - neighbours:
+            self.neighbours[other].discard(site)
+        for other in neighbours - self.neighbours[site]:
+            self.neighbours[other].add(site)
+        self.neighbours[site] = set(neighbours)
+
+    def _rebuild(self, changed: List[int]):
+        """New cells and links of the changed sites from a diagram of them, their neighbours and the ghosts."""
+        local = set(changed) | set(range(self.n_ghosts))
+        for s in changed:
+            local |= self.neighbours[s]
+        cells, neighbours = self._voronoi(np.array(sorted(local)))
+        for s in changed:
+            if s >= self.n_ghosts:
+                self._relink(s, neighbours[s])
+                self._set_cell(s, cells[s])
+
+    def _reassign(self, points: np.ndarray, sites: List[int]):
+        """Move demand points to their nearest of the given sites."""
+        if not len(points):
+            return
+        sites = np.asarray(sites, dtype=np.int64)
+        old = self.demand_site[points]
+        _, nearest = cKDTree(self.site_xy[sites]).query(self.demand_xy[points])
+        self.demand_site[points] = sites[nearest]
+        weights = self.demand_weights[points]
+        changed = np.unique(np.concatenate([old, sites[nearest]]))
+        before = np.bincount(np.searchsorted(changed, old), weights=weights, minlength=len(changed))
+        after = np.bincount(np.searchsorted(changed, sites[nearest]), weights=weights, minlength=len(changed))
+        for site, delta in zip(changed, after - before):
+            if site >= 0:
+                self.site_demand[site] += float(delta)
+
+    def add(self, lat: float, long: float, bank: str) -> int:
+        """Add a branch; returns its id."""
+        branch, site, new = self._place(float(lat), float(long), bank)
+        if not new:
+            return branch
+
+        # Greedy walk to the nearest site (a local minimum on the Delaunay graph is the global one),
+        # then out from it to every cell with a vertex nearer to the new site
+        point = self.site_xy[site]
+        start = next((s for s in self._site_at.values() if s != site), None)
+        affected = []
+        if start is not None:
+            best = ((self.site_xy[start] - point) ** 2).sum()
+            moved = True
+            while moved:
+                moved = False
+                for other in self.neighbours[start]:
+                    dist = ((self.site_xy[other] - point) ** 2).sum()
+                    if dist < best:
+                        start, best, moved = other, dist, True
+            seen, queue = {start}, deque([start])
+            while queue:
+                s = queue.popleft()
+                if s >= self.n_ghosts:
+                    vertices = self.cells[s]
+                    nearer = ((vertices - point) ** 2).sum(axis=1) < ((vertices - self.site_xy[s]) ** 2).sum(axis=1)
+                    if not nearer.any():
+                        continue
+                    affected.append(s)
+                for other in self.neighbours[s] - seen:
+                    seen.add(other)
+                    queue.append(other)
+
+        self._rebuild([site] + affected)
+        if len(self.demand_weights):
+            # Points held by the changed cells, or by no site at all before the first one
+            points = np.flatnonzero(np.isin(self.demand_site, affected + [-1]))
+            self._reassign(points, affected + [site])
+        return branch
+
+    def remove(self, branch: int):
+        """Remove a branch by id."""
+        site = self.branch_site[branch]
+        self.site_branches[site].remove(branch)
+        self.branch_site[branch] = -1
+        if self.site_branches[site]:
+            return
+
+        # The site goes: its neighbours take over its cell
+        del self._site_at[self.site_key[site]]
+        changed = sorted(self.neighbours[site])
+        self._relink(site, set())
+        self.cells[site] = None
+        self.area[site] = 0.0
+        self._rebuild(changed)
+        points = np.flatnonzero(self.demand_site == site)
+        live = [s for s in changed if s >= self.n_ghosts]
+        if len(points) and live:
+            self._reassign(points, live)
+        elif len(points):
+            self.demand_site[points] = -1
+        self.site_demand[site] = 0.0
+
+    def branches(self) -> pd.DataFrame:
+        """
+        Per live branch (index = branch id): bank, area km², demand, and its
+        Delaunay neighbours (branches at neighbouring sites plus co-located
+        ones): all, of the same bank, of other banks, and distinct other banks.
+        """
+        rows = []
+        for branch, site in enumerate(self.branch_site):
+            if site < 0:
+                continue
+            bank = self.branch_bank[branch]
+            share = len(self.site_branches[site])
+            others = [b for b in self.site_branches[site] if b != branch]
+            others += [b for s in self.neighbours[site] for b in self.site_branches[s]]
+            banks = [self.branch_bank[b] for b in others]
+            rivals = [b for b in banks if b != bank]
+            rows.append({
+                'branch': branch,
+                'bank_name': bank,
+                'area_km2': self.area[site] / share,
+                'demand': self.site_demand[site] / share if self.has_demand else np.nan,
+                'neighbours': len(banks),
+                'same_bank_neighbours': len(banks) - len(rivals),
+                'rival_neighbours': len(rivals),
+                'rival_banks': len(set(rivals)),
+            })
+        columns = ['branch', 'bank_name', 'area_km2', 'demand', 'neighbours', 'same_bank_neighbours',
+                   'rival_neighbours', 'rival_banks']
+        return pd.DataFrame(rows, columns=columns).set_index('branch')
+
+    def banks(self, branches: pd.DataFrame = None) -> pd.DataFrame:
+        """Per bank, largest market first: branches, area and demand with their shares, and neighbour mix."""
+        branches = self.branches() if branches is None else branches
+        grouped = branches.groupby('bank_name')
+        table = pd.DataFrame({
+            'branches': grouped.size(),
+            'area_km2': grouped['area_km2'].sum(),
+            'median_area_km2': grouped['area_km2'].median(),
+            'demand': grouped['demand'].sum(min_count=1),
+            'neighbours': grouped['neighbours'].sum(),
+            'rival_neighbours': grouped['rival_neighbours'].sum(),
+        })
+        table['area_share'] = table['area_km2'] / self.country_km2 * 100
+        table['demand_share'] = table['demand'] / self.demand_weights.sum() * 100 if self.has_demand else np.nan
+        table['rival_share'] = table['rival_neighbours'] / table['neighbours'].where(table['neighbours'] > 0) * 100
+        return table.sort_values('area_km2', ascending=False)
+
+    def adjacency(self) -> pd.DataFrame:
+        """Bank x bank count of Delaunay edges between their branches (co-located pairs included)."""
+        names = sorted(set(self.branch_bank[b] for b, s in enumerate(self.branch_site) if s >= 0))
+        code = {name: i for i, name in enumerate(names)}
+        counts = np.zeros((len(names), len(names)), dtype=np.int64)
+        for site in range(self.n_ghosts, self.n_sites):
+            here = [code[self.branch_bank[b]] for b in self.site_branches[site]]
+            for i, a in enumerate(here):
+                for b in here[i + 1:]:
+                    counts[a, b] += 1
+                    counts[b, a] += 1
+            for other in self.neighbours[site]:
+                if other > site:
+                    for a in here:
+                        for b in (code[self.branch_bank[x]] for x in self.site_branches[other]):
+                            counts[a, b] += 1
+                            counts[b, a] += 1
+        counts[np.diag_indices(len(names))] //= 2
+        return pd.DataFrame(counts, index=names, columns=names)
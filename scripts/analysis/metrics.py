@@ -0,0 +1,609 @@
+"""
+Metric nodes: the numbers the charts and reports are drawn from.
+
+Distances are great-circle kilometres (geo.py). Opportunity heatmaps are
+lattices scored in chunks and the top sites come from the quadtree search
+in grid.py.
+
+Nodes about one bank take the `focus_bank` parameter; the rest (neighbour
+graph, clusters, intensity counts, density, nearest rivals, drive-time and
+population catchments, market areas) do not, so pipelines forked for other
+focus banks share them.
+"""
+
+import numpy as np
+import pandas as pd
+
+from boundaries import ZoneIndex
+from .dag import node
+from .clustering import dbscan_labels, hdbscan_labels, radius_graph
+from .density import group_density
+from .geo import (KM_PER_DEGREE_LAT, GeoIndex, haversine_km, nearest_by_group_km, project_km,
+                  radius_counts_by_group_km, unproject_km)
+from .grid import refine_sites, score_lattice
+from .markets import MarketAreas
+from .population import PopulationGrid
+from .roads import HIGHWAY_SPEED_KMH
+from .siting import select_sites
+from .spatial import group_codes
+
+
+# Baku-Absheron boundaries for the opportunity grids (includes Sumqayit)
+BAKU_ABSHERON_LAT = (40.30, 40.65)
+BAKU_ABSHERON_LONG = (49.60, 50.20)
+
+ZONES_ORDER = ['Baku City', 'Absheron', 'North', 'Northwest', 'Central', 'South', 'West']
+
+# Cell size of the drive-time catchment lattice
+DRIVE_GRID_KM = 1.0
+
+# Population grid margin beyond the branches; covers the opportunity radii
+POPULATION_PAD_KM = 50.0
+
+# Straight-line catchments: residents up to this far from their nearest branch
+CATCHMENT_RADIUS_KM = 30.0
+
+# Spacing of the candidate-site lattice for expansion_plan
+EXPANSION_CANDIDATE_KM = 1.0
+
+# Percentiles of the nearest-branch km reported by rival_matrix
+RIVAL_PERCENTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+
+
+@node()
+def branch_counts(branches):
+    """Branches per bank, largest first."""
+    return branches['bank_name'].value_counts()
+
+
+@node(params=['focus_bank'])
+def focus(branches, focus_bank):
+    """The focus bank's size, rank, share and Baku / Regions split."""
+    df = branches
+    bob_count = df[df['bank_name'] == focus_bank].shape[0]
+    total_count = len(df)
+    return {
+        'count': bob_count,
+        'total': total_count,
+        'rank': int((df['bank_name'].value_counts() > bob_count).sum() + 1),
+        'share': bob_count / total_count * 100,
+        'region': df[df['bank_name'] == focus_bank]['region'].value_counts().reindex(['Baku', 'Regions'], fill_value=0),
+    }
+
+
+@node(params=['cluster_graph_radius_km'])
+def neighbor_graph(branches, cluster_graph_radius_km):
+    """Sparse km distances between branches within cluster_graph_radius_km (haversine ball tree)."""
+    return radius_graph(branches['lat'].values, branches['long'].values, cluster_graph_radius_km)
+
+
+@node(params=['cluster_method', 'cluster_eps_km', 'cluster_min_samples', 'cluster_graph_radius_km'])
+def clusters(branches, neighbor_graph, cluster_method, cluster_eps_km, cluster_min_samples, cluster_graph_radius_km):
+    """
+    Regional cluster label of each branch (-1 = outlier): DBSCAN with
+    cluster_eps_km, or HDBSCAN with cluster_min_samples as the minimum
+    cluster size.
+    """
+    if cluster_method == 'hdbscan':
+        return hdbscan_labels(branches['lat'].values, branches['long'].values, neighbor_graph, cluster_min_samples)
+    if cluster_method != 'dbscan':
+        raise ValueError(f"Unknown cluster_method: {cluster_method}")
+    return dbscan_labels(neighbor_graph, cluster_eps_km, cluster_min_samples, cluster_graph_radius_km)
+
+
+@node(params=['focus_bank'])
+def cluster_table(branches, clusters, focus_bank):
+    """Total and focus bank branches per cluster."""
+    df = branches.assign(cluster=clusters)
+    bob_clusters = df[df['bank_name'] == focus_bank]['cluster'].value_counts().sort_index()
+    all_clusters = df['cluster'].value_counts().sort_index()
+
+    return pd.DataFrame({
+        'Total Branches': all_clusters,
+        focus_bank: bob_clusters
+    }).fillna(0)
+
+
+@node(params=['density_bandwidth_km'])
+def density(branches, density_bandwidth_km):
+    """
+    Kernel density (per km^2) at each branch for all banks, and each bank's
+    share of it (columns in order of first appearance).
+    """
+    codes, banks = group_codes(branches['bank_name'].values)
+    by_bank = group_density(branches['lat'].values, branches['long'].values, codes, len(banks), density_bandwidth_km)
+    return {
+        'all': by_bank.sum(axis=1),
+        'by_bank': pd.DataFrame(by_bank, index=branches.index, columns=list(banks)),
+    }
+
+
+@node(params=['focus_bank'])
+def competitor_density(branches, density, focus_bank):
+    """Density (per km^2) of the other banks' branches at each of their branches."""
+    competitors = (branches['bank_name'] != focus_bank).values
+    own = density['by_bank'][focus_bank].values if focus_bank in density['by_bank'] else 0.0
+    share = (density['all'] - own)[competitors]
+    return share * len(branches) / max(competitors.sum(), 1)
+
+
+@node(params=['gap_threshold_km', 'focus_bank'])
+def gaps(branches, gap_threshold_km, focus_bank):
+    """Competitor branches farther than gap_threshold_km from any focus bank branch, farthest first."""
+    df = branches
+    bob_coords = df[df['bank_name'] == focus_bank][['lat', 'long']].values
+    comp_coords = df[df['bank_name'] != focus_bank][['lat', 'long']].values
+    comp_banks = df[df['bank_name'] != focus_bank]['bank_name'].values
+
+    # Calculate distance to nearest focus bank branch
+    distances, indices = GeoIndex(bob_coords[:, 0], bob_coords[:, 1]).nearest(comp_coords[:, 0], comp_coords[:, 1])
+
+    gap_df = pd.DataFrame({
+        'lat': comp_coords[:, 0],
+        'long': comp_coords[:, 1],
+        'bank': comp_banks,
+        'distance_to_bob_km': distances
+    })
+    return gap_df[gap_df['distance_to_bob_km'] > gap_threshold_km].sort_values('distance_to_bob_km', ascending=False)
+
+
+@node(params=['rival_k'])
+def rival_nearest(branches, rival_k):
+    """
+    For every branch, the km to the rival_k nearest branches of each bank
+    (of its own bank: its nearest other branches), from one batched query
+    per bank. Shared by every focus bank.
+    """
+    codes, banks = group_codes(branches['bank_name'].values)
+    dist, idx = nearest_by_group_km(branches['lat'].values, branches['long'].values,
+                                    codes, rival_k, len(banks))
+    return {'banks': np.asarray(banks, dtype=object), 'codes': codes, 'dist': dist, 'idx': idx}
+
+
+def _closest_rival(rival_nearest):
+    """km to and bank code of the nearest branch of any other bank, for every branch."""
+    first = rival_nearest['dist'][:, :, 0].copy()
+    first[np.arange(len(first)), rival_nearest['codes']] = np.inf
+    closest = first.argmin(axis=1)
+    return first[np.arange(len(first)), closest], closest
+
+
+@node()
+def rival_matrix(branches, rival_nearest):
+    """
+    Bank x bank competitive structure, rows are the bank whose branches are
+    measured and columns the bank measured to:
+        p25, median, p75, p90  percentiles of km to the nearest column-bank branch
+        kth_median             median km to the rival_k-th nearest column-bank branch
+        nearest_rival          row-bank branches whose closest rival is the column bank
+        top_rival              the most frequent closest rival of each row bank
+    The diagonal measures a bank's branches against its own other branches.
+    """
+    banks = list(rival_nearest['banks'])
+    labels = rival_nearest['banks'][rival_nearest['codes']]
+    dist = np.where(np.isinf(rival_nearest['dist']), np.nan, rival_nearest['dist'])
+
+    def by_bank(values, q):
+        frame = pd.DataFrame(values, index=branches.index, columns=banks).groupby(labels, sort=False).quantile(q)
+        frame.index.name = 'bank'
+        return frame.reindex(banks)
+
+    matrix = {name: by_bank(dist[:, :, 0], q) for name, q in RIVAL_PERCENTILES.items()}
+    matrix['kth_median'] = by_bank(dist[:, :, -1], 0.5)
+
+    _, closest = _closest_rival(rival_nearest)
+    counts = pd.crosstab(labels, rival_nearest['banks'][closest]).reindex(index=banks, columns=banks, fill_value=0)
+    counts.index.name, counts.columns.name = 'bank', None
+    matrix['nearest_rival'] = counts
+    matrix['top_rival'] = counts.idxmax(axis=1)
+    return matrix
+
+
+@node(params=['focus_bank'])
+def nearest(branches, rival_nearest, focus_bank):
+    """Focus bank branches with the km to and name of the nearest competitor."""
+    df = branches
+    dist_to_comp, closest = _closest_rival(rival_nearest)
+    is_bob = (df['bank_name'] == focus_bank).values
+
+    bob_analysis = df[df['bank_name'] == focus_bank].copy()
+
+    bob_analysis['dist_to_competitor_km'] = dist_to_comp[is_bob]
+    bob_analysis['nearest_competitor'] = rival_nearest['banks'][closest[is_bob]]
+    return bob_analysis
+
+
+@node(params=['intensity_radius_km'])
+def intensity_counts(branches, intensity_radius_km):
+    """
+    Branches of each bank within intensity_radius_km of every branch, from one
+    batched KD-tree query per bank. Rows follow `branches`, columns are banks
+    in order of first appearance.
+    """
+    codes, banks = group_codes(branches['bank_name'].values)
+    counts = radius_counts_by_group_km(branches['lat'].values, branches['long'].values,
+                                       codes, intensity_radius_km, len(banks))
+    return pd.DataFrame(counts, index=branches.index, columns=list(banks))
+
+
+@node()
+def intensity(branches, intensity_counts):
+    """Per bank: for each branch, the number of other branches within intensity_radius_km."""
+    totals = intensity_counts.values.sum(axis=1)
+    banks = branches['bank_name'].values
+    return {bank: totals[banks == bank].tolist() for bank in intensity_counts.columns}
+
+
+@node()
+def intensity_matrix(branches, intensity_counts):
+    """Bank x bank: average branches of the column bank near a branch of the row bank."""
+    matrix = intensity_counts.groupby(branches['bank_name'].values, sort=False).mean()
+    matrix.index.name = 'bank'
+    return matrix
+
+
+@node(params=['drive_minutes'])
+def drive_catchments(branches, road_graph, drive_minutes):
+    """
+    Drive-time catchments on a DRIVE_GRID_KM lattice around the branches:
+    minutes from every cell to the nearest branch by road, which branch that
+    is (-1 beyond drive_minutes), and the catchment area of every branch and
+    bank in km^2. None without a road network.
+    """
+    if road_graph is None:
+        return None
+    lat, long = branches['lat'].values, branches['long'].values
+
+    # Pad by the farthest a drive_minutes trip can reach at the top speed
+    pad_km = drive_minutes / 60.0 * max(HIGHWAY_SPEED_KMH.values())
+    km_per_degree_long = KM_PER_DEGREE_LAT * np.cos(np.radians((lat.min() + lat.max()) / 2.0))
+    lat_axis = np.arange(lat.min() - pad_km / KM_PER_DEGREE_LAT, lat.max() + pad_km / KM_PER_DEGREE_LAT,
+                         DRIVE_GRID_KM / KM_PER_DEGREE_LAT)
+    long_axis = np.arange(long.min() - pad_km / km_per_degree_long, long.max() + pad_km / km_per_degree_long,
+                          DRIVE_GRID_KM / km_per_degree_long)
+    cell_lat, cell_long = np.meshgrid(lat_axis, long_axis, indexing='ij')
+
+    seconds, branch = road_graph.time_to_nearest(lat, long, cell_lat.ravel(), cell_long.ravel(),
+                                                 limit_seconds=drive_minutes * 60.0)
+    cells = np.bincount(branch[branch >= 0], minlength=len(branches))
+    catchment_km2 = pd.Series(cells * DRIVE_GRID_KM ** 2, index=branches.index, name='catchment_km2')
+    return {
+        'lat': lat_axis,
+        'long': long_axis,
+        'minutes': (seconds / 60.0).astype(np.float32).reshape(cell_lat.shape),
+        'branch': branch.astype(np.int32).reshape(cell_lat.shape),
+        'catchment_km2': catchment_km2,
+        'bank_km2': catchment_km2.groupby(branches['bank_name'].values, sort=False).sum().sort_values(ascending=False),
+    }
+
+
+@node(params=['population_cell_km'])
+def population_grid(branches, population_raster, population_cell_km):
+    """
+    Residents of the population raster summed onto a population_cell_km grid
+    reaching POPULATION_PAD_KM beyond the branches. None without a raster.
+    """
+    if population_raster is None:
+        return None
+    lat, long = branches['lat'].values, branches['long'].values
+    pad_lat = POPULATION_PAD_KM / KM_PER_DEGREE_LAT
+    pad_long = POPULATION_PAD_KM / (KM_PER_DEGREE_LAT * np.cos(np.radians(np.abs(lat).max() + pad_lat)))
+    bounds = (lat.min() - pad_lat, lat.max() + pad_lat, long.min() - pad_long, long.max() + pad_long)
+    return PopulationGrid.from_raster(population_raster, bounds, population_cell_km)
+
+
+@node()
+def population_catchments(branches, population_grid, drive_catchments):
+    """
+    Residents served by each branch: those whose nearest branch it is, up to
+    CATCHMENT_RADIUS_KM away, and those in its drive-time catchment (NaN
+    without a road network). None without a population raster.
+    """
+    if population_grid is None:
+        return None
+    lat, long, people = population_grid.cells()
+    dist_km, nearest_branch = GeoIndex(branches['lat'].values, branches['long'].values).nearest(lat, long)
+    near = dist_km <= CATCHMENT_RADIUS_KM
+
+    table = pd.DataFrame({'bank_name': branches['bank_name'].values}, index=branches.index)
+    table['people_nearest'] = np.bincount(nearest_branch[near], weights=people[near], minlength=len(branches))
+    table['people_drive'] = np.nan
+    if drive_catchments is not None:
+        lat_axis, long_axis = drive_catchments['lat'], drive_catchments['long']
+        row = np.round((lat - lat_axis[0]) / (lat_axis[1] - lat_axis[0])).astype(np.int64)
+        col = np.round((long - long_axis[0]) / (long_axis[1] - long_axis[0])).astype(np.int64)
+        on_grid = (row >= 0) & (row < len(lat_axis)) & (col >= 0) & (col < len(long_axis))
+        branch = np.full(len(lat), -1)
+        branch[on_grid] = drive_catchments['branch'][row[on_grid], col[on_grid]]
+        served = branch >= 0
+        table['people_drive'] = np.bincount(branch[served], weights=people[served], minlength=len(branches))
+    return table
+
+
+@node()
+def market_areas(branches, country, population_grid):
+    """
+    Voronoi market area of every branch within the country outline and its
+    Delaunay neighbours (markets.MarketAreas): per branch, per bank, and a
+    bank x bank count of neighbouring branch pairs. Demand is residents of
+    the population grid (NaN without one). None without a 'country' polygon.
+    """
+    if country is None:
+        return None
+    demand = population_grid.cells() if population_grid is not None else (None, None, None)
+    markets = MarketAreas(branches['lat'].values, branches['long'].values, branches['bank_name'].values,
+                          country, *demand)
+    table = markets.branches()
+    table.index = branches.index
+    return {
+        'branches': table,
+        'banks': markets.banks(table),
+        'adjacency': markets.adjacency(),
+        'country_km2': markets.country_km2,
+    }
+
+
+@node(params=['focus_bank'])
+def zone_analysis(branches, focus_bank):
+    """The focus bank's count, share and rank against the leader in each zone."""
+    df = branches
+    zone_market_data = []
+
+    for zone in ZONES_ORDER:
+        zone_df = df[df['zone'] == zone]
+        if len(zone_df) > 0:
+            # Get top 3 banks in this zone
+            top_banks_zone = zone_df['bank_name'].value_counts().head(3)
+            bob_count_zone = len(zone_df[zone_df['bank_name'] == focus_bank])
+            bob_rank_zone = (zone_df['bank_name'].value_counts() > bob_count_zone).sum() + 1 if bob_count_zone > 0 else 0
+
+            zone_market_data.append({
+                'Zone': zone,
+                'Total': len(zone_df),
+                'BoB_Count': bob_count_zone,
+                'BoB_Share': (bob_count_zone / len(zone_df) * 100) if len(zone_df) > 0 else 0,
+                'BoB_Rank': bob_rank_zone if bob_count_zone > 0 else 'N/A',
+                'Leader': top_banks_zone.index[0] if len(top_banks_zone) > 0 else 'N/A',
+                'Leader_Count': top_banks_zone.values[0] if len(top_banks_zone) > 0 else 0
+            })
+
+    return pd.DataFrame(zone_market_data)
+
+
+def _in_box(lat, long, lat_bounds, long_bounds):
+    """Points inside a lat/long bounding box (edges included)."""
+    return (lat >= lat_bounds[0]) & (lat <= lat_bounds[1]) & (long >= long_bounds[0]) & (long <= long_bounds[1])
+
+
+def _in_baku_absheron(lat, long):
+    return _in_box(lat, long, BAKU_ABSHERON_LAT, BAKU_ABSHERON_LONG)
+
+
+class _RegionsMask:
+    """Points the regional search skips: Baku-Absheron, and anywhere outside the country outline."""
+
+    def __init__(self, country):
+        self.outline = ZoneIndex.from_polygons('country', country) if country is not None else None
+
+    def __call__(self, lat, long):
+        lat, long = np.broadcast_arrays(np.asarray(lat, dtype=float), np.asarray(long, dtype=float))
+        masked = _in_baku_absheron(lat, long)
+        if self.outline is not None:
+            outside = self.outline.assign(lat.ravel(), long.ravel())['country'] != 'in'
+            masked = masked | outside.reshape(lat.shape)
+        return masked
+
+    def covers(self, lat_lo, lat_hi, long_lo, long_hi):
+        """Cells wholly inside Baku-Absheron or wholly outside the country."""
+        covered = _in_baku_absheron(lat_lo, long_lo) & _in_baku_absheron(lat_hi, long_hi)
+        if self.outline is not None:
+            covered |= np.array([self.outline.box_label('country', (x0, y0), (x1, y1)) == 'out'
+                                 for y0, y1, x0, x1 in zip(lat_lo, lat_hi, long_lo, long_hi)], dtype=bool)
+        return covered
+
+
+class _OpportunityScore:
+    """
+    distance_weight per degree (~111 km) to the nearest focus bank branch
+    plus count_weight per competitor within radius_km, plus population_weight
+    per 1,000 residents within radius_km when there is a population grid;
+    0 inside `exclude`. Without focus bank branches in the area there is no
+    distance term: every point is equally far from the bank.
+    """
+
+    def __init__(self, bob_coords, comp_coords, distance_weight, count_weight, radius_km, exclude=None,
+                 population=None, population_weight=0.0):
+        self.bob_index = GeoIndex(bob_coords[:, 0], bob_coords[:, 1]) if len(bob_coords) else None
+        self.comp_index = GeoIndex(comp_coords[:, 0], comp_coords[:, 1])
+        self.distance_weight = distance_weight / KM_PER_DEGREE_LAT
+        self.count_weight = count_weight
+        self.radius_km = radius_km
+        self.exclude = exclude
+        self.population = population if population_weight else None
+        self.population_weight = population_weight / 1000.0
+
+    def _distance(self, lat, long) -> np.ndarray:
+        """km to the nearest focus bank branch, or 0 without one."""
+        if self.bob_index is None:
+            return np.zeros(np.shape(lat))
+        dist_km, _ = self.bob_index.nearest(lat, long)
+        return dist_km
+
+    def __call__(self, lat, long):
+        score = (self._distance(lat, long) * self.distance_weight
+                 + self.comp_index.count_within(lat, long, self.radius_km) * self.count_weight)
+        if self.population is not None:
+            score = score + self.population.within(lat, long, self.radius_km) * self.population_weight
+        if self.exclude is not None:
+            score = np.where(self.exclude(lat, long), 0.0, score)
+        return score
+
+    def upper_bound(self, lat_lo, lat_hi, long_lo, long_hi):
+        """Highest score possible anywhere in each cell, from its centre."""
+        lat, long = (lat_lo + lat_hi) / 2, (long_lo + long_hi) / 2
+        # Farthest any point of the cell is from its centre (a corner)
+        reach = np.maximum(haversine_km(lat, long, lat_lo, long_hi), haversine_km(lat, long, lat_hi, long_hi))
+        nearby_max = self.comp_index.count_at_most(lat, long, self.radius_km + reach)
+        bound = nearby_max * self.count_weight
+        if self.bob_index is not None:
+            bound = bound + (self._distance(lat, long) + reach) * self.distance_weight
+        if self.population is not None:
+            bound = bound + self.population.within(lat, long, self.radius_km + reach) * self.population_weight
+        return bound
+
+
+@node(params=['opportunity_resolution', 'population_weight', 'focus_bank'])
+def opportunity_baku(branches, population_grid, opportunity_resolution, population_weight, focus_bank):
+    """
+    Expansion opportunity score on an opportunity_resolution^2 lattice over
+    Baku-Absheron (the heatmap) and the top 15 sites by quadtree search.
+    """
+    df = branches
+    baku_lat_min, baku_lat_max = BAKU_ABSHERON_LAT
+    baku_long_min, baku_long_max = BAKU_ABSHERON_LONG
+
+    df_baku = df[_in_baku_absheron(df['lat'], df['long'])]
+    bob_baku = df_baku[df_baku['bank_name'] == focus_bank]
+    comp_baku = df_baku[df_baku['bank_name'] != focus_bank]
+
+    bob_coords_baku = bob_baku[['lat', 'long']].values
+    comp_coords_baku = comp_baku[['lat', 'long']].values
+
+    lat_grid_baku = np.linspace(baku_lat_min, baku_lat_max, opportunity_resolution)
+    long_grid_baku = np.linspace(baku_long_min, baku_long_max, opportunity_resolution)
+
+    # Distance to nearest focus bank branch (higher = better) plus competitors within
+    # 5km (higher = more demand), plus residents within 5km if weighted - smaller
+    # radius for urban area
+    score_baku = _OpportunityScore(bob_coords_baku, comp_coords_baku, 15, 0.8, 5.0,
+                                   population=population_grid, population_weight=population_weight)
+
+    bounds = (baku_lat_min, baku_lat_max, baku_long_min, baku_long_max)
+    top, top_scores, evaluations = refine_sites(score_baku, bounds, 15, min_separation_km=1.5, min_cell_km=0.01)
+
+    return {
+        'bounds': bounds,
+        'lat_grid': lat_grid_baku,
+        'long_grid': long_grid_baku,
+        'scores': score_lattice(lat_grid_baku, long_grid_baku, score_baku),
+        'bob_coords': bob_coords_baku,
+        'comp_coords': comp_coords_baku,
+        'top': top,
+        'top_scores': top_scores,
+        'evaluations': evaluations,
+    }
+
+
+@node(params=['opportunity_resolution', 'population_weight', 'focus_bank'])
+def opportunity_regions(branches, population_grid, country, opportunity_resolution, population_weight, focus_bank):
+    """
+    Expansion opportunity score on an opportunity_resolution^2 lattice over
+    the regions outside Baku-Absheron (the heatmap) and the top 15 sites by
+    quadtree search. Points outside the country outline, when there is one,
+    score 0 and are not searched.
+    """
+    df = branches
+
+    df_regions = df[~_in_baku_absheron(df['lat'], df['long'])]
+    bob_regions = df_regions[df_regions['bank_name'] == focus_bank]
+    comp_regions = df_regions[df_regions['bank_name'] != focus_bank]
+
+    bob_coords_regions = bob_regions[['lat', 'long']].values
+    comp_coords_regions = comp_regions[['lat', 'long']].values
+
+    # Grid over the entire country minus Baku
+    region_lat_min, region_lat_max = df_regions['lat'].min() - 0.1, df_regions['lat'].max() + 0.1
+    region_long_min, region_long_max = df_regions['long'].min() - 0.1, df_regions['long'].max() + 0.1
+
+    lat_grid_regions = np.linspace(region_lat_min, region_lat_max, opportunity_resolution)
+    long_grid_regions = np.linspace(region_long_min, region_long_max, opportunity_resolution)
+
+    # Distance to nearest focus bank branch plus competitors (and, if weighted,
+    # residents) within 30km - larger radius for rural areas; points within
+    # Baku-Absheron or outside the country score 0
+    mask = _RegionsMask(country)
+    score_regions = _OpportunityScore(bob_coords_regions, comp_coords_regions, 10, 0.5, 30.0,
+                                      exclude=mask,
+                                      population=population_grid, population_weight=population_weight)
+
+    bounds = (region_lat_min, region_lat_max, region_long_min, region_long_max)
+    top, top_scores, evaluations = refine_sites(score_regions, bounds, 15, min_separation_km=15.0,
+                                                exclude=mask, min_cell_km=0.05)
+
+    return {
+        'bounds': bounds,
+        'lat_grid': lat_grid_regions,
+        'long_grid': long_grid_regions,
+        'scores': score_lattice(lat_grid_regions, long_grid_regions, score_regions),
+        'bob_coords': bob_coords_regions,
+        'comp_coords': comp_coords_regions,
+        'top': top,
+        'top_scores': top_scores,
+        'evaluations': evaluations,
+    }
+
+
+@node(params=['expansion_sites', 'expansion_objective', 'expansion_radius_km', 'expansion_method', 'focus_bank'])
+def expansion_plan(branches, population_grid, expansion_sites, expansion_objective, expansion_radius_km,
+                   expansion_method, focus_bank):
+    """
+    The focus bank's next expansion_sites branches, chosen together so their
+    catchments do not overlap (siting.select_sites). Demand is residents of the
+    population grid, or competitor branches without one; candidates are an
+    EXPANSION_CANDIDATE_KM lattice over the demand.
+    """
+    df = branches
+    bob = df[df['bank_name'] == focus_bank]
+    if population_grid is not None:
+        dem_lat, dem_long, weights = population_grid.cells()
+        demand = 'residents'
+    else:
+        comp = df[df['bank_name'] != focus_bank]
+        dem_lat, dem_long, weights = comp['lat'].values, comp['long'].values, np.ones(len(comp))
+        demand = 'competitor branches'
+
+    xy = project_km(dem_lat, dem_long)
+    origin = ((dem_lat.min() + dem_lat.max()) / 2.0, (dem_long.min() + dem_long.max()) / 2.0)
+    x = np.arange(xy[:, 0].min(), xy[:, 0].max() + EXPANSION_CANDIDATE_KM, EXPANSION_CANDIDATE_KM)
+    y = np.arange(xy[:, 1].min(), xy[:, 1].max() + EXPANSION_CANDIDATE_KM, EXPANSION_CANDIDATE_KM)
+    cand_lat, cand_long = unproject_km(np.column_stack([np.tile(x, len(y)), np.repeat(y, len(x))]), origin)
+
+    plan = select_sites(cand_lat, cand_long, dem_lat, dem_long, weights, bob['lat'].values, bob['long'].values,
+                        expansion_sites, expansion_objective, expansion_radius_km, expansion_method)
+    plan['demand'] = demand
+    return plan
+
+
+@node(params=['focus_bank'])
+def multi_metrics(branches, intensity, focus_bank):
+    """Size, spread, Baku focus and competitive intensity of the focus bank and the leaders."""
+    df = branches
+    top_5_banks = df['bank_name'].value_counts().head(5).index
+    if focus_bank not in top_5_banks:
+        comparison_banks = list(top_5_banks[:4]) + [focus_bank]
+    else:
+        comparison_banks = list(top_5_banks)
+
+    metrics = []
+    for bank in comparison_banks:
+        bank_data = df[df['bank_name'] == bank]
+
+        # Geographic spread: north-south plus east-west extent, km
+        xy = project_km(bank_data['lat'].values, bank_data['long'].values)
+        geo_spread = np.ptp(xy[:, 0]) + np.ptp(xy[:, 1])
+
+        # Baku vs Regional
+        baku_pct = (bank_data['region'] == 'Baku').sum() / len(bank_data) * 100
+
+        # Average competitive intensity
+        avg_intensity = np.mean(intensity[bank])
+
+        metrics.append({
+            'Bank': bank,
+            'Branch_Count': len(bank_data),
+            'Geographic_Spread': geo_spread,
+            'Baku_Percentage': baku_pct,
+            'Avg_Competitive_Intensity': avg_intensity
+        })
+
+    return pd.DataFrame(metrics)
@@ -0,0 +1,241 @@
+"""
+Residents from a local population raster.
+
+The raster is a single-band grid in lat/long degrees (e.g. WorldPop 100 m
+people-per-pixel), either
+    data/population.tif   an uncompressed GeoTIFF (strips or tiles; convert
+                          compressed files with
+                          `gdal_translate -co COMPRESS=NONE in.tif data/population.tif`)
+    data/population.npy   a 2-D array, with data/population.json giving
+                          {"west": .., "north": .., "cell_x": .., "cell_y": .., "nodata": ..}
+                          (degrees; rows run north to south)
+Both are memory-mapped and read BLOCK_ROWS rows at a time, so memory stays
+flat whatever the size of the raster.
+
+For the analysis the raster is summed once onto a km grid (PopulationGrid)
+around the branches. Residents within r km of any point are then a sum of
+row prefix sums over the grid rows the disc covers, a few array operations
+per row for a whole batch of points.
+"""
+
+import json
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from .geo import project_km, unproject_km
+
+
+TIFF_FILE = "data/population.tif"
+GRID_FILE = "data/population.npy"
+
+# Raster rows read at a time
+BLOCK_ROWS = 256
+
+# TIFF field types -> struct codes
+_TIFF_TYPES = {1: 'B', 2: 's', 3: 'H', 4: 'I', 5: 'II', 6: 'b', 8: 'h', 9: 'i', 11: 'f', 12: 'd', 16: 'Q'}
+
+# (SampleFormat, BitsPerSample) -> numpy type
+_SAMPLE_TYPES = {
+    (1, 8): 'u1', (1, 16): 'u2', (1, 32): 'u4', (2, 8): 'i1', (2, 16): 'i2', (2, 32): 'i4',
+    (3, 32): 'f4', (3, 64): 'f8',
+}
+
+
+def _tiff_tags(path: str) -> Tuple[str, dict]:
+    """Byte order and the tags of the first image of a classic TIFF."""
+    with open(path, 'rb') as f:
+        order = {b'II': '<', b'MM': '>'}.get(f.read(2))
+        if order is None or struct.unpack(order + 'H', f.read(2))[0] != 42:
+            raise ValueError(f"{path} is not a classic TIFF")
+        f.seek(struct.unpack(order + 'I', f.read(4))[0])
+        tags = {}
+        for _ in range(struct.unpack(order + 'H', f.read(2))[0]):
+            tag, kind, count, value = struct.unpack(order + 'HHI4s', f.read(12))
+            code = _TIFF_TYPES.get(kind)
+            if code is None:
+                continue
+            size = struct.calcsize(order + code) * count
+            if size > 4:
+                here = f.tell()
+                f.seek(struct.unpack(order + 'I', value)[0])
+                value = f.read(size)
+                f.seek(here)
+            if kind == 2:
+                tags[tag] = value[:count].rstrip(b'\0').decode('ascii')
+            else:
+                values = struct.unpack(order + code * count, value[:size])
+                tags[tag] = values if kind != 5 else tuple(a / b for a, b in zip(values[::2], values[1::2]))
+    return order, tags
+
+
+class PopulationRaster:
+    """Memory-mapped population raster read in row windows."""
+
+    def __init__(self, pieces, shape: Tuple[int, int], west: float, north: float,
+                 cell_x: float, cell_y: float, nodata: Optional[float] = None, path: Optional[str] = None):
+        # pieces: (row0, col0, array) blocks that tile the raster
+        self.pieces = pieces
+        self.path = path
+        self.shape = shape
+        self.west, self.north = west, north
+        self.cell_x, self.cell_y = cell_x, cell_y
+        self.nodata = nodata
+
+    def __reduce__(self):
+        # Pickled (and fingerprinted) as the file it maps, never as its pixels
+        stat = os.stat(self.path)
+        return _reopen, (self.path, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def from_tiff(cls, path: str = TIFF_FILE) -> 'PopulationRaster':
+        order, tags = _tiff_tags(path)
+        if tags.get(259, (1,))[0] != 1:
+            raise ValueError(f"{path} is compressed; rewrite it with gdal_translate -co COMPRESS=NONE")
+        if tags.get(277, (1,))[0] != 1:
+            raise ValueError(f"{path} has more than one band")
+        width, height = tags[256][0], tags[257][0]
+        dtype = np.dtype(order + _SAMPLE_TYPES[(tags.get(339, (1,))[0], tags[258][0])])
+
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        pieces = []
+        if 322 in tags:
+            tile_w, tile_h = tags[322][0], tags[323][0]
+            across = -(-width // tile_w)
+            for i, offset in enumerate(tags[324]):
+                tile = raw[offset:offset + tile_w * tile_h * dtype.itemsize].view(dtype).reshape(tile_h, tile_w)
+                row0, col0 = i // across * tile_h, i % across * tile_w
+                pieces.append((row0, col0, tile[:height - row0, :width - col0]))
+        else:
+            rows_per_strip = tags.get(278, (height,))[0]
+            for i, offset in enumerate(tags[273]):
+                rows = min(rows_per_strip, height - i * rows_per_strip)
+                pieces.append((i * rows_per_strip, 0,
+                               raw[offset:offset + rows * width * dtype.itemsize].view(dtype).reshape(rows, width)))
+
+        scale, tie = tags[33550], tags[33922]
+        nodata = float(tags[42113]) if tags.get(42113, '').strip() else None
+        return cls(pieces, (height, width), tie[3] - tie[0] * scale[0], tie[4] + tie[1] * scale[1],
+                   scale[0], scale[1], nodata, path)
+
+    @classmethod
+    def from_npy(cls, path: str = GRID_FILE) -> 'PopulationRaster':
+        with open(os.path.splitext(path)[0] + '.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        data = np.load(path, mmap_mode='r')
+        return cls([(0, 0, data)], data.shape, meta['west'], meta['north'],
+                   meta['cell_x'], meta['cell_y'], meta.get('nodata'), path)
+
+    def window(self, row0: int, row1: int, col0: int = 0, col1: Optional[int] = None) -> np.ndarray:
+        """Residents per pixel in rows row0:row1, columns col0:col1; nodata and negatives read as 0."""
+        col1 = self.shape[1] if col1 is None else col1
+        out = np.zeros((row1 - row0, col1 - col0))
+        for p_row, p_col, piece in self.pieces:
+            r0, r1 = max(row0, p_row), min(row1, p_row + piece.shape[0])
+            c0, c1 = max(col0, p_col), min(col1, p_col + piece.shape[1])
+            if r0 < r1 and c0 < c1:
+                out[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = piece[r0 - p_row:r1 - p_row, c0 - p_col:c1 - p_col]
+        if self.nodata is not None:
+            out[out == self.nodata] = 0.0
+        out[~(out > 0)] = 0.0
+        return out
+
+    def blocks(self, bounds: Tuple[float, float, float, float] = None,
+               block_rows: int = BLOCK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        lat, long and residents of the populated pixels (centres) within
+        bounds (lat_min, lat_max, long_min, long_max), BLOCK_ROWS rows at a time.
+        """
+        rows, cols = (0, self.shape[0]), (0, self.shape[1])
+        if bounds is not None:
+            lat_min, lat_max, long_min, long_max = bounds
+            rows = (max(0, int((self.north - lat_max) / self.cell_y)),
+                    min(self.shape[0], int(np.ceil((self.north - lat_min) / self.cell_y))))
+            cols = (max(0, int((long_min - self.west) / self.cell_x)),
+                    min(self.shape[1], int(np.ceil((long_max - self.west) / self.cell_x))))
+        for row0 in range(rows[0], rows[1], block_rows):
+            row1 = min(row0 + block_rows, rows[1])
+            values = self.window(row0, row1, *cols)
+            r, c = np.nonzero(values)
+            lat = self.north - (row0 + r + 0.5) * self.cell_y
+            long = self.west + (cols[0] + c + 0.5) * self.cell_x
+            yield lat, long, values[r, c]
+
+
+def _reopen(path: str, *stat) -> PopulationRaster:
+    return PopulationRaster.from_npy(path) if path.endswith('.npy') else PopulationRaster.from_tiff(path)
+
+
+def load_population(tiff_path: str = TIFF_FILE, grid_path: str = GRID_FILE) -> Optional[PopulationRaster]:
+    """The local population raster (GeoTIFF first, then .npy), or None without one."""
+    if os.path.exists(tiff_path):
+        return PopulationRaster.from_tiff(tiff_path)
+    if os.path.exists(grid_path):
+        return PopulationRaster.from_npy(grid_path)
+    return None
+
+
+class PopulationGrid:
+    """Residents summed onto a km grid, with disc sums around any point."""
+
+    def __init__(self, people: np.ndarray, origin: Tuple[float, float], x0: float, y0: float, cell_km: float):
+        self.people = people
+        self.origin = origin
+        self.x0, self.y0 = x0, y0
+        self.cell_km = cell_km
+        self.prefix = np.zeros((people.shape[0], people.shape[1] + 1))
+        np.cumsum(people, axis=1, out=self.prefix[:, 1:])
+
+    @classmethod
+    def from_raster(cls, raster: PopulationRaster, bounds: Tuple[float, float, float, float],
+                    cell_km: float) -> 'PopulationGrid':
+        """Sum the raster's pixels (by centre) into cell_km cells covering bounds."""
+        lat_min, lat_max, long_min, long_max = bounds
+        origin = ((lat_min + lat_max) / 2.0, (long_min + long_max) / 2.0)
+        corners = project_km([lat_min, lat_max, lat_min, lat_max], [long_min, long_min, long_max, long_max], origin)
+        x0, y0 = corners[:, 0].min(), corners[:, 1].min()
+        nx = int(np.ceil((corners[:, 0].max() - x0) / cell_km))
+        ny = int(np.ceil((corners[:, 1].max() - y0) / cell_km))
+
+        people = np.zeros(ny * nx)
+        for lat, long, values in raster.blocks(bounds):
+            xy = project_km(lat, long, origin)
+            col = np.floor((xy[:, 0] - x0) / cell_km).astype(np.int64)
+            row = np.floor((xy[:, 1] - y0) / cell_km).astype(np.int64)
+            inside = (col >= 0) & (col < nx) & (row >= 0) & (row < ny)
+            people += np.bincount(row[inside] * nx + col[inside], weights=values[inside], minlength=ny * nx)
+        return cls(people.reshape(ny, nx), origin, x0, y0, cell_km)
+
+    @property
+    def total(self) -> float:
+        return float(self.prefix[:, -1].sum())
+
+    def cells(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """lat, long of the centre and residents of every populated cell."""
+        row, col = np.nonzero(self.people)
+        xy = np.column_stack([self.x0 + (col + 0.5) * self.cell_km, self.y0 + (row + 0.5) * self.cell_km])
+        lat, long = unproject_km(xy, self.origin)
+        return lat, long, self.people[row, col]
+
+    def within(self, lat, long, radius_km) -> np.ndarray:
+        """Residents of the cells whose centre is within radius_km (scalar or per point) of each point."""
+        xy = project_km(lat, long, self.origin)
+        x = (xy[:, 0] - self.x0) / self.cell_km - 0.5
+        y = (xy[:, 1] - self.y0) / self.cell_km - 0.5
+        radius = np.broadcast_to(np.asarray(radius_km, dtype=np.float64) / self.cell_km, x.shape)
+        ny, nx = self.people.shape
+        total = np.zeros(len(x))
+        if not len(x):
+            return total
+        centre_row = np.round(y).astype(np.int64)
+        reach = int(np.ceil(radius.max()))
+        for offset in range(-reach - 1, reach + 2):
+            row = centre_row + offset
+            half = np.sqrt(np.maximum(radius ** 2 - (row - y) ** 2, 0.0))
+            lo = np.maximum(np.ceil(x - half).astype(np.int64), 0)
+            hi = np.minimum(np.floor(x + half).astype(np.int64), nx - 1)
+            use = (np.abs(row - y) <= radius) & (row >= 0) & (row < ny) & (lo <= hi)
+            total[use] += self.prefix[row[use], hi[use] + 1] - self.prefix[row[use], lo[use]]
+        return total
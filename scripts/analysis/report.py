@@ -0,0 +1,245 @@
+"""
+Report nodes: the strategic insights text and the dashboard analytics.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics_export import AnalyticsExporter, branches_needed
+from .dag import node
+
+
+@node(title='Strategic Insights Report', params=['focus_bank'], outputs=['docs/STRATEGIC_INSIGHTS.txt'])
+def strategic_insights(branches, branch_counts, focus, intensity, nearest, gaps, focus_bank, path):
+    """Plain-text recommendations for the focus bank."""
+    print("Generating Strategic Insights Report...")
+    df = branches
+    bob_count, total_count, bob_rank = focus['count'], focus['total'], focus['rank']
+    bob_region = focus['region']
+    bob_avg_intensity = np.mean(intensity[focus_bank])
+    bob_analysis = nearest
+    nearest_comp_counts = nearest['nearest_competitor'].value_counts()
+    nearest_top5 = nearest_comp_counts.head(5)
+    share_needed = branches_needed(total_count, bob_count, 10)
+    phases = [int(share_needed * 0.4), int(share_needed * 0.35)]
+    phases.append(share_needed - sum(phases))
+
+    insights_report = f"""
+================================================================================
+{focus_bank.upper()} - STRATEGIC ANALYSIS & ACTIONABLE INSIGHTS
+================================================================================
+Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+EXECUTIVE SUMMARY
+================================================================================
+
+CURRENT MARKET POSITION:
+• Market Rank: #{bob_rank} out of {df['bank_name'].nunique()} banks
+• Total Branches: {bob_count}
+• Market Share: {bob_count/total_count*100:.1f}%
+• Gap to Market Leader ({branch_counts.index[0]}): {branch_counts.max() - bob_count} branches
+
+GEOGRAPHIC FOOTPRINT:
+• Baku Concentration: {bob_region['Baku']}/{bob_count} branches ({bob_region['Baku']/bob_count*100:.1f}%)
+• Regional Presence: {bob_region['Regions']}/{bob_count} branches ({bob_region['Regions']/bob_count*100:.1f}%)
+• Average Competitive Intensity: {bob_avg_intensity:.1f} competitors within 10km radius
+
+COMPETITIVE LANDSCAPE:
+• Most Frequent Direct Competitors: {', '.join(nearest_comp_counts.head(3).index.tolist())}
+• Average Distance to Nearest Competitor: {bob_analysis['dist_to_competitor_km'].mean():.2f} km
+• Total Market Competitors Identified: {len(gaps)} competitor locations >30km from nearest {focus_bank} branch
+
+================================================================================
+STRATEGIC RECOMMENDATIONS
+================================================================================
+
+1. REGIONAL EXPANSION (PRIORITY: HIGH)
+
+   Current Situation:
+   • {focus_bank}'s regional coverage ({bob_region['Regions']/bob_count*100:.1f}%) is significantly below
+     the industry average ({df.groupby('bank_name')['region'].apply(lambda x: (x=='Regions').sum()/len(x)*100).mean():.1f}%)
+   • Heavy concentration in Baku ({bob_region['Baku']/bob_count*100:.1f}%) limits growth potential
+   • {len(gaps)} high-potential locations identified where competitors operate without {focus_bank} presence
+
+   Recommended Actions:
+   • Prioritize expansion into regional cities with existing competitor presence
+   • Focus on underserved clusters where {focus_bank} market share is below 5%
+   • Target cities like: Ganja, Sumqayit, Lankaran, Mingachevir, Shirvan
+   • Allocate 60% of new branch budget to regional expansion
+
+   Expected Impact:
+   • Increase market coverage by accessing untapped customer segments
+   • Reduce dependency on Baku market
+   • Improve competitive positioning in regional markets
+
+2. STRATEGIC LOCATION SELECTION (PRIORITY: HIGH)
+
+   Current Situation:
+   • Gap Analysis identified {len(gaps)} competitor locations far from {focus_bank} branches
+   • Growth Opportunity Score analysis pinpointed top 20 optimal expansion coordinates
+   • Current branches face high competitive intensity ({bob_avg_intensity:.1f} competitors within 10km)
+
+   Recommended Actions:
+   • Use the Growth Opportunity Heatmap (Chart 13) to identify specific coordinates
+   • Balance two factors: (a) distance from existing {focus_bank} branches, (b) proximity to competitor activity
+   • Prioritize locations with distance >30 km from nearest {focus_bank} branch
+   • Focus on areas with moderate competitor presence (indicates demand but not oversaturation)
+
+   Top Expansion Locations:
+   (Refer to Chart 13 for precise coordinates of top 20 opportunities)
+   • Locations are ranked by combined score of market gap and competitor density
+   • Each location represents validated market demand (competitor presence) without {focus_bank} coverage
+
+   Expected Impact:
+   • Capture market share in underserved areas before competitors expand
+   • Reduce customer travel distance to nearest {focus_bank} branch
+   • Optimal resource allocation with data-driven site selection
+
+3. COMPETITIVE POSITIONING (PRIORITY: MEDIUM)
+
+   Current Situation:
+   • Main competitors in proximity: {', '.join(nearest_top5.index[:3].tolist())}
+   • Average {bob_avg_intensity:.1f} competitors within 10km of each {focus_bank} branch
+   • High competitive intensity in Baku market
+
+   Recommended Actions:
+   • Develop differentiation strategy beyond location convenience
+   • Focus on service excellence, digital banking, and customer experience
+   • Consider specialized branches (e.g., SME-focused, wealth management)
+   • In highly competitive areas, emphasize brand differentiation over proximity
+
+   Expected Impact:
+   • Stronger brand positioning despite fewer branches than leaders
+   • Customer loyalty based on service quality, not just convenience
+   • Better performance metrics per branch
+
+4. MARKET SHARE GROWTH PATH (PRIORITY: MEDIUM)
+
+   Current Situation:
+   • Current market share: {bob_count/total_count*100:.1f}%
+   • To reach 10% market share: Need {share_needed} additional branches
+   • To match #5 position: Need {sorted(branch_counts.values, reverse=True)[4] - bob_count} additional branches
+
+   Recommended Growth Strategy:
+
+   Phase 1 (Year 1): Add {phases[0]} branches
+   • 60% in regional areas (identified gap locations)
+   • 40% in Baku suburbs (underserved neighborhoods)
+   • Focus on quick wins with existing infrastructure support
+
+   Phase 2 (Year 2): Add {phases[1]} branches
+   • Continue regional expansion
+   • Enter new regional clusters identified in cluster analysis
+   • Evaluate Phase 1 performance and adjust strategy
+
+   Phase 3 (Year 3): Add {phases[2]} branches
+   • Fill remaining gaps in network coverage
+   • Optimize branch network based on performance data
+   • Consider branch format innovation (micro-branches, mobile branches)
+
+   Expected Impact:
+   • Achieve 10% market share within 3 years
+   • Balanced growth across Baku and regional markets
+   • Improved competitive position from #{bob_rank} to top 5
+
+5. NETWORK OPTIMIZATION (PRIORITY: LOW)
+
+   Current Situation:
+   • Some branches located in extremely high-competition areas
+   • Potential for underperformance in oversaturated markets
+   • Digital channels can extend reach without physical expansion
+
+   Recommended Actions:
+   • Conduct performance audit of existing {bob_count} branches
+   • Identify underperforming branches (bottom quartile by revenue/customers)
+   • Consider relocating 2-3 underperforming branches to gap areas
+   • Invest in digital banking to serve customers in areas without branches
+   • Implement ATM network expansion as lower-cost alternative in some locations
+
+   Expected Impact:
+   • Improved ROI per branch
+   • Better resource allocation
+   • Extended service coverage with lower capital investment
+
+================================================================================
+KEY PERFORMANCE INDICATORS TO TRACK
+================================================================================
+
+1. Market Share Metrics:
+   • Total branch count vs competitors
+   • Market share percentage (target: 10% within 3 years)
+   • Rank position (target: Top 5 within 3 years)
+
+2. Geographic Coverage:
+   • Regional branch percentage (target: >40% within 2 years)
+   • Number of cities with {focus_bank} presence
+   • Average customer distance to nearest branch
+
+3. Competitive Metrics:
+   • Average competitive intensity per branch
+   • Market gaps closed (target: 50% of identified {len(gaps)} gaps within 3 years)
+   • New branch success rate in gap areas
+
+4. Financial Performance:
+   • Revenue per branch
+   • Customer acquisition cost
+   • Branch ROI by location type (Baku vs Regional)
+
+================================================================================
+CONCLUSION
+================================================================================
+
+{focus_bank} currently holds a modest position in the Azerbaijan banking market
+with {bob_count} branches ({bob_count/total_count*100:.1f}% market share, ranked #{bob_rank}). However, significant
+growth opportunities exist:
+
+STRENGTHS:
+✓ Strong presence in Baku ({bob_region['Baku']} branches)
+✓ Established brand and infrastructure
+✓ Opportunities for strategic expansion with minimal direct competition
+
+OPPORTUNITIES:
+✓ {len(gaps)} identified gap locations with competitor presence but no {focus_bank} branch
+✓ Regional markets significantly underserved (only {bob_region['Regions']/bob_count*100:.1f}% of branches)
+✓ Clear path to 10% market share with {share_needed} strategic branch additions
+
+CHALLENGES:
+⚠ High competitive intensity in Baku ({bob_avg_intensity:.1f} competitors per branch within 10km)
+⚠ Below-average regional coverage compared to competitors
+⚠ Significant gap to market leaders ({branch_counts.index[0]}: {branch_counts.max()} branches)
+
+RECOMMENDATION PRIORITY:
+1. Focus on Regional Expansion (immediate action)
+2. Use data-driven location selection (Chart 13 Growth Opportunity Map)
+3. Balanced growth: 60% regional, 40% Baku suburbs
+4. Target: 10% market share, Top 5 position within 3 years
+
+================================================================================
+END OF REPORT
+================================================================================
+
+For detailed visualizations, refer to charts:
+• Chart 1-4: Market position and competitive landscape
+• Chart 5-8: Geographic and density analysis
+• Chart 9: Gap analysis with specific opportunities
+• Chart 10-12: Competitive dynamics
+• Chart 13: Growth opportunity heatmap with recommended locations
+• Chart 14-15: Multi-metric comparison and executive summary
+
+All charts saved in: charts/ directory
+Generated by: Bank Branch Network Analysis System
+"""
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(insights_report)
+
+    print(f"✓ Strategic Insights Report saved to {path}")
+    print()
+
+
+@node(title='Dashboard analytics', params=['focus_bank'], outputs=[AnalyticsExporter.OUTPUT_FILE])
+def dashboard_analytics(branches, intensity, zone_analysis, nearest, gaps, focus_bank, path):
+    """Precomputed aggregates for the dashboard analytics page."""
+    payload = AnalyticsExporter(path).export(branches, focus_bank, intensity, zone_analysis, nearest, gaps)
+    print()
+    return payload
@@ -0,0 +1,299 @@
+"""
+Drive times over the road network.
+
+Roads come from a local OpenStreetMap extract in OSM XML (data/roads.osm,
+e.g. `osmium cat azerbaijan-latest.osm.pbf -o data/roads.osm`). Parsing it is
+slow, so the routable graph is built once and stored next to it in
+data/roads.graph/ as memory-mappable arrays; the store is rebuilt when the
+extract or the speed table changes.
+
+The graph is contracted: only way ends, junctions and one node every
+MAX_EDGE_KM along a way are kept, and the road between two kept nodes
+becomes one edge weighted by its drive time. Only the largest connected
+network is kept, so every point snaps to a node it can drive from.
+
+Points join the network at their nearest node, covering the gap at
+ACCESS_SPEED_KMH. Travel times to the nearest of many sites come from one
+multi-source Dijkstra run: each site is a virtual node joined to its snapped
+node by its access time, and the search stops at the time limit.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+from .dag import file_sha256
+from .geo import GeoIndex, haversine_km
+
+
+ROAD_FILE = "data/roads.osm"
+GRAPH_DIR = "data/roads.graph"
+FORMAT_VERSION = 1
+
+# Free-flow speed of each routable highway class when a way has no maxspeed
+HIGHWAY_SPEED_KMH = {
+    'motorway': 100, 'motorway_link': 60,
+    'trunk': 80, 'trunk_link': 50,
+    'primary': 70, 'primary_link': 45,
+    'secondary': 60, 'secondary_link': 40,
+    'tertiary': 50, 'tertiary_link': 35,
+    'unclassified': 40, 'road': 40,
+    'residential': 30, 'living_street': 10,
+    'service': 20, 'track': 15,
+}
+
+# Longest road stretch merged into one edge; bounds the snapping error
+MAX_EDGE_KM = 1.0
+
+# Speed off the network, from a point to its nearest road node
+ACCESS_SPEED_KMH = 20.0
+
+# Floor on edge times, so zero-length edges still count as edges
+MIN_EDGE_SECONDS = 0.01
+
+
+def _speed(tags) -> float:
+    """km/h from maxspeed ('60', '60 km/h', '40 mph') or the highway class."""
+    value = tags.get('maxspeed', '').split(';')[0].strip()
+    number = value.split(' ')[0]
+    if number.replace('.', '', 1).isdigit() and float(number) > 0:
+        return float(number) * (1.609344 if value.endswith('mph') else 1.0)
+    return float(HIGHWAY_SPEED_KMH[tags['highway']])
+
+
+def _oneway(tags) -> int:
+    """1 along the way, -1 against it, 0 both ways."""
+    oneway = tags.get('oneway', '')
+    if oneway in ('yes', 'true', '1'):
+        return 1
+    if oneway in ('-1', 'reverse'):
+        return -1
+    if oneway == 'no':
+        return 0
+    return int(tags['highway'] == 'motorway' or tags.get('junction') in ('roundabout', 'circular'))
+
+
+def read_osm(path: str = ROAD_FILE) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stream an OSM XML file into arrays:
+        node ids (sorted), lat, long
+        way node refs (concatenated), way offsets into them,
+        way speeds (km/h), way oneway flags
+    Only ways of a routable highway class are read.
+    """
+    node_ids, node_lat, node_long = array('q'), array('d'), array('d')
+    refs, offsets, speeds, oneways = array('q'), array('q', [0]), array('d'), array('b')
+
+    context = ET.iterparse(path, events=('start', 'end'))
+    _, root = next(context)
+    for event, elem in context:
+        if event != 'end':
+            continue
+        if elem.tag == 'node':
+            node_ids.append(int(elem.get('id')))
+            node_lat.append(float(elem.get('lat')))
+            node_long.append(float(elem.get('lon')))
+        elif elem.tag == 'way':
+            tags = {tag.get('k'): tag.get('v') for tag in elem.iter('tag')}
+            way_refs = [int(nd.get('ref')) for nd in elem.iter('nd')]
+            if tags.get('highway') in HIGHWAY_SPEED_KMH and len(way_refs) >= 2:
+                refs.extend(way_refs)
+                offsets.append(len(refs))
+                speeds.append(_speed(tags))
+                oneways.append(_oneway(tags))
+        else:
+            continue
+        root.clear()
+
+    node_ids = np.frombuffer(node_ids, dtype=np.int64)
+    order = np.argsort(node_ids, kind='stable')
+    return (node_ids[order], np.frombuffer(node_lat)[order], np.frombuffer(node_long)[order],
+            np.frombuffer(refs, dtype=np.int64), np.frombuffer(offsets, dtype=np.int64),
+            np.frombuffer(speeds), np.frombuffer(oneways, dtype=np.int8))
+
+
+def contract(lat, long, refs, offsets, speeds, oneways, max_edge_km: float = MAX_EDGE_KM):
+    """
+    Contracted directed graph from ways given as node positions (refs index
+    lat/long). Returns the kept nodes' lat, long and an (n, n) CSR matrix of
+    drive seconds, restricted to the largest connected network.
+    """
+    n_ways = len(offsets) - 1
+    way_of = np.repeat(np.arange(n_ways), np.diff(offsets))
+    is_first = np.zeros(len(refs), dtype=bool)
+    is_first[offsets[:-1]] = True
+    is_last = np.zeros(len(refs), dtype=bool)
+    is_last[offsets[1:] - 1] = True
+
+    # Drive seconds of each piece between consecutive nodes of a way
+    piece_km = np.zeros(len(refs))
+    inner = np.flatnonzero(~is_last)
+    piece_km[inner] = haversine_km(lat[refs[inner]], long[refs[inner]], lat[refs[inner + 1]], long[refs[inner + 1]])
+    piece_seconds = piece_km / speeds[way_of] * 3600.0
+
+    # Keep way ends, nodes shared by ways (or repeated in one), and a node every max_edge_km
+    along = np.cumsum(piece_km) - piece_km
+    along -= np.repeat(along[offsets[:-1]], np.diff(offsets))
+    step = np.floor(along / max_edge_km)
+    keep = is_first | is_last | (np.bincount(refs, minlength=len(lat))[refs] > 1)
+    keep[1:] |= (step[1:] != step[:-1]) & ~is_first[1:]
+
+    # One edge between consecutive kept nodes of the same way
+    kept = np.flatnonzero(keep)
+    start, end = kept[:-1], kept[1:]
+    same_way = way_of[start] == way_of[end]
+    start, end = start[same_way], end[same_way]
+    elapsed = np.concatenate([[0.0], np.cumsum(piece_seconds)])
+    seconds = np.maximum(elapsed[end] - elapsed[start], MIN_EDGE_SECONDS)
+    direction = oneways[way_of[start]]
+    forward = direction >= 0
+    backward = direction <= 0
+    u = np.concatenate([refs[start][forward], refs[end][backward]])
+    v = np.concatenate([refs[end][forward], refs[start][backward]])
+    seconds = np.concatenate([seconds[forward], seconds[backward]])
+
+    # Number the kept nodes, drop loops and keep the fastest of parallel edges
+    nodes, inverse = np.unique(np.concatenate([u, v]), return_inverse=True)
+    u, v = inverse[:len(u)], inverse[len(u):]
+    not_loop = u != v
+    u, v, seconds = u[not_loop], v[not_loop], seconds[not_loop]
+    order = np.lexsort((seconds, v, u))
+    u, v, seconds = u[order], v[order], seconds[order]
+    first = np.concatenate([[True], (u[1:] != u[:-1]) | (v[1:] != v[:-1])])
+    u, v, seconds = u[first], v[first], seconds[first]
+    graph = sparse.csr_matrix((seconds, (u, v)), shape=(len(nodes), len(nodes)))
+
+    _, component = connected_components(graph, directed=True, connection='weak')
+    main = np.flatnonzero(component == np.bincount(component).argmax())
+    graph = graph[main][:, main].tocsr()
+    return lat[nodes[main]], long[nodes[main]], graph
+
+
+def _source_fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(path)}
+
+
+def _settings() -> dict:
+    return {'speeds': HIGHWAY_SPEED_KMH, 'max_edge_km': MAX_EDGE_KM, 'min_edge_seconds': MIN_EDGE_SECONDS}
+
+
+class RoadGraph:
+    """Contracted road network with drive-time queries in seconds."""
+
+    def __init__(self, lat, long, graph: sparse.csr_matrix):
+        self.lat = lat
+        self.long = long
+        self.graph = graph
+        self._reverse = None
+        self._index = None
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __getstate__(self):
+        return {'lat': self.lat, 'long': self.long, 'graph': self.graph}
+
+    def __setstate__(self, state):
+        self.__init__(state['lat'], state['long'], state['graph'])
+
+    @classmethod
+    def from_osm(cls, path: str = ROAD_FILE) -> 'RoadGraph':
+        node_ids, lat, long, refs, offsets, speeds, oneways = read_osm(path)
+        positions = np.searchsorted(node_ids, refs)
+        found = node_ids[np.minimum(positions, len(node_ids) - 1)] == refs
+        if not found.all():
+            # Ways cut by the extract boundary: drop them rather than guess
+            way_of = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+            complete = np.bincount(way_of, weights=~found, minlength=len(offsets) - 1) == 0
+            keep = complete[way_of]
+            positions = positions[keep]
+            offsets = np.concatenate([[0], np.cumsum(np.diff(offsets)[complete])])
+            speeds, oneways = speeds[complete], oneways[complete]
+        return cls(*contract(lat, long, positions, offsets, speeds, oneways))
+
+    def save(self, path: str = GRAPH_DIR, source: Optional[dict] = None):
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            'lat': self.lat, 'long': self.long,
+            'indptr': self.graph.indptr, 'indices': self.graph.indices, 'seconds': self.graph.data,
+        }
+        for name, values in arrays.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+        meta = {'version': FORMAT_VERSION, 'nodes': len(self), 'edges': int(self.graph.nnz),
+                'settings': _settings(), 'source': source or {}}
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str = GRAPH_DIR) -> 'RoadGraph':
+        def _load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        n = len(_load('lat'))
+        graph = sparse.csr_matrix((_load('seconds'), _load('indices'), _load('indptr')), shape=(n, n))
+        return cls(_load('lat'), _load('long'), graph)
+
+    def snap(self, lat, long) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest node of each point and the seconds to reach it off the network."""
+        if self._index is None:
+            self._index = GeoIndex(self.lat, self.long)
+        dist_km, nodes = self._index.nearest(lat, long)
+        return nodes, dist_km / ACCESS_SPEED_KMH * 3600.0
+
+    def time_to_nearest(self, site_lat, site_long, lat, long, limit_seconds: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Seconds to drive from each point to its nearest site, and the index
+        of that site; inf and -1 for points farther than limit_seconds.
+        """
+        if self._reverse is None:
+            self._reverse = self.graph.T.tocsr()
+        n, m = len(self), len(site_lat)
+        site_nodes, site_access = self.snap(site_lat, site_long)
+
+        # Reversed graph plus one virtual node per site, joined to the site's road node
+        virtual = sparse.csr_matrix((np.maximum(site_access, MIN_EDGE_SECONDS), (np.arange(m), site_nodes)), shape=(m, n))
+        graph = sparse.vstack([self._reverse, virtual], format='csr')
+        graph.resize((n + m, n + m))
+        node_seconds, _, node_site = dijkstra(graph, indices=np.arange(n, n + m), min_only=True,
+                                              return_predecessors=True, limit=limit_seconds)
+
+        point_nodes, point_access = self.snap(lat, long)
+        seconds = node_seconds[point_nodes] + point_access
+        site = np.where(node_site[point_nodes] >= n, node_site[point_nodes] - n, -1)
+        reached = (site >= 0) & (seconds <= limit_seconds)
+        return np.where(reached, seconds, np.inf), np.where(reached, site, -1)
+
+
+def load_roads(osm_path: str = ROAD_FILE, graph_dir: str = GRAPH_DIR) -> Optional[RoadGraph]:
+    """
+    The stored road graph if it matches the extract, else one built from the
+    extract (and stored); None when there is neither.
+    """
+    meta_path = os.path.join(graph_dir, 'meta.json')
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION or meta.get('settings') != json.loads(json.dumps(_settings())):
+            meta = None
+
+    if not os.path.exists(osm_path):
+        return RoadGraph.load(graph_dir) if meta else None
+
+    source = meta.get('source', {}) if meta else {}
+    stat = os.stat(osm_path)
+    if meta and stat.st_size == source.get('size') and (
+            stat.st_mtime_ns == source.get('mtime_ns') or file_sha256(osm_path) == source.get('sha256')):
+        return RoadGraph.load(graph_dir)
+
+    print(f"Building road graph from {osm_path}...")
+    graph = RoadGraph.from_osm(osm_path)
+    graph.save(graph_dir, _source_fingerprint(osm_path))
+    print(f"Saved road graph to {graph_dir}/ ({len(graph):,} nodes, {graph.graph.nnz:,} edges)")
+    return RoadGraph.load(graph_dir)
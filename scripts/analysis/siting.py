@@ -0,0 +1,214 @@
+"""
+Choosing sites for new branches.
+
+Given candidate sites, weighted demand points and the existing network,
+select_sites picks n new sites for one of two objectives:
+    coverage  maximise the demand within radius_km of an open site
+    median    minimise the demand-weighted km to the nearest open site, with
+              every distance capped at radius_km (a site farther than that
+              counts as radius_km; a large radius gives the plain p-median)
+
+Both objectives are submodular, so sites are added greedily with lazy
+evaluation (CELF): a candidate's gain can only shrink as sites are added, so
+a stale gain is an upper bound, and only candidates whose stale gain tops the
+queue are re-evaluated. Gains come from a KD-tree over the demand points:
+one pass over all candidates in chunks for the initial gains, then one ball
+query per re-evaluation. The greedy result is within 1 - 1/e of optimal.
+
+method='milp' solves the same problem exactly with scipy's MILP solver, for
+instances up to MILP_MAX_PAIRS candidate-demand pairs.
+"""
+
+import heapq
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.spatial import cKDTree
+
+from .geo import GeoIndex, arc_km, chord_km, sphere_xyz
+
+
+OBJECTIVES = ('coverage', 'median')
+
+# Candidates whose pairs with demand are held in memory at a time
+CANDIDATE_CHUNK = 1024
+
+# Largest instance handed to the MILP solver, in candidate-demand pairs
+MILP_MAX_PAIRS = 200_000
+
+# Seconds the MILP solver may run
+MILP_TIME_LIMIT = 120.0
+
+
+class _Problem:
+    """
+    Demand with its current distance to the open sites (capped at the radius;
+    for coverage 1 = uncovered, 0 = covered), and the value each candidate
+    would bring it.
+    """
+
+    def __init__(self, cand_lat, cand_long, dem_lat, dem_long, weights, existing_lat, existing_long,
+                 objective: str, radius_km: float):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}, not {objective!r}")
+        self.objective = objective
+        self.radius_km = radius_km
+        self.cand_xyz = sphere_xyz(cand_lat, cand_long)
+        self.tree = cKDTree(sphere_xyz(dem_lat, dem_long))
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+        current = np.full(len(self.weights), radius_km)
+        if len(existing_lat):
+            current, _ = GeoIndex(existing_lat, existing_long).nearest(dem_lat, dem_long)
+            current = np.minimum(current, radius_km)
+        if objective == 'coverage':
+            current = np.where(current < radius_km, 0.0, 1.0)
+        self.current = current
+
+    def _value(self, dist_km: np.ndarray) -> np.ndarray:
+        return np.zeros_like(dist_km) if self.objective == 'coverage' else dist_km
+
+    def pairs(self, candidates: np.ndarray):
+        """(candidate, demand, value) for every demand point within radius_km of the candidates."""
+        chunk_tree = cKDTree(self.cand_xyz[candidates])
+        pairs = chunk_tree.sparse_distance_matrix(self.tree, np.nextafter(chord_km(self.radius_km), 0),
+                                                  output_type='ndarray')
+        return candidates[pairs['i']], pairs['j'], self._value(arc_km(pairs['v']))
+
+    def initial_gains(self) -> np.ndarray:
+        gains = np.zeros(len(self.cand_xyz))
+        for start in range(0, len(gains), CANDIDATE_CHUNK):
+            cand, dem, value = self.pairs(np.arange(start, min(start + CANDIDATE_CHUNK, len(gains))))
+            saving = self.weights[dem] * np.maximum(self.current[dem] - value, 0.0)
+            gains += np.bincount(cand, weights=saving, minlength=len(gains))
+        return gains
+
+    def neighbours(self, candidate: int):
+        dem = np.asarray(self.tree.query_ball_point(self.cand_xyz[candidate],
+                                                    np.nextafter(chord_km(self.radius_km), 0)), dtype=np.int64)
+        dist = arc_km(np.linalg.norm(self.tree.data[dem] - self.cand_xyz[candidate], axis=1))
+        return dem, self._value(dist)
+
+    def gain(self, candidate: int) -> float:
+        dem, value = self.neighbours(candidate)
+        return float((self.weights[dem] * np.maximum(self.current[dem] - value, 0.0)).sum())
+
+    def open(self, candidate: int):
+        dem, value = self.neighbours(candidate)
+        self.current[dem] = np.minimum(self.current[dem], value)
+
+    def score(self) -> float:
+        """Covered demand (coverage) or weighted capped km (median) of the open sites."""
+        if self.objective == 'coverage':
+            return float((self.weights * (1.0 - self.current)).sum())
+        return float((self.weights * self.current).sum())
+
+
+def _lazy_greedy(problem: _Problem, n_sites: int):
+    gains = problem.initial_gains()
+    evaluations = len(gains)
+    queue = [(-g, c, 0) for c, g in enumerate(gains) if g > 0]
+    heapq.heapify(queue)
+    chosen, chosen_gains = [], []
+    while queue and len(chosen) < n_sites:
+        neg_gain, candidate, round_ = heapq.heappop(queue)
+        if round_ == len(chosen):
+            problem.open(candidate)
+            chosen.append(candidate)
+            chosen_gains.append(-neg_gain)
+            continue
+        gain = problem.gain(candidate)
+        evaluations += 1
+        if gain > 0:
+            heapq.heappush(queue, (-gain, candidate, len(chosen)))
+    return chosen, chosen_gains, evaluations
+
+
+def _milp(problem: _Problem, n_sites: int):
+    cand, dem, value = problem.pairs(np.arange(len(problem.cand_xyz)))
+    saving = problem.weights[dem] * np.maximum(problem.current[dem] - value, 0.0)
+    useful = saving > 0
+    cand, dem, saving = cand[useful], dem[useful], saving[useful]
+    if len(saving) > MILP_MAX_PAIRS:
+        raise ValueError(f"{len(saving):,} candidate-demand pairs exceed MILP_MAX_PAIRS ({MILP_MAX_PAIRS:,}); "
+                         "use method='greedy'")
+
+    # Variables: open[c] for every candidate that can gain anything, then serve[p] for every useful pair p
+    candidates, cand = np.unique(cand, return_inverse=True)
+    n_cand = len(candidates)
+    n_pairs = len(saving)
+    pair = np.arange(n_pairs)
+    demand_codes, demand_row = np.unique(dem, return_inverse=True)
+    constraints = [
+        # serve[p] <= open[candidate of p]
+        LinearConstraint(sparse.csr_matrix((np.concatenate([np.ones(n_pairs), -np.ones(n_pairs)]),
+                                            (np.concatenate([pair, pair]), np.concatenate([n_cand + pair, cand]))),
+                                           shape=(n_pairs, n_cand + n_pairs)), -np.inf, 0.0),
+        # each demand point served by at most one new site
+        LinearConstraint(sparse.csr_matrix((np.ones(n_pairs), (demand_row, n_cand + pair)),
+                                           shape=(len(demand_codes), n_cand + n_pairs)), -np.inf, 1.0),
+        # exactly n_sites new sites (or every candidate, if fewer)
+        LinearConstraint(sparse.csr_matrix(np.concatenate([np.ones(n_cand), np.zeros(n_pairs)])),
+                         min(n_sites, n_cand), min(n_sites, n_cand)),
+    ]
+    result = milp(np.concatenate([np.zeros(n_cand), -saving]), constraints=constraints,
+                  integrality=np.concatenate([np.ones(n_cand), np.zeros(n_pairs)]), bounds=Bounds(0, 1),
+                  options={'time_limit': MILP_TIME_LIMIT})
+    if result.x is None:
+        raise RuntimeError(f"MILP solver failed: {result.message}")
+    opened = candidates[result.x[:n_cand] > 0.5]
+
+    # Report the optimal sites in greedy order of their marginal gains
+    chosen, chosen_gains = [], []
+    remaining = list(opened)
+    while remaining:
+        gains = [problem.gain(c) for c in remaining]
+        best = int(np.argmax(gains))
+        problem.open(remaining[best])
+        chosen.append(remaining.pop(best))
+        chosen_gains.append(gains[best])
+    return chosen, chosen_gains, len(opened)
+
+
+def select_sites(cand_lat, cand_long, dem_lat, dem_long, weights, existing_lat, existing_long,
+                 n_sites: int, objective: str = 'coverage', radius_km: float = 5.0,
+                 method: str = 'greedy') -> Dict:
+    """
+    Pick n_sites candidates to add to the existing sites.
+
+    Returns
+        sites       DataFrame of the picks in order: candidate index, lat, long
+                    and marginal gain (demand newly covered, or weighted km saved)
+        baseline    the objective with the existing sites only
+        value       the objective with the picks added
+        total       the total demand weight
+        evaluations gain evaluations (greedy) or sites opened (milp)
+    """
+    cand_lat, cand_long = np.asarray(cand_lat, dtype=np.float64), np.asarray(cand_long, dtype=np.float64)
+    problem = _Problem(cand_lat, cand_long, dem_lat, dem_long, weights, np.asarray(existing_lat),
+                       np.asarray(existing_long), objective, radius_km)
+    baseline = problem.score()
+    if method == 'greedy':
+        chosen, gains, evaluations = _lazy_greedy(problem, n_sites)
+    elif method == 'milp':
+        chosen, gains, evaluations = _milp(problem, n_sites)
+    else:
+        raise ValueError(f"method must be 'greedy' or 'milp', not {method!r}")
+
+    chosen = np.asarray(chosen, dtype=np.int64)
+    sites = pd.DataFrame({
+        'candidate': chosen,
+        'lat': cand_lat[chosen],
+        'long': cand_long[chosen],
+        'gain': np.asarray(gains, dtype=np.float64),
+    })
+    return {
+        'sites': sites,
+        'baseline': baseline,
+        'value': problem.score(),
+        'total': float(problem.weights.sum()),
+        'evaluations': evaluations,
+    }
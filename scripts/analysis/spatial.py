@@ -0,0 +1,103 @@
+"""
+Spatial index queries shared by the metric nodes.
+
+Counting neighbours with a KD-tree replaces the per-branch distance scans:
+one batched query answers every point at once, and the tree is queried on
+all CPU cores. The same per-group trees answer k-nearest queries, so the
+nearest branches of every bank are found for every branch in one batch.
+Coordinates are planar; geo.py maps lat/long onto them.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def radius_counts_by_group(points: np.ndarray, groups: np.ndarray, radius: float,
+                           n_groups: int = None) -> np.ndarray:
+    """
+    For every point, the number of points of each group strictly within
+    `radius` of it, not counting points at distance 0 (itself and any
+    co-located branch).
+
+    points  (n, 2) coordinates
+    groups  (n,) integer group codes in [0, n_groups)
+    returns (n, n_groups) int64 counts
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    groups = np.asarray(groups)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+
+    # query_ball_point counts d <= r; the next float below r makes it d < r
+    strict = np.nextafter(radius, 0)
+    counts = np.zeros((len(points), n_groups), dtype=np.int64)
+    for g in range(n_groups):
+        members = points[groups == g]
+        if len(members) == 0:
+            continue
+        tree = cKDTree(members)
+        within = tree.query_ball_point(points, strict, return_length=True, workers=-1)
+        coincident = tree.query_ball_point(points, 0.0, return_length=True, workers=-1)
+        counts[:, g] = within - coincident
+    return counts
+
+
+def radius_counts(points: np.ndarray, radius: float, queries: np.ndarray = None) -> np.ndarray:
+    """Number of points strictly within radius of each query (default: each point), excluding distance 0."""
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    queries = points if queries is None else np.ascontiguousarray(queries, dtype=np.float64)
+    tree = cKDTree(points)
+    within = tree.query_ball_point(queries, np.nextafter(radius, 0), return_length=True, workers=-1)
+    coincident = tree.query_ball_point(queries, 0.0, return_length=True, workers=-1)
+    return (within - coincident).astype(np.int64)
+
+
+def nearest_by_group(points: np.ndarray, groups: np.ndarray, k: int = 1,
+                     n_groups: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For every point, the k nearest points of each group, from one batched
+    query per group tree. A point is never its own neighbour; co-located
+    points of the same group are.
+
+    points  (n, d) coordinates
+    groups  (n,) integer group codes in [0, n_groups)
+    returns (n, n_groups, k) distances, inf where a group has fewer points,
+            and (n, n_groups, k) indices into points, -1 there
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    groups = np.asarray(groups)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+
+    dist = np.full((len(points), n_groups, k), np.inf)
+    idx = np.full((len(points), n_groups, k), -1, dtype=np.int64)
+    for g in range(n_groups):
+        member_idx = np.flatnonzero(groups == g)
+        if len(member_idx) == 0:
+            continue
+        tree = cKDTree(points[member_idx])
+        d, i = tree.query(points, k=k + 1, workers=-1)
+
+        # Members drop themselves; everyone else drops the (k+1)-th neighbour
+        is_self = np.zeros(i.shape, dtype=bool)
+        is_self[member_idx] = i[member_idx] == np.arange(len(member_idx))[:, None]
+        is_self[~is_self.any(axis=1), k] = True
+        keep = np.argsort(is_self, axis=1, kind='stable')[:, :k]
+        d = np.take_along_axis(d, keep, axis=1)
+        i = np.take_along_axis(i, keep, axis=1)
+
+        found = i < len(member_idx)
+        dist[:, g] = np.where(found, d, np.inf)
+        idx[:, g] = np.where(found, member_idx[np.minimum(i, len(member_idx) - 1)], -1)
+    return dist, idx
+
+
+def group_codes(labels) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer codes for labels, with groups in order of first appearance."""
+    uniques, first, codes = np.unique(np.asarray(labels), return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return remap[codes.ravel()], uniques[order]
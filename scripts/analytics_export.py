@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Export the aggregates computed by run_analysis.py for the dashboard.
+Output: dashboard/public/data/analytics.json
+
+The analytics page renders this file as-is, so its size and the page's load
+cost depend on the number of banks and zones, not on the number of branches.
+Distances arrive in great-circle km, matching the figures quoted in
+docs/STRATEGIC_INSIGHTS.txt.
+"""
+
+import json
+import math
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+FORMAT_VERSION = 1
+
+
+def branches_needed(total: int, count: int, pct: int) -> int:
+    """Branches to add so that count reaches pct% of total (rounded up); 0 once it is met."""
+    return max(0, math.ceil(total * pct / 100) - count)
+
+
+class AnalyticsExporter:
+    """Builds and writes the precomputed dashboard analytics."""
+
+    OUTPUT_FILE = "dashboard/public/data/analytics.json"
+
+    TOP_GAPS = 10
+    TOP_COMPETITORS = 5
+    SHARE_TARGETS = (5, 10)
+
+    def __init__(self, output_file: str = OUTPUT_FILE):
+        self.output_file = output_file
+
+    @staticmethod
+    def _bank_table(df: pd.DataFrame, intensity_data: Dict[str, List[int]]) -> List[Dict]:
+        """Per-bank counts, shares, ranks and competitive intensity, largest first."""
+        counts = df['bank_name'].value_counts()
+        baku = df[df['region'] == 'Baku']['bank_name'].value_counts()
+        total = len(df)
+
+        banks = []
+        for rank, (bank, count) in enumerate(counts.items(), start=1):
+            intensities = intensity_data.get(bank, [])
+            banks.append({
+                'name': bank,
+                'count': int(count),
+                'share': round(count / total * 100, 2),
+                'rank': rank,
+                'bakuShare': round(int(baku.get(bank, 0)) / count * 100, 1),
+                'avgIntensity': round(float(np.mean(intensities)), 1) if len(intensities) else 0.0,
+            })
+        return banks
+
+    def build_payload(self, df: pd.DataFrame, focus_bank: str, intensity_data: Dict[str, List[int]],
+                      zone_analysis: pd.DataFrame, focus_analysis: pd.DataFrame,
+                      gaps: pd.DataFrame) -> Dict:
+        """Collect the dashboard aggregates from the analysis results."""
+        banks = self._bank_table(df, intensity_data)
+        total = len(df)
+        focus = next((b for b in banks if b['name'] == focus_bank),
+                     {'name': focus_bank, 'count': 0, 'share': 0.0, 'rank': 0, 'bakuShare': 0.0, 'avgIntensity': 0.0})
+
+        targets = [
+            {'label': f'{pct}% market share', 'needed': branches_needed(total, focus['count'], pct)}
+            for pct in self.SHARE_TARGETS
+        ]
+        if len(banks) >= 5:
+            targets.append({'label': 'Top 5 position', 'needed': max(0, banks[4]['count'] - focus['count'] + 1)})
+
+        distances = focus_analysis['dist_to_competitor_km']
+        nearest = focus_analysis['nearest_competitor'].value_counts().head(self.TOP_COMPETITORS)
+
+        return {
+            'version': FORMAT_VERSION,
+            'generated': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'totalBranches': total,
+            'totalBanks': len(banks),
+            'averagePerBank': round(total / len(banks), 1) if banks else 0.0,
+            'concentration': {
+                f'top{n}': round(sum(b['count'] for b in banks[:n]) / total * 100, 1)
+                for n in (1, 3, 5)
+            },
+            'banks': banks,
+            'focus': {
+                **focus,
+                'targets': targets,
+                'competitorDistanceKm': {
+                    'mean': round(float(distances.mean()), 2) if len(distances) else None,
+                    'median': round(float(distances.median()), 2) if len(distances) else None,
+                },
+                'nearestCompetitors': [{'name': bank, 'count': int(count)} for bank, count in nearest.items()],
+            },
+            'zones': [
+                {
+                    'zone': row['Zone'],
+                    'total': int(row['Total']),
+                    'focusCount': int(row['BoB_Count']),
+                    'focusShare': round(float(row['BoB_Share']), 1),
+                    'focusRank': int(row['BoB_Rank']) if row['BoB_Count'] > 0 else None,
+                    'leader': row['Leader'],
+                    'leaderCount': int(row['Leader_Count']),
+                }
+                for _, row in zone_analysis.iterrows()
+            ],
+            'gaps': {
+                'count': len(gaps),
+                'top': [
+                    {
+                        'lat': round(float(row['lat']), 5),
+                        'long': round(float(row['long']), 5),
+                        'bank': row['bank'],
+                        'distanceKm': round(float(row['distance_to_bob_km']), 1),
+                    }
+                    for _, row in gaps.head(self.TOP_GAPS).iterrows()
+                ],
+            },
+        }
+
+    def export(self, df: pd.DataFrame, focus_bank: str, intensity_data: Dict[str, List[int]],
+               zone_analysis: pd.DataFrame, focus_analysis: pd.DataFrame, gaps: pd.DataFrame) -> Dict:
+        """Build the payload and write it; returns the payload."""
+        payload = self.build_payload(df, focus_bank, intensity_data, zone_analysis, focus_analysis, gaps)
+        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+        print(f"✓ Dashboard analytics saved to {self.output_file} "
+              f"({os.path.getsize(self.output_file) / 1024:.1f} KB)")
+        return payload
@@ -0,0 +1,271 @@
+"""
+Administrative zone assignment from boundary polygons.
+Used by the analysis package (zones, opportunity search, market areas) and
+by validation.py, which imports it without pulling in the analysis nodes.
+
+Boundaries come from a local GeoJSON file (data/boundaries.geojson). Each
+feature carries a `level` (region, zone, rayon, economic_region, ...) and a
+`name`; within a level the first feature that contains a point wins, so
+features may overlap and are listed in priority order. A top-level
+`defaults` member names the label of points outside every feature.
+
+Lookups go through a uniform grid prepared once for all levels. A cell that
+lies wholly inside or outside the polygons is labelled directly. In a cell
+crossed by a boundary, a point is compared with the cell centre: it is on the
+same side of a polygon unless the segment between them crosses an odd number
+of that polygon's edges, and only edges touching the cell can cross it. A
+batch therefore costs one cell lookup per point plus a few segment tests for
+points near a boundary, whatever the size of the polygons.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+BOUNDARY_FILE = "data/boundaries.geojson"
+
+# Cells per side of the lookup grid
+GRID_CELLS = 512
+
+
+def _feature_rings(geometry: Dict) -> List[List[np.ndarray]]:
+    """Polygons of a Polygon or MultiPolygon, each a list of closed (m, 2) long, lat rings (exterior first)."""
+    polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+    out = []
+    for polygon in polygons:
+        rings = []
+        for ring in polygon:
+            ring = np.asarray(ring, dtype=np.float64)[:, :2]
+            if not np.array_equal(ring[0], ring[-1]):
+                ring = np.vstack([ring, ring[:1]])
+            rings.append(ring)
+        out.append(rings)
+    return out
+
+
+def _feature_edges(geometry: Dict) -> np.ndarray:
+    """(m, 4) long0, lat0, long1, lat1 edges of every ring of a Polygon or MultiPolygon."""
+    return np.vstack([np.hstack([ring[:-1], ring[1:]])
+                      for polygon in _feature_rings(geometry) for ring in polygon])
+
+
+def load_boundaries(path: str = BOUNDARY_FILE) -> Tuple[Dict[str, List[Tuple[str, np.ndarray]]], Dict[str, str]]:
+    """Features per level as (name, edges) in file order, and each level's default label."""
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+    levels = {}
+    for feature in collection['features']:
+        props = feature['properties']
+        levels.setdefault(props['level'], []).append((props['name'], _feature_edges(feature['geometry'])))
+    defaults = {level: collection.get('defaults', {}).get(level, 'Other') for level in levels}
+    return levels, defaults
+
+
+def load_polygons(level: str, path: str = BOUNDARY_FILE) -> List[List[np.ndarray]]:
+    """Every polygon of the features at one level, as lists of closed long, lat rings (exterior first)."""
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+    return [polygon for feature in collection['features'] if feature['properties']['level'] == level
+            for polygon in _feature_rings(feature['geometry'])]
+
+
+def _crossings(px, py, qx, qy, ax, ay, bx, by) -> np.ndarray:
+    """Whether segments p-q and a-b properly cross."""
+    d1 = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+    d2 = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax)
+    d3 = (qx - px) * (ay - py) - (qy - py) * (ax - px)
+    d4 = (qx - px) * (by - py) - (qy - py) * (bx - px)
+    return (d1 * d2 < 0) & (d3 * d4 < 0)
+
+
+class ZoneIndex:
+    """Grid point-in-polygon index over every boundary level."""
+
+    def __init__(self, levels: Dict[str, List[Tuple[str, np.ndarray]]], defaults: Dict[str, str],
+                 grid_cells: int = GRID_CELLS):
+        all_edges = np.vstack([edges for features in levels.values() for _, edges in features])
+        self.low = np.array([min(all_edges[:, 0].min(), all_edges[:, 2].min()),
+                             min(all_edges[:, 1].min(), all_edges[:, 3].min())])
+        high = np.array([max(all_edges[:, 0].max(), all_edges[:, 2].max()),
+                         max(all_edges[:, 1].max(), all_edges[:, 3].max())])
+        self.shape = (grid_cells, grid_cells)
+        self.cell = (high - self.low) / grid_cells
+        centre_x = self.low[0] + (np.arange(grid_cells) + 0.5) * self.cell[0]
+        centre_y = self.low[1] + (np.arange(grid_cells) + 0.5) * self.cell[1]
+        self.centres = (np.tile(centre_x, grid_cells), np.repeat(centre_y, grid_cells))
+
+        self.levels = {level: self._prepare(features, defaults[level], centre_x, centre_y)
+                       for level, features in levels.items()}
+
+    @classmethod
+    def from_file(cls, path: str = BOUNDARY_FILE, grid_cells: int = GRID_CELLS) -> 'ZoneIndex':
+        return cls(*load_boundaries(path), grid_cells=grid_cells)
+
+    @classmethod
+    def from_polygons(cls, level: str, polygons: List[List[np.ndarray]], grid_cells: int = GRID_CELLS) -> 'ZoneIndex':
+        """Index labelling points 'in' or 'out' of polygons of closed long, lat rings (load_polygons)."""
+        edges = np.vstack([np.hstack([ring[:-1], ring[1:]]) for polygon in polygons for ring in polygon])
+        return cls({level: [('in', edges)]}, {level: 'out'}, grid_cells=grid_cells)
+
+    def _cells_touched(self, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(cell, edge) pairs for every grid cell an edge passes through or touches."""
+        # Split edges into pieces no longer than a cell; each piece spans at most 2x2 cells
+        span = np.abs(edges[:, 2:] - edges[:, :2]) / self.cell
+        pieces = np.maximum(1, np.ceil(span.max(axis=1))).astype(np.int64)
+        edge_of_piece = np.repeat(np.arange(len(edges)), pieces)
+        step = (np.arange(len(edge_of_piece)) - np.repeat(np.cumsum(pieces) - pieces, pieces))
+        t0 = step / pieces[edge_of_piece]
+        t1 = (step + 1) / pieces[edge_of_piece]
+        e = edges[edge_of_piece]
+        start = e[:, :2] + (e[:, 2:] - e[:, :2]) * t0[:, None]
+        end = e[:, :2] + (e[:, 2:] - e[:, :2]) * t1[:, None]
+        lo = np.floor((np.minimum(start, end) - self.low) / self.cell).astype(np.int64)
+        hi = np.floor((np.maximum(start, end) - self.low) / self.cell).astype(np.int64)
+        lo = np.clip(lo, 0, np.array(self.shape)[::-1] - 1)
+        hi = np.clip(hi, 0, np.array(self.shape)[::-1] - 1)
+
+        cells, owners = [], []
+        for dx in (0, 1):
+            for dy in (0, 1):
+                x = np.minimum(lo[:, 0] + dx, hi[:, 0])
+                y = np.minimum(lo[:, 1] + dy, hi[:, 1])
+                cells.append(y * self.shape[1] + x)
+                owners.append(edge_of_piece)
+        pairs = np.unique(np.column_stack([np.concatenate(cells), np.concatenate(owners)]), axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+    @staticmethod
+    def _centres_inside(edges: np.ndarray, centre_x: np.ndarray, centre_y: np.ndarray) -> np.ndarray:
+        """Even-odd inside test of every grid cell centre, one scanline per row."""
+        x0, y0, x1, y1 = edges.T
+        inside = np.zeros((len(centre_y), len(centre_x)), dtype=bool)
+        for row, y in enumerate(centre_y):
+            spans = (y0 <= y) != (y1 <= y)
+            if not spans.any():
+                continue
+            x_cross = np.sort(x0[spans] + (y - y0[spans]) * (x1[spans] - x0[spans]) / (y1[spans] - y0[spans]))
+            inside[row] = (len(x_cross) - np.searchsorted(x_cross, centre_x, side='right')) % 2 == 1
+        return inside.ravel()
+
+    def _prepare(self, features, default: str, centre_x, centre_y) -> Dict:
+        """Per-cell label, or the ordered candidate features of cells crossed by a boundary."""
+        n_cells = self.shape[0] * self.shape[1]
+        names = [name for name, _ in features] + [default]
+        done = np.zeros(n_cells, dtype=bool)
+        cand_cell, cand_feature, cand_pair = [], [], []
+        pair_inside, pair_edges, pair_edge_count = [], [], []
+        n_pairs = 0
+        for code, (_, edges) in enumerate(features):
+            inside = self._centres_inside(edges, centre_x, centre_y)
+            touched_cells, touched_edges = self._cells_touched(edges)
+            boundary = np.zeros(n_cells, dtype=bool)
+            boundary[touched_cells] = True
+
+            # Crossed cells: one pair each, with the cell centre's side and the edges touching the cell
+            crossed = np.unique(touched_cells)
+            pair_id = np.full(n_cells, -1, dtype=np.int64)
+            pair_id[crossed] = n_pairs + np.arange(len(crossed))
+            pair_inside.append(inside[crossed])
+            pair_edges.append(edges[touched_edges])
+            pair_edge_count.append(np.bincount(np.searchsorted(crossed, touched_cells), minlength=len(crossed)))
+            n_pairs += len(crossed)
+
+            active = ~done & (boundary | inside)
+            cand_cell.append(np.flatnonzero(active))
+            cand_feature.append(np.full(active.sum(), code))
+            cand_pair.append(pair_id[active])
+            done |= inside & ~boundary
+
+        cell = np.concatenate(cand_cell)
+        order = np.argsort(cell, kind='stable')
+        cand_feature = np.concatenate(cand_feature)[order]
+        cand_pair = np.concatenate(cand_pair)[order]
+        ptr = np.concatenate([[0], np.cumsum(np.bincount(cell, minlength=n_cells))])
+
+        # Cells whose first candidate contains them outright need no test
+        label = np.full(n_cells, len(features), dtype=np.int64)
+        has = ptr[1:] > ptr[:-1]
+        first = ptr[:-1][has]
+        label[has] = np.where(cand_pair[first] < 0, cand_feature[first], -1)
+
+        counts = np.concatenate(pair_edge_count) if pair_edge_count else np.zeros(0, dtype=np.int64)
+        return {
+            'names': np.array(names, dtype=object),
+            'label': label,
+            'ptr': ptr,
+            'cand_feature': cand_feature,
+            'cand_pair': cand_pair,
+            'pair_inside': np.concatenate(pair_inside),
+            'pair_ptr': np.concatenate([[0], np.cumsum(counts)]),
+            'pair_edges': np.vstack(pair_edges),
+        }
+
+    def _resolve(self, prep: Dict, cells: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Feature codes of points in cells that need segment tests."""
+        codes = np.full(len(cells), len(prep['names']) - 1, dtype=np.int64)
+        pending = np.arange(len(cells))
+        slot = 0
+        while len(pending):
+            start, stop = prep['ptr'][cells[pending]], prep['ptr'][cells[pending] + 1]
+            pending = pending[start + slot < stop]
+            if not len(pending):
+                break
+            entry = prep['ptr'][cells[pending]] + slot
+            feature, pair = prep['cand_feature'][entry], prep['cand_pair'][entry]
+
+            inside = pair < 0
+            tested = pending[~inside]
+            if len(tested):
+                tested_pair = pair[~inside]
+                n_edges = prep['pair_ptr'][tested_pair + 1] - prep['pair_ptr'][tested_pair]
+                point = np.repeat(np.arange(len(tested)), n_edges)
+                edge = np.repeat(prep['pair_ptr'][tested_pair] - np.cumsum(n_edges) + n_edges, n_edges) + np.arange(n_edges.sum())
+                ax, ay, bx, by = prep['pair_edges'][edge].T
+                cx, cy = self.centres[0][cells[tested]], self.centres[1][cells[tested]]
+                hits = _crossings(x[tested][point], y[tested][point], cx[point], cy[point], ax, ay, bx, by)
+                odd = np.bincount(point, weights=hits, minlength=len(tested)) % 2 == 1
+                inside[~inside] = prep['pair_inside'][tested_pair] != odd
+
+            codes[pending[inside]] = feature[inside]
+            pending = pending[~inside]
+            slot += 1
+        return codes
+
+    def box_label(self, level: str, low, high) -> Optional[str]:
+        """The label of every point of the (x, y) box low-high, or None if a boundary of the level may cross it."""
+        (c0, r0), (c1, r1) = [np.floor((np.asarray(corner) - self.low) / self.cell).astype(np.int64)
+                              for corner in (low, high)]
+        prep = self.levels[level]
+        default = len(prep['names']) - 1
+        # Beyond the grid every point has the default label
+        off_grid = c0 < 0 or r0 < 0 or c1 >= self.shape[1] or r1 >= self.shape[0]
+        c0, r0 = max(c0, 0), max(r0, 0)
+        c1, r1 = min(c1, self.shape[1] - 1), min(r1, self.shape[0] - 1)
+        if c0 > c1 or r0 > r1:
+            return prep['names'][default]
+        labels = prep['label'].reshape(self.shape)[r0:r1 + 1, c0:c1 + 1]
+        first = labels[0, 0]
+        if first < 0 or (labels != first).any() or (off_grid and first != default):
+            return None
+        return prep['names'][first]
+
+    def assign(self, lat, long) -> Dict[str, np.ndarray]:
+        """Label of every point at every level, in one pass over the grid."""
+        x = np.asarray(long, dtype=np.float64)
+        y = np.asarray(lat, dtype=np.float64)
+        col = np.floor((x - self.low[0]) / self.cell[0]).astype(np.int64)
+        row = np.floor((y - self.low[1]) / self.cell[1]).astype(np.int64)
+        on_grid = (col >= 0) & (col < self.shape[1]) & (row >= 0) & (row < self.shape[0])
+        cells = np.where(on_grid, row * self.shape[1] + col, 0)
+
+        labels = {}
+        for level, prep in self.levels.items():
+            default = len(prep['names']) - 1
+            codes = np.where(on_grid, prep['label'][cells], default)
+            unresolved = np.flatnonzero(codes < 0)
+            if len(unresolved):
+                codes[unresolved] = self._resolve(prep, cells[unresolved], x[unresolved], y[unresolved])
+            labels[level] = prep['names'][codes]
+        return labels
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Cross-bank co-location and duplicate detection.
+Buckets branch coordinates on a uniform grid so exact and near-duplicate
+points within a configurable radius are found in near-linear time.
+Output: data/colocation_report.csv with one row per flagged branch.
+"""
+
+import csv
+from typing import Dict, List
+
+import numpy as np
+
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = np.pi / 180.0 * EARTH_RADIUS_M
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres between coordinate arrays (degrees)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2.0) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2)
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class ColocationDetector:
+    """Finds exact and near-duplicate branch locations across all banks."""
+
+    REPORT_FILE = "data/colocation_report.csv"
+
+    # Forward half of the 3x3 neighbourhood: every pair of adjacent cells
+    # is visited exactly once, and (0, 0) covers pairs inside a cell.
+    NEIGHBOUR_OFFSETS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+    def __init__(self, radius_m: float = 25.0):
+        self.radius_m = radius_m
+        self.groups = []
+
+    def _cell_keys(self, lat: np.ndarray, lon: np.ndarray):
+        """Hash coordinates to integer grid cells at least radius_m wide."""
+        lat_step = self.radius_m / METERS_PER_DEGREE
+        # Size longitude cells at the most poleward point so no cell is
+        # narrower than the radius anywhere in the dataset.
+        cos_lat = max(np.cos(np.radians(np.abs(lat).max())), 1e-6)
+        lon_step = lat_step / cos_lat
+
+        gy = np.floor(lat / lat_step).astype(np.int64)
+        gx = np.floor(lon / lon_step).astype(np.int64)
+        # Leave one spare column on each side so +/-1 offsets never wrap rows
+        gy -= gy.min()
+        gx -= gx.min() - 1
+        width = int(gx.max()) + 2
+
+        return gy * width + gx, width
+
+    def find_pairs(self, lat: np.ndarray, lon: np.ndarray):
+        """
+        Return (i, j, distance_m) arrays for all point pairs within radius_m.
+        Each unordered pair appears once with i < j in input order.
+        """
+        n = len(lat)
+        if n < 2:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        keys, width = self._cell_keys(lat, lon)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        positions = np.arange(n)
+
+        pair_i, pair_j, pair_d = [], [], []
+        for dy, dx in self.NEIGHBOUR_OFFSETS:
+            target = sorted_keys + dy * width + dx
+            lo = np.searchsorted(sorted_keys, target, side='left')
+            hi = np.searchsorted(sorted_keys, target, side='right')
+            if dy == 0 and dx == 0:
+                lo = np.maximum(lo, positions + 1)
+
+            counts = np.maximum(hi - lo, 0)
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            # Expand each (point, candidate run) into explicit index pairs
+            src = np.repeat(positions, counts)
+            run_start = np.repeat(np.cumsum(counts) - counts, counts)
+            dst = np.repeat(lo, counts) + (np.arange(total) - run_start)
+
+            a, b = order[src], order[dst]
+            dist = haversine_m(lat[a], lon[a], lat[b], lon[b])
+            keep = dist <= self.radius_m
+
+            a, b = a[keep], b[keep]
+            pair_i.append(np.minimum(a, b))
+            pair_j.append(np.maximum(a, b))
+            pair_d.append(dist[keep])
+
+        if not pair_i:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        return np.concatenate(pair_i), np.concatenate(pair_j), np.concatenate(pair_d)
+
+    @staticmethod
+    def _connected_groups(n: int, pair_i: np.ndarray, pair_j: np.ndarray) -> List[List[int]]:
+        """Union-find over matched pairs; returns groups of two or more points."""
+        parent = list(range(n))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in zip(pair_i.tolist(), pair_j.tolist()):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        members = {}
+        for idx in set(pair_i.tolist()) | set(pair_j.tolist()):
+            members.setdefault(find(idx), []).append(idx)
+
+        return [sorted(group) for _, group in sorted(members.items())]
+
+    def detect(self, branches: List[Dict]) -> List[Dict]:
+        """
+        Flag co-located branches in the combined list.
+        Returns one dict per group with member row indices and summary fields.
+        """
+        lat = np.array([float(b['lat']) for b in branches])
+        lon = np.array([float(b['long']) for b in branches])
+
+        pair_i, pair_j, pair_d = self.find_pairs(lat, lon)
+
+        max_dist = {}
+        for a, d in zip(pair_i.tolist(), pair_d.tolist()):
+            max_dist[a] = max(max_dist.get(a, 0.0), d)
+
+        self.groups = []
+        for group_id, rows in enumerate(self._connected_groups(len(branches), pair_i, pair_j), 1):
+            banks = sorted({branches[r]['bank_name'] for r in rows})
+            exact = len({(lat[r], lon[r]) for r in rows}) == 1
+            self.groups.append({
+                'group_id': group_id,
+                'kind': 'exact' if exact else 'near',
+                'cross_bank': len(banks) > 1,
+                'banks': banks,
+                'rows': rows,
+                'max_distance_m': max(max_dist.get(r, 0.0) for r in rows),
+            })
+
+        return self.groups
+
+    def save_report(self, branches: List[Dict]):
+        """Write one row per flagged branch to the co-location report."""
+        fieldnames = ['group_id', 'kind', 'cross_bank', 'max_distance_m',
+                      'row', 'bank_name', 'lat', 'long']
+
+        with open(self.REPORT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for group in self.groups:
+                for row in group['rows']:
+                    writer.writerow({
+                        'group_id': group['group_id'],
+                        'kind': group['kind'],
+                        'cross_bank': group['cross_bank'],
+                        'max_distance_m': f"{group['max_distance_m']:.1f}",
+                        'row': row,
+                        'bank_name': branches[row]['bank_name'],
+                        'lat': branches[row]['lat'],
+                        'long': branches[row]['long'],
+                    })
+
+        print(f"Saved co-location report to {self.REPORT_FILE}")
+
+    def print_summary(self):
+        """Print a short breakdown of detected groups."""
+        exact = sum(1 for g in self.groups if g['kind'] == 'exact')
+        cross = sum(1 for g in self.groups if g['cross_bank'])
+        flagged = sum(len(g['rows']) for g in self.groups)
+
+        print(f"Co-location check (radius {self.radius_m:g} m):")
+        print(f"  {len(self.groups)} groups, {flagged} branches flagged "
+              f"({exact} exact, {len(self.groups) - exact} near, {cross} cross-bank)")
+        for group in self.groups:
+            if group['cross_bank']:
+                print(f"  [{group['kind']}] {', '.join(group['banks'])} "
+                      f"(max {group['max_distance_m']:.1f} m)")
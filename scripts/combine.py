@@ -2,12 +2,24 @@
 """
 Combine all bank branch CSV files into a single file.
 Output: data/combined_atms.csv with columns: bank_name, lat, long
+Also flags co-located branches in data/colocation_report.csv and scores
+coordinate quality per bank in data/quality_report.csv, and writes a
+memory-mappable copy of the coordinates to data/combined_atms.store/ and
+the compact dashboard payload to dashboard/public/data/branches.json, and
+the clustered map tile pyramid to dashboard/public/tiles/.
 """
 
 import csv
 import os
+import sys
 from pathlib import Path
 
+from colocation import ColocationDetector
+from coordinate_store import write_store
+from dashboard_export import DashboardExporter
+from tile_export import TileExporter
+from validation import CoordinateValidator
+
 
 class BranchCombiner:
     """Combines all bank branch CSV files into one unified file."""
@@ -39,8 +51,12 @@ class BranchCombiner:
         'btb_branches.csv': 'BTB',
     }
 
-    def __init__(self):
+    def __init__(self, colocation_radius_m: float = 25.0, min_quality_score: float = 50.0):
         self.combined_branches = []
+        self.colocation = ColocationDetector(radius_m=colocation_radius_m)
+        self.validator = CoordinateValidator(min_bank_score=min_quality_score)
+        self.dashboard_exporter = DashboardExporter()
+        self.tile_exporter = TileExporter()
 
     def read_csv_file(self, filepath: str, bank_name: str):
         """Read a CSV file and extract bank_name, lat, long."""
@@ -65,7 +81,9 @@ class BranchCombiner:
                             branches.append({
                                 'bank_name': bank_name,
                                 'lat': lat,
-                                'long': long
+                                'long': long,
+                                # Kept for validation only, not written out
+                                'address': row.get('address', row.get('address_az', ''))
                             })
                         except ValueError:
                             # Skip invalid coordinates
@@ -92,6 +110,19 @@ class BranchCombiner:
 
         return self.combined_branches
 
+    def check_colocation(self):
+        """Flag exact and near-duplicate coordinates across all banks."""
+        self.colocation.detect(self.combined_branches)
+        self.colocation.print_summary()
+        self.colocation.save_report(self.combined_branches)
+
+    def check_quality(self) -> bool:
+        """Run the coordinate quality checks; returns False if the gate fails."""
+        passed = self.validator.validate(self.combined_branches)
+        self.validator.print_summary()
+        self.validator.save_report(self.combined_branches)
+        return passed
+
     def save_combined(self):
         """Save combined data to CSV."""
         if not self.combined_branches:
@@ -101,14 +132,15 @@ class BranchCombiner:
         fieldnames = ['bank_name', 'lat', 'long']
 
         with open(self.OUTPUT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
             writer.writeheader()
             writer.writerows(self.combined_branches)
 
         print(f"\nSaved {len(self.combined_branches)} total branches to {self.OUTPUT_FILE}")
+        write_store(self.combined_branches, source_csv=self.OUTPUT_FILE)
 
-    def run(self):
-        """Main execution method."""
+    def run(self) -> bool:
+        """Main execution method. Returns False if the quality gate failed."""
         print("=" * 60)
         print("Combining all bank branch CSV files")
         print("=" * 60)
@@ -132,8 +164,19 @@ class BranchCombiner:
         for bank, count in sorted(bank_counts.items()):
             print(f"  {bank:20s}: {count:3d} branches")
 
+        print()
+        self.check_colocation()
+
+        print()
+        if not self.check_quality():
+            print(f"\nQuality gate failed (minimum bank score {self.validator.min_bank_score:g}); "
+                  f"{self.OUTPUT_FILE} was not updated.")
+            return False
+
         print()
         self.save_combined()
+        self.dashboard_exporter.export(self.combined_branches)
+        self.tile_exporter.export(self.combined_branches)
 
         # Show first few entries as example
         if self.combined_branches:
@@ -142,11 +185,13 @@ class BranchCombiner:
                 print(f"  {i}. {branch['bank_name']:20s} - ({branch['lat']}, {branch['long']})")
 
         print("\nDone!")
+        return True
 
 
 def main():
     combiner = BranchCombiner()
-    combiner.run()
+    if not combiner.run():
+        sys.exit(1)
 
 
 if __name__ == "__main__":
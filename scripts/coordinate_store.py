@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped binary store for the combined branch coordinates.
+combine.py writes it next to data/combined_atms.csv; analysis scripts load it
+with np.load(mmap_mode='r') so startup skips CSV parsing entirely and every
+process reading the store shares one page-cached copy.
+
+Layout of data/combined_atms.store/:
+    lat.npy, long.npy   float64 coordinates, rows grouped by bank
+    lat32.npy, long32.npy   float32 copies for plotting / tiling
+    bank_codes.npy      uint16 index into meta.json "banks"
+    offsets.npy         int64, rows of bank i are offsets[i]:offsets[i+1]
+    meta.json           bank table, row count and source CSV fingerprint
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+STORE_DIR = "data/combined_atms.store"
+SOURCE_CSV = "data/combined_atms.csv"
+FORMAT_VERSION = 1
+
+
+def _file_sha256(path: str) -> str:
+    """Hash a file in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(path: str) -> Dict:
+    """Cheap (size, mtime) plus content hash of the source CSV."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _file_sha256(path)}
+
+
+def _write_meta(path: str, meta: Dict):
+    """Write meta.json through a temporary file, so readers never see it half written."""
+    temp = os.path.join(path, f'meta.json.{os.getpid()}.tmp')
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(temp, os.path.join(path, 'meta.json'))
+
+
+class CoordinateStore:
+    """Read-only view over a memory-mapped coordinate store."""
+
+    def __init__(self, path: str = STORE_DIR):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        self.banks: List[str] = self.meta['banks']
+        self.lat = self._load('lat')
+        self.long = self._load('long')
+        self.bank_codes = self._load('bank_codes')
+        self.offsets = self._load('offsets')
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def float32(self):
+        """Return the float32 (lat, long) arrays."""
+        return self._load('lat32'), self._load('long32')
+
+    def bank_slice(self, bank_name: str) -> slice:
+        """Row range holding one bank's branches."""
+        code = self.banks.index(bank_name)
+        return slice(int(self.offsets[code]), int(self.offsets[code + 1]))
+
+    def is_fresh(self, csv_path: str = SOURCE_CSV) -> bool:
+        """True if the store was built from the current contents of csv_path."""
+        if not os.path.exists(csv_path):
+            return False
+        source = self.meta.get('source', {})
+        stat = os.stat(csv_path)
+        if stat.st_size != source.get('size'):
+            return False
+        if stat.st_mtime_ns == source.get('mtime_ns'):
+            return True
+        # Timestamps change on checkout/copy; fall back to the content hash
+        if _file_sha256(csv_path) != source.get('sha256'):
+            return False
+        # Same content: remember the new mtime so later runs skip the hash
+        self.meta['source'] = {**source, 'mtime_ns': stat.st_mtime_ns}
+        try:
+            _write_meta(self.path, self.meta)
+        except OSError:
+            pass  # read-only store: still fresh, just hashed again next time
+        return True
+
+    def to_frame(self):
+        """
+        Build the bank_name/lat/long DataFrame used by the analysis.
+        Coordinate columns wrap the memory maps without copying.
+        """
+        import pandas as pd
+
+        names = np.asarray(self.banks, dtype=object)[self.bank_codes]
+        return pd.DataFrame({'bank_name': names, 'lat': self.lat, 'long': self.long}, copy=False)
+
+
+def write_store(branches: List[Dict], path: str = STORE_DIR, source_csv: str = SOURCE_CSV):
+    """
+    Write the combined branch list as a binary store.
+    Banks are numbered in order of first appearance and rows are stably
+    grouped by bank, so the row order matches the CSV written by combine.py.
+    """
+    banks = list(dict.fromkeys(b['bank_name'] for b in branches))
+    bank_index = {bank: code for code, bank in enumerate(banks)}
+
+    codes = np.fromiter((bank_index[b['bank_name']] for b in branches),
+                        dtype=np.uint16, count=len(branches))
+    lat = np.fromiter((float(b['lat']) for b in branches), dtype=np.float64, count=len(branches))
+    long = np.fromiter((float(b['long']) for b in branches), dtype=np.float64, count=len(branches))
+
+    order = np.argsort(codes, kind='stable')
+    codes, lat, long = codes[order], lat[order], long[order]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(banks)))]).astype(np.int64)
+
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        'lat': lat, 'long': long,
+        'lat32': lat.astype(np.float32), 'long32': long.astype(np.float32),
+        'bank_codes': codes, 'offsets': offsets,
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f'{name}.npy'), array)
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'rows': len(branches),
+        'banks': banks,
+        'source': _fingerprint(source_csv) if os.path.exists(source_csv) else {},
+    }
+    _write_meta(path, meta)
+
+    print(f"Saved binary coordinate store to {path}/")
+
+
+def load_store(path: str = STORE_DIR, csv_path: str = SOURCE_CSV) -> Optional[CoordinateStore]:
+    """Open the store if it exists and matches csv_path; otherwise None."""
+    if not os.path.exists(os.path.join(path, 'meta.json')):
+        return None
+    store = CoordinateStore(path)
+    if store.meta.get('version') != FORMAT_VERSION or not store.is_fresh(csv_path):
+        return None
+    return store
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Export the combined branches as the dashboard's data payload.
+Output: dashboard/public/data/manifest.json and one content-hashed shard per
+bank in dashboard/public/data/shards/, each with precompressed .gz/.br copies.
+
+Shards are columnar:
+    lat     quantized latitudes (units of 1/scale degree), delta-encoded
+    long    quantized longitudes, delta-encoded
+A shard's file name contains the hash of its content, so it never changes
+once published and clients can cache it forever. The manifest is the only
+file that changes on a data refresh: it lists every bank with its branch
+count and current shard. Decoding lives in dashboard/lib/branches.ts.
+
+Clients may still hold the previous manifest (the service worker serves it
+from cache while it fetches the new one), so an export keeps the shards of
+the previous manifest as well and deletes only older ones.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List
+
+try:
+    import brotli
+except ImportError:  # optional: .br variants are skipped without it
+    brotli = None
+
+
+FORMAT_VERSION = 2
+
+
+class DashboardExporter:
+    """Builds and writes the sharded dashboard branch payload."""
+
+    OUTPUT_DIR = "dashboard/public/data"
+    SHARD_DIR = "shards"
+    MANIFEST_FILE = "manifest.json"
+
+    # 1e-5 degrees is about 1.1 m, well below the scrapers' accuracy
+    SCALE = 100000
+
+    def __init__(self, output_dir: str = OUTPUT_DIR):
+        self.output_dir = output_dir
+
+    @staticmethod
+    def _delta_encode(values: List[int]) -> List[int]:
+        """First value as-is, then differences to the previous value."""
+        return [v - p for v, p in zip(values, [0] + values[:-1])]
+
+    @staticmethod
+    def _slug(bank_name: str) -> str:
+        """File-name-safe form of a bank name."""
+        return re.sub(r'[^a-z0-9]+', '-', bank_name.lower()).strip('-')
+
+    @staticmethod
+    def _serialize(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _manifest_shards(self) -> set:
+        """Shard file names referenced by the manifest currently on disk."""
+        try:
+            with open(os.path.join(self.output_dir, self.MANIFEST_FILE), 'rb') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        return {os.path.basename(bank['file']) for bank in manifest.get('banks', [])}
+
+    def build_shard(self, branches: List[Dict]) -> Dict:
+        """Encode one bank's branches, sorted by position so deltas stay small."""
+        rows = sorted((round(float(b['lat']) * self.SCALE), round(float(b['long']) * self.SCALE))
+                      for b in branches)
+        return {
+            'version': FORMAT_VERSION,
+            'scale': self.SCALE,
+            'lat': self._delta_encode([r[0] for r in rows]),
+            'long': self._delta_encode([r[1] for r in rows]),
+        }
+
+    @staticmethod
+    def write_variants(path: str, data: bytes) -> Dict[str, int]:
+        """Write data plus .gz and (if brotli is installed, else removed) .br copies; returns sizes."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sizes = {}
+
+        with open(path, 'wb') as f:
+            f.write(data)
+        sizes['raw'] = len(data)
+
+        # mtime=0 keeps the .gz byte-identical across runs
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        with open(path + '.gz', 'wb') as f:
+            f.write(compressed)
+        sizes['gz'] = len(compressed)
+
+        if brotli is not None:
+            compressed = brotli.compress(data, quality=11)
+            with open(path + '.br', 'wb') as f:
+                f.write(compressed)
+            sizes['br'] = len(compressed)
+        elif os.path.exists(path + '.br'):
+            # A .br from an earlier run would be served for this newer file
+            os.remove(path + '.br')
+
+        return sizes
+
+    def export(self, branches: List[Dict]) -> Dict:
+        """Write every bank shard and the manifest; returns the manifest."""
+        by_bank = {}
+        for branch in branches:
+            by_bank.setdefault(branch['bank_name'], []).append(branch)
+
+        shard_dir = os.path.join(self.output_dir, self.SHARD_DIR)
+        previous = self._manifest_shards()
+        entries = []
+        written = set()
+        totals = {}
+        for bank_name, bank_branches in by_bank.items():
+            data = self._serialize(self.build_shard(bank_branches))
+            content_hash = hashlib.sha256(data).hexdigest()[:12]
+            filename = f"{self._slug(bank_name)}.{content_hash}.json"
+
+            sizes = self.write_variants(os.path.join(shard_dir, filename), data)
+            for kind, size in sizes.items():
+                totals[kind] = totals.get(kind, 0) + size
+            written.update(filename + ext for ext in ('', '.gz', '.br'))
+
+            entries.append({
+                'name': bank_name,
+                'count': len(bank_branches),
+                'file': f"{self.SHARD_DIR}/{filename}",
+                'hash': content_hash,
+            })
+
+        # Keep this export's and the previous manifest's shards; older ones are unreferenced
+        keep = written | {filename + ext for filename in previous for ext in ('', '.gz', '.br')}
+        for filename in os.listdir(shard_dir):
+            if filename not in keep:
+                os.remove(os.path.join(shard_dir, filename))
+
+        manifest = {
+            'version': FORMAT_VERSION,
+            'hash': hashlib.sha256(''.join(e['hash'] for e in entries).encode('utf-8')).hexdigest()[:12],
+            'count': len(branches),
+            'scale': self.SCALE,
+            'banks': entries,
+        }
+        manifest_path = os.path.join(self.output_dir, self.MANIFEST_FILE)
+        with open(manifest_path, 'wb') as f:
+            f.write(self._serialize(manifest))
+
+        summary = ', '.join(f"{kind} {size / 1024:.1f} KB" for kind, size in totals.items())
+        print(f"Saved dashboard manifest to {manifest_path} (hash {manifest['hash']}) "
+              f"and {len(entries)} bank shards ({summary})")
+        if brotli is None:
+            print("  Note: 'brotli' is not installed, skipped the .br variants")
+
+        return manifest
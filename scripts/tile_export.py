@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Pre-generate a static JSON tile pyramid for the dashboard branch map.
+Output: dashboard/public/tiles/index.json and tiles/{z}/{x}/{y}.json
+
+Tiles use the standard Web Mercator (slippy map) scheme, 256 px per tile.
+Up to CLUSTER_MAX_ZOOM, points are merged into grid clusters of CELL_PX
+pixels; above it, tiles hold individual branches. Every tile carries an
+"all" layer plus one layer per bank so the map can filter without
+re-clustering in the browser:
+
+    {"all":   [[lat, long, count, bank], ...],   bank = -1 for mixed clusters
+     "banks": {"<bank index>": [[lat, long, count], ...]}}
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+
+
+class TileExporter:
+    """Builds the clustered, per-bank JSON tile pyramid."""
+
+    OUTPUT_DIR = "dashboard/public/tiles"
+
+    TILE_SIZE = 256
+    CELL_PX = 64            # Must divide TILE_SIZE so cells never straddle tiles
+    MIN_ZOOM = 5
+    MAX_ZOOM = 11           # The map over-zooms these tiles beyond this level
+    CLUSTER_MAX_ZOOM = 10
+
+    def __init__(self, output_dir: str = OUTPUT_DIR):
+        self.output_dir = output_dir
+
+    @classmethod
+    def project(cls, lat: np.ndarray, lon: np.ndarray, zoom: int):
+        """Web Mercator global pixel coordinates at a zoom level."""
+        world = cls.TILE_SIZE * 2 ** zoom
+        sin_lat = np.sin(np.radians(np.clip(lat, -85.05112878, 85.05112878)))
+        x = (lon + 180.0) / 360.0 * world
+        y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)) * world
+        return x, y
+
+    @staticmethod
+    def _add_layer(tiles: Dict, keys: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray,
+                   lat: np.ndarray, lon: np.ndarray, codes: np.ndarray, per_bank: bool):
+        """
+        Merge rows sharing a key into one centroid entry and append it to its
+        tile, either to the "all" layer or to the layer of its bank.
+        """
+        uniq, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        mean_lat = np.bincount(inverse, weights=lat) / counts
+        mean_lon = np.bincount(inverse, weights=lon) / counts
+
+        # Rows of a group share a tile, so any member locates the group
+        member = np.empty(len(uniq), dtype=np.int64)
+        member[inverse] = np.arange(len(keys))
+
+        low = np.full(len(uniq), np.iinfo(np.int64).max)
+        high = np.full(len(uniq), -1, dtype=np.int64)
+        np.minimum.at(low, inverse, codes)
+        np.maximum.at(high, inverse, codes)
+        bank = np.where(low == high, low, -1)
+
+        for k in range(len(uniq)):
+            row = member[k]
+            tile = tiles.setdefault((int(tile_x[row]), int(tile_y[row])), {'all': [], 'banks': {}})
+            entry = [round(float(mean_lat[k]), 5), round(float(mean_lon[k]), 5), int(counts[k])]
+            if per_bank:
+                tile['banks'].setdefault(str(int(bank[k])), []).append(entry)
+            else:
+                tile['all'].append(entry + [int(bank[k])])
+
+    def build_zoom(self, lat: np.ndarray, lon: np.ndarray, codes: np.ndarray, zoom: int) -> Dict:
+        """Return {(x, y): tile dict} for one zoom level."""
+        px, py = self.project(lat, lon, zoom)
+        tile_x = np.floor(px / self.TILE_SIZE).astype(np.int64)
+        tile_y = np.floor(py / self.TILE_SIZE).astype(np.int64)
+
+        if zoom <= self.CLUSTER_MAX_ZOOM:
+            cell_x = np.floor(px / self.CELL_PX).astype(np.int64)
+            cell_y = np.floor(py / self.CELL_PX).astype(np.int64)
+            groups = cell_y * (int(cell_x.max()) + 1) + cell_x
+        else:
+            groups = np.arange(len(lat), dtype=np.int64)
+
+        tiles = {}
+        n_banks = int(codes.max()) + 1
+        self._add_layer(tiles, groups, tile_x, tile_y, lat, lon, codes, per_bank=False)
+        # Cluster each bank on its own so filtered views get exact counts
+        self._add_layer(tiles, groups * n_banks + codes, tile_x, tile_y, lat, lon, codes, per_bank=True)
+        return tiles
+
+    def export(self, branches: List[Dict]) -> Dict:
+        """Write the full pyramid and its index; returns the index."""
+        banks = list(dict.fromkeys(b['bank_name'] for b in branches))
+        bank_index = {bank: code for code, bank in enumerate(banks)}
+        lat = np.array([float(b['lat']) for b in branches])
+        lon = np.array([float(b['long']) for b in branches])
+        codes = np.array([bank_index[b['bank_name']] for b in branches], dtype=np.int64)
+
+        # Start from an empty directory so tiles that became empty disappear
+        if os.path.isdir(self.output_dir):
+            shutil.rmtree(self.output_dir)
+
+        digest = hashlib.sha256()
+        available = {}
+        n_files = 0
+        for zoom in range(self.MIN_ZOOM, self.MAX_ZOOM + 1):
+            tiles = self.build_zoom(lat, lon, codes, zoom)
+            available[str(zoom)] = sorted([x, y] for x, y in tiles)
+            for (x, y), tile in sorted(tiles.items()):
+                tile_dir = os.path.join(self.output_dir, str(zoom), str(x))
+                os.makedirs(tile_dir, exist_ok=True)
+                data = json.dumps(tile, separators=(',', ':'))
+                digest.update(f'{zoom}/{x}/{y}:'.encode('utf-8') + data.encode('utf-8'))
+                with open(os.path.join(tile_dir, f'{y}.json'), 'w', encoding='utf-8') as f:
+                    f.write(data)
+                n_files += 1
+
+        index = {
+            'version': FORMAT_VERSION,
+            'hash': digest.hexdigest()[:16],
+            'tileSize': self.TILE_SIZE,
+            'minZoom': self.MIN_ZOOM,
+            'maxZoom': self.MAX_ZOOM,
+            'clusterMaxZoom': self.CLUSTER_MAX_ZOOM,
+            'banks': banks,
+            'bounds': [[round(float(lat.min()), 5), round(float(lon.min()), 5)],
+                       [round(float(lat.max()), 5), round(float(lon.max()), 5)]],
+            'tiles': available,
+        }
+        with open(os.path.join(self.output_dir, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+        print(f"Saved {n_files} map tiles (zoom {self.MIN_ZOOM}-{self.MAX_ZOOM}) to {self.output_dir}/")
+        return index
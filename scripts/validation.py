@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Vectorized data-quality validation for combined branch coordinates.
+Every check runs as whole-array NumPy operations so the validator can gate
+each combine, even at millions of rows.
+Output: data/quality_report.csv (per-bank scores) and
+        data/quality_flags.csv (one row per flagged branch).
+"""
+
+import csv
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from boundaries import BOUNDARY_FILE, ZoneIndex, load_polygons
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Coordinates returned by geocoders when an address cannot be resolved:
+# null island and Nominatim's result for the bare query "Azerbaijan"
+KNOWN_PLACEHOLDERS = [
+    (0.0, 0.0),
+    (40.3936294, 47.7872508),
+]
+
+# City centres used to cross-check coordinates against the address text.
+# Keys are lowercase spellings as they appear in scraped addresses.
+CITY_CENTRES = {
+    'bakı': (40.4093, 49.8671), 'baku': (40.4093, 49.8671),
+    'sumqayıt': (40.5855, 49.6317), 'sumqayit': (40.5855, 49.6317),
+    'gəncə': (40.6828, 46.3606), 'ganja': (40.6828, 46.3606),
+    'mingəçevir': (40.7703, 47.0496), 'lənkəran': (38.7536, 48.8511),
+    'şəki': (41.1919, 47.1706), 'şirvan': (39.9375, 48.9206),
+    'yevlax': (40.6200, 47.1500), 'xaçmaz': (41.4631, 48.8022),
+    'şamaxı': (40.6319, 48.6414), 'quba': (41.3611, 48.5128),
+    'qusar': (41.4275, 48.4303), 'zaqatala': (41.6314, 46.6439),
+    'qax': (41.4206, 46.9219), 'bərdə': (40.3747, 47.1256),
+    'ağdaş': (40.6475, 47.4672), 'göyçay': (40.6533, 47.7406),
+    'naxçıvan': (39.2089, 45.4122), 'ordubad': (38.9050, 46.0236),
+    'masallı': (39.0344, 48.6658), 'astara': (38.4561, 48.8750),
+    'salyan': (39.5936, 48.9836), 'neftçala': (39.3756, 49.2467),
+    'imişli': (39.8697, 48.0597), 'sabirabad': (40.0081, 48.4783),
+    'kürdəmir': (40.3397, 48.1617), 'ucar': (40.5086, 47.6492),
+    'ağsu': (40.5672, 48.3950), 'ismayıllı': (40.7872, 48.1519),
+    'qəbələ': (40.9814, 47.8458), 'oğuz': (41.0728, 47.4653),
+    'balakən': (41.7256, 46.4042), 'tovuz': (40.9925, 45.6286),
+    'qazax': (41.0922, 45.3656), 'ağstafa': (41.1194, 45.4539),
+    'şəmkir': (40.8297, 46.0172), 'tərtər': (40.3439, 46.9328),
+    'ağcabədi': (40.0508, 47.4561), 'beyləqan': (39.7742, 47.6183),
+    'biləsuvar': (39.4597, 48.5494), 'cəlilabad': (39.2081, 48.5017),
+    'siyəzən': (41.0783, 49.1122), 'şabran': (41.2158, 48.9986),
+    'xırdalan': (40.4486, 49.7553), 'füzuli': (39.6008, 47.1456),
+    'culfa': (38.9606, 45.6297), 'şərur': (39.5536, 44.9846),
+    'sədərək': (39.7106, 44.8864),
+}
+
+# Baku's administrative area reaches Ələt and the far end of Absheron
+CITY_RADIUS_KM = {'bakı': 70.0, 'baku': 70.0}
+DEFAULT_CITY_RADIUS_KM = 25.0
+DISTRICT_RADIUS_KM = 40.0
+
+CITY_PATTERN = re.compile(
+    r'(?<!\w)(' + '|'.join(sorted(CITY_CENTRES, key=len, reverse=True)) + r')(?!\w)\W*(\w*)')
+# A city name followed by one of these is a street or a larger region
+# ("Salyan şossesi", "Naxçıvan MR", "Sədərək Ticarət Mərkəzi"), not
+# the branch's own city
+NOT_A_CITY_SUFFIXES = ('şosse', 'pr', 'küç', 'mr', 'muxtar', 'yolu', 'ticarət')
+DISTRICT_SUFFIXES = ('rayon', 'r')
+
+
+class CoordinateValidator:
+    """Runs whole-table quality checks and scores each bank's coordinates."""
+
+    REPORT_FILE = "data/quality_report.csv"
+    FLAGS_FILE = "data/quality_flags.csv"
+
+    # Penalty per failed check; a row's score is 1 minus the summed
+    # penalties (floored at 0) and a bank's score is its mean row score.
+    CHECK_WEIGHTS = {
+        'outside_country': 1.0,
+        'swapped_lat_long': 1.0,
+        'placeholder': 0.7,
+        'city_mismatch': 0.5,
+        'low_precision': 0.3,
+    }
+
+    MIN_DECIMALS = 3        # Fewer decimals than this is coarser than ~100 m
+    PLACEHOLDER_REPEATS = 3  # Identical coordinates at this many different addresses
+
+    def __init__(self, min_bank_score: float = 50.0, boundary_file: str = BOUNDARY_FILE):
+        self.min_bank_score = min_bank_score
+        self.flags = {}
+        self.bank_scores = []
+        # The coarse `country` outline shared with the analysis (mainland and
+        # the Nakhchivan exclave); it only needs to catch points that are
+        # clearly not in Azerbaijan
+        self.country = ZoneIndex.from_polygons('country', load_polygons('country', boundary_file))
+
+    def points_in_country(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Whether each point lies inside the country outline (grid point-in-polygon index)."""
+        return self.country.assign(lat, lon)['country'] == 'in'
+
+    @staticmethod
+    def decimal_places(values: np.ndarray, max_places: int = 7) -> np.ndarray:
+        """Number of significant decimal places of each value, capped at max_places."""
+        places = np.full(len(values), max_places, dtype=np.int8)
+        undecided = np.ones(len(values), dtype=bool)
+        for k in range(max_places):
+            scaled = values * 10.0 ** k
+            exact = undecided & (np.abs(scaled - np.round(scaled)) < 1e-6)
+            places[exact] = k
+            undecided &= ~exact
+        return places
+
+    @staticmethod
+    def distinct_per_group(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Number of distinct values (non-negative ints) within each group."""
+        pairs = np.unique(groups.astype(np.int64) * (int(values.max()) + 1) + values)
+        return np.bincount(pairs // (int(values.max()) + 1), minlength=int(groups.max()) + 1)
+
+    @staticmethod
+    def address_codes(addresses: List[str]) -> np.ndarray:
+        """Integer code per row, equal for addresses that differ only in case and punctuation."""
+        lookup = {}
+        return np.fromiter((lookup.setdefault(re.sub(r'\W+', ' ', (a or '').lower()).strip(), len(lookup))
+                            for a in addresses), dtype=np.int64, count=len(addresses))
+
+    @staticmethod
+    def match_cities(addresses: List[str]):
+        """
+        Map each address to the first city name used as a place in it.
+        Matching runs once per distinct address; returns per-row city lat,
+        lon and radius arrays with NaN where no city was recognised.
+        """
+        lookup = {address: code for code, address in enumerate(dict.fromkeys(addresses))}
+        codes = np.fromiter(map(lookup.__getitem__, addresses), dtype=np.int64, count=len(addresses))
+
+        table = np.full((len(lookup), 3), np.nan)
+        for address, code in lookup.items():
+            for match in CITY_PATTERN.finditer((address or '').lower()):
+                city, suffix = match.groups()
+                if suffix.startswith(NOT_A_CITY_SUFFIXES):
+                    continue
+                if suffix.startswith(DISTRICT_SUFFIXES):
+                    radius = DISTRICT_RADIUS_KM
+                else:
+                    radius = DEFAULT_CITY_RADIUS_KM
+                table[code] = (*CITY_CENTRES[city], max(radius, CITY_RADIUS_KM.get(city, 0.0)))
+                break
+
+        rows = table[codes]
+        return rows[:, 0], rows[:, 1], rows[:, 2]
+
+    def run_checks(self, lat: np.ndarray, lon: np.ndarray, addresses: List[str] = None,
+                   banks: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every check over the whole table; returns boolean masks by name.
+        banks (integer bank codes) and addresses are needed for the shared-coordinate
+        placeholder check, which is skipped without them.
+        """
+        inside = self.points_in_country(lat, lon)
+        swapped = ~inside & self.points_in_country(lon, lat)
+
+        placeholder = np.zeros(len(lat), dtype=bool)
+        for p_lat, p_lon in KNOWN_PLACEHOLDERS:
+            placeholder |= (lat == p_lat) & (lon == p_lon)
+        # Whole-degree coordinates are a typical "unknown" fill value
+        placeholder |= (lat == np.round(lat)) & (lon == np.round(lon))
+        # Exact coordinates given to several banks' branches at different
+        # addresses are a geocoder's city-centre fallback. One bank's
+        # duplicates, or banks sharing a building, are real co-location
+        # (reported by colocation.py) and are not penalised here.
+        # Coordinates are packed into one int64 at 1e-7 degree resolution,
+        # far cheaper to sort than coordinate pairs.
+        if addresses is not None and banks is not None and len(lat):
+            lat_q = np.round((lat + 90.0) * 1e7).astype(np.int64)
+            lon_q = np.round((lon + 180.0) * 1e7).astype(np.int64)
+            _, group = np.unique((lat_q << 32) | lon_q, return_inverse=True)
+            group = group.ravel()
+            fallback = ((self.distinct_per_group(group, banks) >= 2)
+                        & (self.distinct_per_group(group, self.address_codes(addresses)) >= self.PLACEHOLDER_REPEATS))
+            placeholder |= fallback[group]
+
+        decimals = np.minimum(self.decimal_places(lat), self.decimal_places(lon))
+        low_precision = decimals < self.MIN_DECIMALS
+
+        city_mismatch = np.zeros(len(lat), dtype=bool)
+        if addresses is not None:
+            c_lat, c_lon, c_radius = self.match_cities(addresses)
+            known = ~np.isnan(c_lat)
+            phi1, phi2 = np.radians(lat[known]), np.radians(c_lat[known])
+            dlat = phi2 - phi1
+            dlon = np.radians(c_lon[known] - lon[known])
+            a = np.sin(dlat / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlon / 2) ** 2
+            dist_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            city_mismatch[known] = dist_km > c_radius[known]
+            # A point outside the country is already reported as such
+            city_mismatch &= inside
+
+        return {
+            'outside_country': ~inside & ~swapped,
+            'swapped_lat_long': swapped,
+            'placeholder': placeholder & ~swapped,
+            'city_mismatch': city_mismatch,
+            'low_precision': low_precision,
+        }
+
+    def score_banks(self, bank_codes: np.ndarray, bank_names: List[str]) -> List[Dict]:
+        """Aggregate row penalties into a 0-100 quality score per bank."""
+        penalty = np.zeros(len(bank_codes))
+        for check, mask in self.flags.items():
+            penalty += mask * self.CHECK_WEIGHTS[check]
+        row_score = np.maximum(1.0 - penalty, 0.0)
+
+        n_banks = len(bank_names)
+        totals = np.bincount(bank_codes, minlength=n_banks)
+        score_sums = np.bincount(bank_codes, weights=row_score, minlength=n_banks)
+        check_counts = {check: np.bincount(bank_codes, weights=mask, minlength=n_banks)
+                        for check, mask in self.flags.items()}
+
+        self.bank_scores = []
+        for code, bank in enumerate(bank_names):
+            if totals[code] == 0:
+                continue
+            entry = {'bank_name': bank, 'branches': int(totals[code])}
+            for check in self.CHECK_WEIGHTS:
+                entry[check] = int(check_counts[check][code])
+            entry['quality_score'] = round(score_sums[code] / totals[code] * 100, 1)
+            self.bank_scores.append(entry)
+
+        self.bank_scores.sort(key=lambda e: e['quality_score'])
+        return self.bank_scores
+
+    def validate(self, branches: List[Dict]) -> bool:
+        """
+        Validate the combined branch list.
+        Returns True when every bank meets min_bank_score.
+        """
+        lat = np.array([float(b['lat']) for b in branches])
+        lon = np.array([float(b['long']) for b in branches])
+        addresses = [b.get('address', '') for b in branches]
+
+        bank_names = sorted({b['bank_name'] for b in branches})
+        bank_index = {bank: code for code, bank in enumerate(bank_names)}
+        bank_codes = np.array([bank_index[b['bank_name']] for b in branches], dtype=np.int64)
+
+        self.flags = self.run_checks(lat, lon, addresses, bank_codes)
+        self.score_banks(bank_codes, bank_names)
+
+        return all(e['quality_score'] >= self.min_bank_score for e in self.bank_scores)
+
+    def save_report(self, branches: List[Dict]):
+        """Write per-bank scores and per-branch flags."""
+        fieldnames = ['bank_name', 'branches'] + list(self.CHECK_WEIGHTS) + ['quality_score']
+        with open(self.REPORT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self.bank_scores)
+
+        flagged = np.zeros(len(branches), dtype=bool)
+        for mask in self.flags.values():
+            flagged |= mask
+
+        with open(self.FLAGS_FILE, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=['row', 'bank_name', 'lat', 'long', 'flags'])
+            writer.writeheader()
+            for row in np.flatnonzero(flagged).tolist():
+                writer.writerow({
+                    'row': row,
+                    'bank_name': branches[row]['bank_name'],
+                    'lat': branches[row]['lat'],
+                    'long': branches[row]['long'],
+                    'flags': ';'.join(c for c, mask in self.flags.items() if mask[row]),
+                })
+
+        print(f"Saved quality report to {self.REPORT_FILE} ({int(flagged.sum())} branches flagged)")
+
+    def print_summary(self):
+        """Print per-check totals and the bank scores, worst first."""
+        print("Data quality checks:")
+        for check, mask in self.flags.items():
+            print(f"  {check:18s}: {int(mask.sum()):4d} branches")
+        print()
+        print("Quality score by bank (0-100):")
+        for entry in self.bank_scores:
+            marker = '  <-- below gate' if entry['quality_score'] < self.min_bank_score else ''
+            print(f"  {entry['bank_name']:20s}: {entry['quality_score']:5.1f}{marker}")
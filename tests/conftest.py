@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The analysis package lives in scripts/, which the scripts put on the path themselves
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pytest
+
+from boundaries import ZoneIndex, _feature_edges, load_polygons
+
+
+def _star(rng, centre, radius, n=24):
+    """A closed non-convex ring around centre, as (long, lat) pairs."""
+    angle = np.sort(rng.random(n)) * 2 * np.pi
+    r = radius * (0.4 + 0.6 * rng.random(n))
+    ring = np.column_stack([centre[0] + r * np.cos(angle), centre[1] + r * np.sin(angle)])
+    return np.vstack([ring, ring[:1]]).tolist()
+
+
+def _levels(seed):
+    """Two levels of overlapping star features; one has a hole and one is a MultiPolygon."""
+    rng = np.random.default_rng(seed)
+    zone = [
+        ('North', {'type': 'Polygon', 'coordinates': [_star(rng, (47.0, 41.0), 1.5),
+                                                      _star(rng, (47.0, 41.0), 0.3)]}),
+        ('Centre', {'type': 'Polygon', 'coordinates': [_star(rng, (47.5, 40.2), 1.2)]}),
+        ('Islands', {'type': 'MultiPolygon', 'coordinates': [[_star(rng, (45.5, 39.5), 0.6)],
+                                                            [_star(rng, (49.0, 39.5), 0.8)]]}),
+    ]
+    region = [('Capital', {'type': 'Polygon', 'coordinates': [_star(rng, (48.5, 40.5), 0.9)]})]
+    return {'zone': zone, 'region': region}, {'zone': 'Other', 'region': 'Regions'}
+
+
+def _even_odd(geometry, x, y):
+    """Brute-force ray casting over every edge of a feature."""
+    x0, y0, x1, y1 = _feature_edges(geometry).T
+    spans = (y0[None, :] <= y[:, None]) != (y1[None, :] <= y[:, None])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x0 + (y[:, None] - y0) * (x1 - x0) / (y1 - y0)
+    return (spans & (x_cross > x[:, None])).sum(axis=1) % 2 == 1
+
+
+def _expected(features, default, x, y):
+    labels = np.full(len(x), default, dtype=object)
+    unset = np.ones(len(x), dtype=bool)
+    for name, geometry in features:
+        inside = unset & _even_odd(geometry, x, y)
+        labels[inside] = name
+        unset &= ~inside
+    return labels
+
+
+@pytest.mark.parametrize('grid_cells', [8, 64, 512])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_assign_matches_brute_force_even_odd(grid_cells, seed):
+    levels, defaults = _levels(seed)
+    index = ZoneIndex({level: [(name, _feature_edges(g)) for name, g in features]
+                       for level, features in levels.items()}, defaults, grid_cells=grid_cells)
+
+    rng = np.random.default_rng(seed + 10)
+    # Points across the grid and beyond it
+    x = 44.0 + 6.5 * rng.random(20000)
+    y = 38.0 + 5.0 * rng.random(20000)
+    labels = index.assign(y, x)
+    for level, features in levels.items():
+        np.testing.assert_array_equal(labels[level], _expected(features, defaults[level], x, y))
+
+
+def test_box_label_is_only_given_for_uniform_boxes():
+    levels, defaults = _levels(0)
+    index = ZoneIndex({level: [(name, _feature_edges(g)) for name, g in features]
+                       for level, features in levels.items()}, defaults, grid_cells=64)
+    rng = np.random.default_rng(3)
+    labelled = 0
+    for _ in range(300):
+        low = np.array([44.0, 38.0]) + rng.random(2) * [6.0, 4.5]
+        high = low + rng.random(2) * 0.4
+        label = index.box_label('zone', low, high)
+        if label is None:
+            continue
+        labelled += 1
+        points = low + rng.random((200, 2)) * (high - low)
+        assert (index.assign(points[:, 1], points[:, 0])['zone'] == label).all()
+    assert labelled > 50
+
+
+def test_from_polygons_matches_the_country_feature(tmp_path):
+    levels, _ = _levels(1)
+    # The holed and the multi-part feature, which do not overlap
+    country = [feature for feature in levels['zone'] if feature[0] in ('North', 'Islands')]
+    features = [{'type': 'Feature', 'properties': {'level': 'country', 'name': name}, 'geometry': geometry}
+                for name, geometry in country]
+    path = tmp_path / 'boundaries.geojson'
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+
+    index = ZoneIndex.from_polygons('country', load_polygons('country', str(path)), grid_cells=32)
+    rng = np.random.default_rng(5)
+    x, y = 44.0 + 6.5 * rng.random(5000), 38.0 + 5.0 * rng.random(5000)
+    inside = [_even_odd(geometry, x, y) for _, geometry in country]
+    assert not (inside[0] & inside[1]).any()
+    np.testing.assert_array_equal(index.assign(y, x)['country'] == 'in', inside[0] | inside[1])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import HDBSCAN
+
+from analysis.clustering import COLOCATED_KM, dbscan_labels, hdbscan_graph, hdbscan_labels, radius_graph
+from analysis.geo import haversine_km
+
+
+def _points(seed=0):
+    """Gaussian clusters of different spread, background noise and some co-located duplicates."""
+    rng = np.random.default_rng(seed)
+    centres = rng.random((8, 2)) * [2.0, 4.0] + [39.0, 45.0]
+    groups = [c + rng.normal(scale=0.01 + 0.08 * rng.random(), size=(rng.integers(5, 60), 2)) for c in centres]
+    points = np.vstack(groups + [rng.random((30, 2)) * [2.0, 4.0] + [39.0, 45.0]])
+    points = np.vstack([points, points[rng.choice(len(points), 20)]])
+    return points[:, 0], points[:, 1]
+
+
+def _full_labels(lat, long, min_cluster_size):
+    """HDBSCAN on every pairwise distance, as a sparse matrix with the same co-located spacing."""
+    dist = np.maximum(haversine_km(lat[:, None], long[:, None], lat[None, :], long[None, :]), COLOCATED_KM)
+    np.fill_diagonal(dist, 0.0)
+    full = sparse.csr_matrix(dist)
+    full.setdiag(0.0)
+    return HDBSCAN(min_cluster_size=min_cluster_size, metric='precomputed', copy=True).fit(full.tocsr()).labels_
+
+
+@pytest.mark.parametrize('radius_km', [1.0, 20.0, 500.0])
+def test_hdbscan_graph_is_connected_with_exact_core_distances(radius_km):
+    lat, long = _points()
+    graph = hdbscan_graph(lat, long, radius_graph(lat, long, radius_km), min_samples=5)
+    assert connected_components(graph, directed=False)[0] == 1
+    assert (abs(graph - graph.T) > 1e-9).nnz == 0
+
+    dist = haversine_km(lat[:, None], long[:, None], lat[None, :], long[None, :])
+    dist = np.where(np.eye(len(lat), dtype=bool), 0.0, np.maximum(dist, COLOCATED_KM))
+    core = [np.sort(graph.getrow(i).data)[4] for i in range(len(lat))]
+    np.testing.assert_allclose(core, np.sort(dist, axis=1)[:, 4])
+
+
+@pytest.mark.parametrize('min_cluster_size', [3, 5, 15])
+def test_hdbscan_matches_the_full_matrix_within_the_radius(min_cluster_size):
+    lat, long = _points()
+    labels = hdbscan_labels(lat, long, radius_graph(lat, long, 500.0), min_cluster_size)
+    np.testing.assert_array_equal(labels, _full_labels(lat, long, min_cluster_size))
+
+
+def test_dbscan_rejects_eps_beyond_the_graph():
+    lat, long = _points()
+    graph = radius_graph(lat, long, 10.0)
+    assert len(dbscan_labels(graph, 10.0, 5, graph_radius_km=10.0)) == len(lat)
+    with pytest.raises(ValueError):
+        dbscan_labels(graph, 20.0, 5, graph_radius_km=10.0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from colocation import ColocationDetector, haversine_m
+
+
+def _branches(seed):
+    """Points over a few km with exact duplicates, near duplicates and chains of near points."""
+    rng = np.random.default_rng(seed)
+    lat = 40.35 + 0.05 * rng.random(400)
+    lon = 49.80 + 0.07 * rng.random(400)
+    lat[:20], lon[:20] = lat[20:40], lon[20:40]
+    lat[40:80] = lat[80:120] + rng.normal(scale=1e-4, size=40)
+    lon[40:80] = lon[80:120] + rng.normal(scale=1e-4, size=40)
+    lat[120:130] = lat[120] + 1.5e-4 * np.arange(10)
+    lon[120:130] = lon[120]
+    banks = rng.choice(['A', 'B', 'C'], size=len(lat))
+    return [{'bank_name': b, 'lat': y, 'long': x} for b, y, x in zip(banks, lat, lon)]
+
+
+def _brute_pairs(lat, lon, radius_m):
+    dist = haversine_m(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    i, j = np.nonzero(np.triu(dist <= radius_m, k=1))
+    return set(zip(i.tolist(), j.tolist()))
+
+
+@pytest.mark.parametrize('radius_m', [5.0, 25.0, 100.0])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_pairs_match_brute_force(radius_m, seed):
+    branches = _branches(seed)
+    lat = np.array([b['lat'] for b in branches])
+    lon = np.array([b['long'] for b in branches])
+    pair_i, pair_j, dist = ColocationDetector(radius_m).find_pairs(lat, lon)
+
+    assert (pair_i < pair_j).all()
+    assert len(set(zip(pair_i.tolist(), pair_j.tolist()))) == len(pair_i)
+    assert set(zip(pair_i.tolist(), pair_j.tolist())) == _brute_pairs(lat, lon, radius_m)
+    np.testing.assert_allclose(dist, haversine_m(lat[pair_i], lon[pair_i], lat[pair_j], lon[pair_j]))
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_groups_are_connected_components(seed):
+    branches = _branches(seed)
+    lat = np.array([b['lat'] for b in branches])
+    lon = np.array([b['long'] for b in branches])
+    groups = ColocationDetector(25.0).detect(branches)
+
+    pairs = np.array(sorted(_brute_pairs(lat, lon, 25.0)))
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(lat), len(lat)))
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    expected = sorted(sorted(np.flatnonzero(labels == c).tolist()) for c in np.flatnonzero(sizes > 1))
+    assert sorted(g['rows'] for g in groups) == expected
+
+    for group in groups:
+        rows = group['rows']
+        assert group['kind'] == ('exact' if len({(lat[r], lon[r]) for r in rows}) == 1 else 'near')
+        assert group['banks'] == sorted({branches[r]['bank_name'] for r in rows})
+        assert group['cross_bank'] == (len(group['banks']) > 1)
+    # The planted chain is one group although its ends are 150 m apart
+    assert any(set(range(120, 130)) <= set(g['rows']) for g in groups)
+
+
+def test_no_pairs_for_one_point():
+    pair_i, pair_j, dist = ColocationDetector().find_pairs(np.array([40.0]), np.array([49.0]))
+    assert len(pair_i) == len(pair_j) == len(dist) == 0
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+import coordinate_store
+from coordinate_store import load_store, write_store
+
+
+BRANCHES = [
+    {'bank_name': 'Bank A', 'lat': '40.41', 'long': '49.86'},
+    {'bank_name': 'Bank B', 'lat': '40.68', 'long': '46.36'},
+    {'bank_name': 'Bank A', 'lat': '38.75', 'long': '48.85'},
+]
+
+
+def _write(tmp_path):
+    csv_path = str(tmp_path / 'combined.csv')
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write('bank_name,lat,long\n' + ''.join(f"{b['bank_name']},{b['lat']},{b['long']}\n" for b in BRANCHES))
+    store_path = str(tmp_path / 'combined.store')
+    write_store(BRANCHES, store_path, csv_path)
+    return store_path, csv_path
+
+
+def test_store_round_trip(tmp_path):
+    store = load_store(*_write(tmp_path))
+    np.testing.assert_array_equal(store.lat, [40.41, 38.75, 40.68])
+    assert store.banks == ['Bank A', 'Bank B']
+    assert store.bank_slice('Bank B') == slice(2, 3)
+
+
+def test_touched_csv_is_hashed_once(tmp_path, monkeypatch):
+    store_path, csv_path = _write(tmp_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    hashed = []
+    file_sha256 = coordinate_store._file_sha256
+    monkeypatch.setattr(coordinate_store, '_file_sha256', lambda path: hashed.append(path) or file_sha256(path))
+    assert load_store(store_path, csv_path) is not None
+    assert load_store(store_path, csv_path) is not None
+    assert hashed == [csv_path]
+    assert load_store(store_path, csv_path).meta['source']['mtime_ns'] == os.stat(csv_path).st_mtime_ns
+
+
+def test_changed_csv_is_stale(tmp_path):
+    store_path, csv_path = _write(tmp_path)
+    with open(csv_path, 'r+', encoding='utf-8') as f:
+        f.seek(len('bank_name,lat,long\nBank A,40.4'))
+        f.write('2')
+    assert load_store(store_path, csv_path) is None
@@ -0,0 +1,206 @@
+import glob
+import importlib.util
+import io
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import dag
+from analysis.dag import Node, Pipeline, load_value, save_value
+
+
+# Node functions live in a generated module so a test can edit their source
+SOURCE = '''
+import numpy as np
+
+
+def base(n):
+    return np.arange(n, dtype=np.float64) * {factor}
+
+
+def total(base):
+    return float(base.sum()){total_edit}
+
+
+def scaled(base, scale):
+    return base * scale
+
+
+def other():
+    return 'independent'
+'''
+PARAMS = {'base': ('n',), 'scaled': ('scale',)}
+
+
+def _nodes(tmp_path, version, factor=2, total_edit=''):
+    """Nodes over a module written for this version (new file names keep inspect from reusing old source)."""
+    path = tmp_path / f'nodes_v{version}.py'
+    path.write_text(SOURCE.format(factor=factor, total_edit=total_edit))
+    spec = importlib.util.spec_from_file_location(f'dag_test_nodes_v{version}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return {name: Node(getattr(module, name), name, name, PARAMS.get(name, ()), (), True)
+            for name in ('base', 'total', 'scaled', 'other')}
+
+
+def _run(tmp_path, nodes, **params):
+    pipeline = Pipeline({'n': 5, 'scale': 10.0, **params}, cache_dir=str(tmp_path / 'cache'), nodes=nodes)
+    values = {name: pipeline.value(name) for name in nodes}
+    return values, set(pipeline.stats['computed'])
+
+
+def test_second_run_is_served_from_the_cache(tmp_path):
+    nodes = _nodes(tmp_path, 1)
+    first, computed = _run(tmp_path, nodes)
+    assert computed == set(nodes)
+    second, computed = _run(tmp_path, nodes)
+    assert computed == set()
+    assert second['total'] == first['total'] == 20.0
+    np.testing.assert_array_equal(second['scaled'], first['scaled'])
+
+
+def test_code_change_invalidates_the_node_and_its_dependents(tmp_path):
+    _run(tmp_path, _nodes(tmp_path, 1))
+
+    values, computed = _run(tmp_path, _nodes(tmp_path, 2, factor=3))
+    assert computed == {'base', 'total', 'scaled'}
+    assert values['total'] == 30.0
+
+    # A dependent's own edit reruns only that node
+    _, computed = _run(tmp_path, _nodes(tmp_path, 3, factor=3, total_edit=' + 0.0'))
+    assert computed == {'total'}
+
+
+def test_code_change_with_the_same_value_keeps_dependents(tmp_path):
+    _run(tmp_path, _nodes(tmp_path, 1))
+    # 2 * 1.0 is the same array: base reruns, but keys use dependency values
+    _, computed = _run(tmp_path, _nodes(tmp_path, 2, factor='2 * 1.0'))
+    assert computed == {'base'}
+
+
+def test_param_change_invalidates_only_nodes_that_declare_it(tmp_path):
+    nodes = _nodes(tmp_path, 1)
+    _run(tmp_path, nodes)
+
+    values, computed = _run(tmp_path, nodes, scale=0.5)
+    assert computed == {'scaled'}
+    np.testing.assert_array_equal(values['scaled'], np.arange(5) * 2 * 0.5)
+
+    # n changes base's value, so its dependents follow; 'other' never does
+    _, computed = _run(tmp_path, nodes, n=6)
+    assert computed == {'base', 'total', 'scaled'}
+
+
+def test_key_is_stable_and_follows_params(tmp_path):
+    nodes = _nodes(tmp_path, 1)
+    cache_dir = str(tmp_path / 'cache')
+    key = Pipeline({'n': 5, 'scale': 1.0}, cache_dir=cache_dir, nodes=nodes).key('scaled')
+    assert Pipeline({'n': 5, 'scale': 1.0}, cache_dir=cache_dir, nodes=nodes).key('scaled') == key
+    assert Pipeline({'n': 5, 'scale': 2.0}, cache_dir=cache_dir, nodes=nodes).key('scaled') != key
+    assert Pipeline({'n': 5, 'scale': 2.0}, cache_dir=cache_dir, nodes=nodes).key('total') == \
+        Pipeline({'n': 5, 'scale': 1.0}, cache_dir=cache_dir, nodes=nodes).key('total')
+    with pytest.raises(KeyError):
+        Pipeline({'n': 5}, cache_dir=cache_dir, nodes=nodes).key('scaled')
+
+
+def test_value_round_trips_with_memory_mapped_buffers(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'lat': rng.random(1000), 'bank': rng.choice(['A', 'B'], 1000)})
+    value = {'matrix': rng.random((300, 7)), 'codes': np.arange(1001, dtype=np.uint16), 'frame': frame,
+             'label': 'text', 'nested': [np.ones(3, dtype=bool), (1, 2.5)]}
+    path = str(tmp_path / 'entry.pkl')
+    save_value(path, value)
+
+    # Array data lives in the .buf sidecar at aligned offsets, not in the pickle
+    with open(path, 'rb') as f:
+        layout, _ = pickle.load(f)
+    assert layout and all(offset % dag.BUFFER_ALIGN == 0 for offset, _ in layout)
+    assert os.path.getsize(path) < value['matrix'].nbytes
+    assert os.path.getsize(str(tmp_path / 'entry.buf')) >= value['matrix'].nbytes + value['codes'].nbytes
+
+    loaded = load_value(path)
+    assert dag.fingerprint(loaded) == dag.fingerprint(value)
+    pd.testing.assert_frame_equal(loaded['frame'], frame)
+    matrix = loaded['matrix']
+    np.testing.assert_array_equal(matrix, value['matrix'])
+    assert not matrix.flags.writeable
+    while not isinstance(matrix, np.memmap) and matrix.base is not None:
+        matrix = matrix.base
+    assert isinstance(matrix, np.memmap)
+
+
+def test_memmap_values_go_out_of_band(tmp_path):
+    array = np.lib.format.open_memmap(str(tmp_path / 'source.npy'), mode='w+', dtype=np.float64, shape=(5000,))
+    array[:] = np.arange(5000)
+    path = str(tmp_path / 'entry.pkl')
+    save_value(path, {'lat': array})
+    assert os.path.getsize(path) < 1000
+    np.testing.assert_array_equal(load_value(path)['lat'], np.arange(5000))
+
+
+@pytest.mark.parametrize('torn', ['.buf', '.pkl', '.json'])
+def test_torn_write_leaves_no_loadable_entry(tmp_path, monkeypatch, torn):
+    nodes = _nodes(tmp_path, 1)
+    write_atomic = dag._write_atomic
+
+    def crash_midway(path, write):
+        if not path.endswith(torn):
+            return write_atomic(path, write)
+
+        def half(f):
+            data = io.BytesIO()
+            write(data)
+            f.write(data.getvalue()[:len(data.getvalue()) // 2])
+            raise OSError('disk full')
+        write_atomic(path, half)
+
+    monkeypatch.setattr(dag, '_write_atomic', crash_midway)
+    with pytest.raises(OSError):
+        _run(tmp_path, nodes)
+    monkeypatch.setattr(dag, '_write_atomic', write_atomic)
+
+    assert not glob.glob(str(tmp_path / 'cache' / '*' / '*.tmp'))
+    values, computed = _run(tmp_path, nodes)
+    assert 'base' in computed
+    assert values['total'] == 20.0
+
+
+HELPER_SOURCE = '''
+OFFSET = {offset}
+
+
+class Scaler:
+    def __init__(self, factor):
+        self.factor = factor
+
+    def apply(self, values):
+        return values * self.factor + OFFSET{method_edit}
+
+
+def base(n):
+    return Scaler(2.0).apply(np.arange(n))
+'''
+
+
+def test_fingerprint_follows_helper_classes_and_constants(tmp_path, monkeypatch):
+    # Modules in the scripts directory count as the analysis's own code
+    monkeypatch.setattr(dag, '_SCRIPTS_DIR', str(tmp_path))
+
+    def fingerprint(version, offset=0, method_edit=''):
+        path = tmp_path / f'helpers_v{version}.py'
+        path.write_text('import numpy as np\n' + HELPER_SOURCE.format(offset=offset, method_edit=method_edit))
+        spec = importlib.util.spec_from_file_location(f'dag_test_helpers_v{version}', path)
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, spec.name, module)
+        spec.loader.exec_module(module)
+        return dag.code_fingerprint(module.base)
+
+    original = fingerprint(1)
+    assert fingerprint(2) == original
+    assert fingerprint(3, method_edit=' + 0') != original
+    # A constant that only a method reads
+    assert fingerprint(4, offset=1) != original
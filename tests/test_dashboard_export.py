@@ -0,0 +1,45 @@
+import json
+import os
+
+import dashboard_export
+from dashboard_export import DashboardExporter
+
+
+def _branches(n, bank='Bank A'):
+    return [{'bank_name': bank, 'lat': 40.0 + 0.01 * i, 'long': 49.0 + 0.01 * i} for i in range(n)]
+
+
+def _manifest(exporter):
+    with open(os.path.join(exporter.output_dir, exporter.MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def _shards_on_disk(exporter):
+    return {name for name in os.listdir(os.path.join(exporter.output_dir, exporter.SHARD_DIR))
+            if name.endswith('.json')}
+
+
+def _files(manifest):
+    return {os.path.basename(bank['file']) for bank in manifest['banks']}
+
+
+def test_export_keeps_the_previous_manifests_shards(tmp_path):
+    exporter = DashboardExporter(str(tmp_path))
+    generations = []
+    for n in (3, 4, 5):
+        exporter.export(_branches(n) + _branches(2, 'Bank B'))
+        generations.append(_files(_manifest(exporter)))
+
+    # Bank B's shard is unchanged; Bank A's first shard is two manifests old and gone
+    assert _shards_on_disk(exporter) == generations[1] | generations[2]
+    assert not (generations[0] - generations[1]) & _shards_on_disk(exporter)
+
+
+def test_stale_brotli_variant_is_removed_without_brotli(tmp_path, monkeypatch):
+    path = str(tmp_path / 'data.json')
+    with open(path + '.br', 'wb') as f:
+        f.write(b'stale')
+    monkeypatch.setattr(dashboard_export, 'brotli', None)
+    sizes = DashboardExporter.write_variants(path, b'{"fresh":true}')
+    assert sorted(os.listdir(tmp_path)) == ['data.json', 'data.json.gz']
+    assert 'br' not in sizes
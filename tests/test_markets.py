@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.markets import MarketAreas
+
+
+# An L-shaped mainland with a square hole, and a separate exclave (closed long, lat rings)
+COUNTRY = [
+    [np.array([[45.0, 38.0], [50.0, 38.0], [50.0, 40.0], [47.0, 40.0], [47.0, 42.0], [45.0, 42.0], [45.0, 38.0]]),
+     np.array([[45.5, 38.5], [45.5, 39.0], [46.0, 39.0], [46.0, 38.5], [45.5, 38.5]])],
+    [np.array([[43.0, 39.0], [44.0, 39.0], [44.0, 40.0], [43.0, 40.0], [43.0, 39.0]])],
+]
+BANKS = ['A', 'B', 'C']
+
+
+def _inside(rng, n):
+    """Random points of the mainland and the exclave (some in the hole and the notch, which is fine)."""
+    lat = np.round(38.0 + 4.0 * rng.random(n), 4)
+    long = np.round(np.where(rng.random(n) < 0.85, 45.0 + 5.0 * rng.random(n), 43.0 + rng.random(n)), 4)
+    return lat, long
+
+
+def _rebuilt(markets, demand):
+    """A fresh diagram of the live branches, in branch id order."""
+    live = [b for b, s in enumerate(markets.branch_site) if s >= 0]
+    lat = [markets.site_key[markets.branch_site[b]][0] for b in live]
+    long = [markets.site_key[markets.branch_site[b]][1] for b in live]
+    banks = [markets.branch_bank[b] for b in live]
+    return MarketAreas(lat, long, banks, COUNTRY, *demand)
+
+
+def _assert_same(markets, demand):
+    fresh = _rebuilt(markets, demand)
+    incremental = markets.branches().reset_index(drop=True)
+    pd.testing.assert_frame_equal(incremental, fresh.branches().reset_index(drop=True), rtol=1e-7)
+    pd.testing.assert_frame_equal(markets.adjacency(), fresh.adjacency())
+    assert incremental['area_km2'].sum() == pytest.approx(markets.country_km2, rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_add_and_remove_match_a_full_rebuild(seed):
+    rng = np.random.default_rng(seed)
+    lat, long = _inside(rng, 40)
+    banks = rng.choice(BANKS, size=len(lat))
+    dem_lat, dem_long = _inside(rng, 2000)
+    demand = (dem_lat, dem_long, rng.random(len(dem_lat)))
+    markets = MarketAreas(lat, long, banks, COUNTRY, *demand)
+    _assert_same(markets, demand)
+
+    for step in range(60):
+        live = [b for b, s in enumerate(markets.branch_site) if s >= 0]
+        if rng.random() < 0.4 and len(live) > 3:
+            markets.remove(int(rng.choice(live)))
+        elif rng.random() < 0.2:
+            # A second branch at an existing site
+            site = markets.branch_site[int(rng.choice(live))]
+            markets.add(*markets.site_key[site], rng.choice(BANKS))
+        else:
+            new_lat, new_long = _inside(rng, 1)
+            markets.add(new_lat[0], new_long[0], rng.choice(BANKS))
+        if step % 10 == 9:
+            _assert_same(markets, demand)
+
+
+def test_country_area_and_demand_outside():
+    # Mainland 5 x 2 + 2 x 2 degrees less the hole, plus the exclave, in (local) km
+    markets = MarketAreas([39.0, 41.0], [48.0, 46.0], ['A', 'B'], COUNTRY,
+                          [39.0, 39.5, 41.5], [48.0, 43.5, 48.5], [1.0, 2.0, 4.0])
+    table = markets.banks()
+    assert table['area_km2'].sum() == pytest.approx(markets.country_km2)
+    # The point in the notch (41.5, 48.5) is outside the country and ignored
+    assert table['demand'].sum() == pytest.approx(3.0)
+    assert table['area_share'].sum() == pytest.approx(100.0)
+
+
+def test_removing_every_branch_then_adding_one():
+    markets = MarketAreas([39.0, 41.0], [48.0, 46.0], ['A', 'B'], COUNTRY, [39.0], [48.0], [1.0])
+    markets.remove(0)
+    markets.remove(1)
+    assert markets.branches().empty
+    branch = markets.add(40.0, 46.5, 'C')
+    row = markets.branches().loc[branch]
+    assert row['area_km2'] == pytest.approx(markets.country_km2)
+    assert row['demand'] == pytest.approx(1.0)
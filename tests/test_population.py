@@ -0,0 +1,154 @@
+import json
+import pickle
+import struct
+
+import numpy as np
+import pytest
+
+from analysis.population import PopulationGrid, PopulationRaster, load_population
+
+
+WEST, NORTH, CELL = 45.0, 41.0, (0.01, 0.008)
+
+
+def _write_tiff(path, data, order='<', tile=None, rows_per_strip=None, nodata=None):
+    """Minimal uncompressed single-band GeoTIFF, in strips or tiles."""
+    height, width = data.shape
+    stored = data.astype(data.dtype.newbyteorder(order))
+    if tile:
+        tile_w, tile_h = tile
+        blocks = []
+        for row in range(0, height, tile_h):
+            for col in range(0, width, tile_w):
+                block = np.zeros((tile_h, tile_w), dtype=stored.dtype)
+                part = stored[row:row + tile_h, col:col + tile_w]
+                block[:part.shape[0], :part.shape[1]] = part
+                blocks.append(block.tobytes())
+    else:
+        rows_per_strip = rows_per_strip or height
+        blocks = [stored[row:row + rows_per_strip].tobytes() for row in range(0, height, rows_per_strip)]
+    offsets = list(8 + np.cumsum([0] + [len(b) for b in blocks[:-1]]))
+    lengths = [len(b) for b in blocks]
+
+    sample_format = {'u': 1, 'i': 2, 'f': 3}[data.dtype.kind]
+    tags = [(256, 4, [width]), (257, 4, [height]), (258, 3, [data.dtype.itemsize * 8]), (259, 3, [1]),
+            (277, 3, [1]), (339, 3, [sample_format]),
+            (33550, 12, [CELL[0], CELL[1], 0.0]), (33922, 12, [0.0, 0.0, 0.0, WEST, NORTH, 0.0])]
+    if tile:
+        tags += [(322, 4, [tile[0]]), (323, 4, [tile[1]]), (324, 4, offsets), (325, 4, lengths)]
+    else:
+        tags += [(273, 4, offsets), (278, 4, [rows_per_strip]), (279, 4, lengths)]
+    if nodata is not None:
+        tags.append((42113, 2, str(nodata)))
+    tags.sort()
+
+    ifd_at = 8 + sum(lengths)
+    extra_at = ifd_at + 2 + 12 * len(tags) + 4
+    entries, extra = b'', b''
+    for tag, kind, values in tags:
+        if kind == 2:
+            raw = values.encode('ascii') + b'\0'
+        else:
+            raw = struct.pack(order + {3: 'H', 4: 'I', 12: 'd'}[kind] * len(values), *values)
+        count = len(raw) if kind == 2 else len(values)
+        if len(raw) <= 4:
+            value = raw.ljust(4, b'\0')
+        else:
+            value = struct.pack(order + 'I', extra_at + len(extra))
+            extra += raw
+        entries += struct.pack(order + 'HHI', tag, kind, count) + value
+
+    with open(path, 'wb') as f:
+        f.write({'<': b'II', '>': b'MM'}[order] + struct.pack(order + 'HI', 42, ifd_at))
+        f.write(b''.join(blocks))
+        f.write(struct.pack(order + 'H', len(tags)) + entries + struct.pack(order + 'I', 0) + extra)
+
+
+def _raster(dtype='f4', seed=0):
+    rng = np.random.default_rng(seed)
+    data = (rng.random((37, 41)) * 100).astype(dtype)
+    data[rng.random(data.shape) < 0.3] = 0
+    return data
+
+
+def _expected(data, nodata=None):
+    expected = data.astype(np.float64)
+    if nodata is not None:
+        expected[data == nodata] = 0.0
+    return np.where(expected > 0, expected, 0.0)
+
+
+def _check(raster, data, nodata=None):
+    expected = _expected(data, nodata)
+    assert raster.shape == data.shape
+    assert (raster.west, raster.north, raster.cell_x, raster.cell_y) == pytest.approx((WEST, NORTH, *CELL))
+    np.testing.assert_array_equal(raster.window(0, data.shape[0]), expected)
+    np.testing.assert_array_equal(raster.window(5, 30, 7, 33), expected[5:30, 7:33])
+
+    lat, long, people = map(np.concatenate, zip(*raster.blocks(block_rows=6)))
+    row = np.round((NORTH - lat) / CELL[1] - 0.5).astype(int)
+    col = np.round((long - WEST) / CELL[0] - 0.5).astype(int)
+    np.testing.assert_array_equal(people, expected[row, col])
+    assert len(people) == np.count_nonzero(expected)
+
+
+@pytest.mark.parametrize('layout', [{}, {'rows_per_strip': 5}, {'tile': (16, 16)}, {'tile': (16, 8), 'order': '>'},
+                                    {'rows_per_strip': 4, 'order': '>'}])
+def test_tiff_layouts(tmp_path, layout):
+    data = _raster()
+    path = str(tmp_path / 'population.tif')
+    _write_tiff(path, data, **layout)
+    _check(PopulationRaster.from_tiff(path), data)
+
+
+@pytest.mark.parametrize('dtype', ['u1', 'i2', 'i4', 'f8'])
+def test_tiff_sample_types_and_nodata(tmp_path, dtype):
+    data = _raster(dtype)
+    nodata = 0 if dtype == 'u1' else -99
+    if dtype != 'u1':
+        data[::7, ::5] = nodata
+        data[3, 4] = -1
+    path = str(tmp_path / 'population.tif')
+    _write_tiff(path, data, tile=(16, 16), nodata=nodata)
+    _check(PopulationRaster.from_tiff(path), data, nodata)
+
+
+def test_compressed_tiff_is_rejected(tmp_path):
+    path = tmp_path / 'population.tif'
+    _write_tiff(str(path), _raster())
+    raw = bytearray(path.read_bytes())
+    # The compression tag's inline value: 1 (none) becomes 5 (LZW)
+    entry = raw.index(struct.pack('<HHI', 259, 3, 1))
+    raw[entry + 8] = 5
+    path.write_bytes(bytes(raw))
+    with pytest.raises(ValueError, match='compressed'):
+        PopulationRaster.from_tiff(str(path))
+
+
+def test_npy_matches_tiff(tmp_path):
+    data = _raster()
+    data[2, 3] = -9999
+    np.save(tmp_path / 'population.npy', data)
+    (tmp_path / 'population.json').write_text(json.dumps(
+        {'west': WEST, 'north': NORTH, 'cell_x': CELL[0], 'cell_y': CELL[1], 'nodata': -9999}))
+    raster = PopulationRaster.from_npy(str(tmp_path / 'population.npy'))
+    _check(raster, data, -9999)
+
+    # The GeoTIFF wins when both exist; either pickles as the file it maps
+    assert load_population(str(tmp_path / 'missing.tif'), str(tmp_path / 'population.npy')).path == raster.path
+    _write_tiff(str(tmp_path / 'population.tif'), data, nodata=-9999)
+    tiff = load_population(str(tmp_path / 'population.tif'), str(tmp_path / 'population.npy'))
+    for copy in (pickle.loads(pickle.dumps(raster)), pickle.loads(pickle.dumps(tiff))):
+        np.testing.assert_array_equal(copy.window(0, data.shape[0]), raster.window(0, data.shape[0]))
+    assert load_population(str(tmp_path / 'none.tif'), str(tmp_path / 'none.npy')) is None
+
+
+def test_grid_sums_the_raster(tmp_path):
+    data = _raster()
+    path = str(tmp_path / 'population.tif')
+    _write_tiff(path, data, rows_per_strip=3)
+    raster = PopulationRaster.from_tiff(path)
+    bounds = (NORTH - data.shape[0] * CELL[1], NORTH, WEST, WEST + data.shape[1] * CELL[0])
+    grid = PopulationGrid.from_raster(raster, bounds, cell_km=1.0)
+    assert grid.total == pytest.approx(_expected(data).sum())
+    assert grid.within([bounds[0] + 0.15], [bounds[2] + 0.2], 1000.0)[0] == pytest.approx(grid.total)
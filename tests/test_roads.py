@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra
+
+from analysis.geo import haversine_km
+from analysis.roads import RoadGraph, contract, read_osm
+
+
+def _network(seed=0):
+    """
+    A 5 x 5 grid of junctions joined by row and column ways with three
+    unshared nodes between neighbouring junctions, mixed speeds, two one-way
+    rows, and a short way cut off from the rest.
+    """
+    rng = np.random.default_rng(seed)
+    junction_lat = 40.0 + 0.01 * np.arange(5)
+    junction_long = 47.0 + 0.012 * np.arange(5)
+    lat, long = [], []
+
+    def point(y, x):
+        lat.append(y)
+        long.append(x)
+        return len(lat) - 1
+
+    junction = {(i, j): point(junction_lat[i], junction_long[j]) for i in range(5) for j in range(5)}
+    ways = []
+    for i in range(5):
+        row, column = [junction[i, 0]], [junction[0, i]]
+        for j in range(1, 5):
+            for t in (0.25, 0.5, 0.75):
+                row.append(point(junction_lat[i] + rng.normal(scale=1e-4),
+                                 junction_long[j - 1] + t * (junction_long[j] - junction_long[j - 1])))
+                column.append(point(junction_lat[j - 1] + t * (junction_lat[j] - junction_lat[j - 1]),
+                                    junction_long[i] + rng.normal(scale=1e-4)))
+            row.append(junction[i, j])
+            column.append(junction[j, i])
+        ways.append((row, {0: 1, 3: -1}.get(i, 0)))
+        ways.append((column, 0))
+    ways.append(([point(41.0, 48.0), point(41.0, 48.01)], 0))
+
+    lat, long = np.array(lat), np.array(long)
+    refs = np.concatenate([way for way, _ in ways])
+    offsets = np.concatenate([[0], np.cumsum([len(way) for way, _ in ways])])
+    speeds = rng.choice([30.0, 50.0, 90.0], size=len(ways))
+    oneways = np.array([direction for _, direction in ways], dtype=np.int8)
+    return lat, long, refs, offsets, speeds, oneways
+
+
+def _full_graph(lat, long, refs, offsets, speeds, oneways):
+    """Drive seconds between consecutive nodes of every way, nothing contracted."""
+    u, v, seconds = [], [], []
+    for w in range(len(offsets) - 1):
+        nodes = refs[offsets[w]:offsets[w + 1]]
+        piece = haversine_km(lat[nodes[:-1]], long[nodes[:-1]], lat[nodes[1:]], long[nodes[1:]]) / speeds[w] * 3600.0
+        if oneways[w] >= 0:
+            u.append(nodes[:-1]), v.append(nodes[1:]), seconds.append(piece)
+        if oneways[w] <= 0:
+            u.append(nodes[1:]), v.append(nodes[:-1]), seconds.append(piece)
+    graph = sparse.coo_matrix((np.concatenate(seconds), (np.concatenate(u), np.concatenate(v))),
+                              shape=(len(lat), len(lat)))
+    return graph.tocsr()
+
+
+def _kept_nodes(lat, long, c_lat, c_long):
+    position = {(y, x): i for i, (y, x) in enumerate(zip(lat, long))}
+    return np.array([position[y, x] for y, x in zip(c_lat, c_long)])
+
+
+@pytest.mark.parametrize('max_edge_km', [0.2, 1.0, 100.0])
+def test_contracted_times_match_uncontracted(max_edge_km):
+    lat, long, refs, offsets, speeds, oneways = _network()
+    c_lat, c_long, graph = contract(lat, long, refs, offsets, speeds, oneways, max_edge_km)
+    kept = _kept_nodes(lat, long, c_lat, c_long)
+
+    # The cut-off way is dropped; every junction survives
+    assert not np.isin(kept, refs[offsets[-2]:]).any()
+    assert np.isin(np.arange(25), kept).all()
+
+    full = dijkstra(_full_graph(lat, long, refs, offsets, speeds, oneways))
+    np.testing.assert_allclose(dijkstra(graph), full[np.ix_(kept, kept)], rtol=1e-9)
+
+
+def test_contraction_keeps_fewer_nodes_for_longer_edges():
+    network = _network()
+    sizes = [len(contract(*network, max_edge_km)[0]) for max_edge_km in (0.2, 1.0, 100.0)]
+    assert sizes[0] > sizes[1] > sizes[2] == 25
+
+
+def _road_graph():
+    lat, long, refs, offsets, speeds, oneways = _network()
+    return RoadGraph(*contract(lat, long, refs, offsets, speeds, oneways))
+
+
+def _points(n, seed):
+    rng = np.random.default_rng(seed)
+    return 40.0 + 0.04 * rng.random(n), 47.0 + 0.048 * rng.random(n)
+
+
+def test_multi_source_matches_per_site_dijkstra():
+    roads = _road_graph()
+    site_lat, site_long = _points(5, seed=1)
+    lat, long = _points(200, seed=2)
+
+    seconds, site = roads.time_to_nearest(site_lat, site_long, lat, long)
+    per_site = np.column_stack([roads.time_to_nearest(site_lat[[s]], site_long[[s]], lat, long)[0]
+                                for s in range(len(site_lat))])
+    np.testing.assert_allclose(seconds, per_site.min(axis=1), rtol=1e-9)
+    np.testing.assert_array_equal(site, per_site.argmin(axis=1))
+
+
+def test_time_limit_drops_farther_points():
+    roads = _road_graph()
+    site_lat, site_long = _points(3, seed=3)
+    lat, long = _points(200, seed=4)
+
+    seconds, site = roads.time_to_nearest(site_lat, site_long, lat, long)
+    limit = float(np.median(seconds))
+    limited, limited_site = roads.time_to_nearest(site_lat, site_long, lat, long, limit_seconds=limit)
+    within = seconds <= limit
+    np.testing.assert_allclose(limited[within], seconds[within])
+    np.testing.assert_array_equal(limited_site[within], site[within])
+    assert np.isinf(limited[~within]).all() and (limited_site[~within] == -1).all()
+
+
+def test_read_osm_keeps_routable_ways(tmp_path):
+    path = tmp_path / 'roads.osm'
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6">\n'
+        '<node id="3" lat="40.008" lon="47.0"/>\n<node id="1" lat="40.0" lon="47.0"/>\n'
+        '<node id="2" lat="40.004" lon="47.0"/>\n'
+        '<way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/>'
+        '<tag k="highway" v="primary"/><tag k="maxspeed" v="40 mph"/></way>\n'
+        '<way id="11"><nd ref="3"/><nd ref="1"/><tag k="highway" v="motorway"/></way>\n'
+        '<way id="12"><nd ref="1"/><nd ref="3"/><tag k="highway" v="footway"/></way>\n'
+        '<way id="13"><nd ref="2"/><nd ref="3"/><tag k="building" v="yes"/></way>\n'
+        '</osm>\n', encoding='utf-8')
+
+    node_ids, lat, long, refs, offsets, speeds, oneways = read_osm(str(path))
+    np.testing.assert_array_equal(node_ids, [1, 2, 3])
+    np.testing.assert_allclose(lat, [40.0, 40.004, 40.008])
+    np.testing.assert_array_equal(refs, [1, 2, 3, 3, 1])
+    np.testing.assert_array_equal(offsets, [0, 3, 5])
+    np.testing.assert_allclose(speeds, [40 * 1.609344, 100.0])
+    np.testing.assert_array_equal(oneways, [0, 1])
+
+    # Node 2 is inside one way and under MAX_EDGE_KM from its ends, so it is contracted away
+    roads = RoadGraph.from_osm(str(path))
+    assert len(roads) == 2
@@ -0,0 +1,72 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from analysis.geo import haversine_km
+from analysis.siting import select_sites
+
+
+def _instance(seed):
+    """Twelve candidates, 150 weighted demand points and two existing sites in a ~30 km square."""
+    rng = np.random.default_rng(seed)
+
+    def points(n):
+        return 40.3 + 0.27 * rng.random(n), 49.6 + 0.35 * rng.random(n)
+
+    cand_lat, cand_long = points(12)
+    dem_lat, dem_long = points(150)
+    existing_lat, existing_long = points(2)
+    return cand_lat, cand_long, dem_lat, dem_long, rng.random(150) + 0.1, existing_lat, existing_long
+
+
+def _objective(instance, opened, objective, radius_km):
+    cand_lat, cand_long, dem_lat, dem_long, weights, existing_lat, existing_long = instance
+    site_lat = np.concatenate([existing_lat, cand_lat[list(opened)]])
+    site_long = np.concatenate([existing_long, cand_long[list(opened)]])
+    nearest = haversine_km(dem_lat[:, None], dem_long[:, None], site_lat[None, :], site_long[None, :]).min(axis=1)
+    if objective == 'coverage':
+        return float(weights[nearest < radius_km].sum())
+    return float((weights * np.minimum(nearest, radius_km)).sum())
+
+
+def _brute_force(instance, n_sites, objective, radius_km):
+    values = [_objective(instance, opened, objective, radius_km)
+              for opened in combinations(range(len(instance[0])), n_sites)]
+    return max(values) if objective == 'coverage' else min(values)
+
+
+def _plain_greedy(instance, n_sites, objective, radius_km):
+    opened = []
+    for _ in range(n_sites):
+        rest = [c for c in range(len(instance[0])) if c not in opened]
+        values = [_objective(instance, opened + [c], objective, radius_km) for c in rest]
+        opened.append(rest[int(np.argmax(values) if objective == 'coverage' else np.argmin(values))])
+    return opened
+
+
+@pytest.mark.parametrize('objective,radius_km', [('coverage', 5.0), ('median', 8.0), ('median', 100.0)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_milp_matches_brute_force(objective, radius_km, seed):
+    instance = _instance(seed)
+    result = select_sites(*instance, n_sites=3, objective=objective, radius_km=radius_km, method='milp')
+    optimum = _brute_force(instance, 3, objective, radius_km)
+
+    assert result['value'] == pytest.approx(optimum, rel=1e-6)
+    assert result['value'] == pytest.approx(_objective(instance, result['sites']['candidate'], objective, radius_km))
+    assert result['baseline'] == pytest.approx(_objective(instance, [], objective, radius_km))
+
+
+@pytest.mark.parametrize('objective,radius_km', [('coverage', 5.0), ('median', 8.0), ('median', 100.0)])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_lazy_greedy_matches_plain_greedy(objective, radius_km, seed):
+    instance = _instance(seed)
+    result = select_sites(*instance, n_sites=3, objective=objective, radius_km=radius_km)
+
+    assert list(result['sites']['candidate']) == _plain_greedy(instance, 3, objective, radius_km)
+    assert result['value'] == pytest.approx(_objective(instance, result['sites']['candidate'], objective, radius_km))
+    # Marginal gains add up to the improvement, and are within 1 - 1/e of the best one
+    improvement = abs(result['value'] - result['baseline'])
+    assert result['sites']['gain'].sum() == pytest.approx(improvement)
+    best = abs(_brute_force(instance, 3, objective, radius_km) - result['baseline'])
+    assert improvement >= (1 - 1 / np.e) * best - 1e-9
@@ -0,0 +1,90 @@
+import numpy as np
+
+from combine import BranchCombiner
+from validation import CoordinateValidator
+
+
+def _branch(bank, lat, long, address):
+    return {'bank_name': bank, 'lat': lat, 'long': long, 'address': address}
+
+
+def _placeholders(branches):
+    validator = CoordinateValidator()
+    validator.validate(branches)
+    return validator.flags['placeholder'].tolist()
+
+
+def test_shared_coordinates_at_one_address_are_not_placeholders():
+    hq = (40.3755885, 49.8328009)
+    branches = [
+        # Two banks' head offices in one building, written differently
+        _branch('AFB', *hq, 'Bakı ş., İ. Qutqaşınlı küç. 85'),
+        _branch('Turan Bank', *hq, 'Bakı ş., İ.Qutqaşınlı küç., 85'),
+        _branch('Turan Bank', *hq, 'bakı ş. i̇.qutqaşınlı küç 85'),
+        # One bank listing the same branch three times
+        *[_branch('Unibank', 40.4087, 49.8631, address) for address in
+          ('Bakı ş., Ə.Rəcəbli küç., 1/15', 'Ə. Rəcəbli küç., 1/15', 'Rəcəbli 1/15, Bakı')],
+    ]
+    assert not any(_placeholders(branches))
+
+
+def test_shared_coordinates_across_banks_and_addresses_are_placeholders():
+    centre = (40.6798083, 46.3597178)
+    branches = [
+        _branch('AFB', *centre, 'Gəncə ş., Atatürk pros. 242'),
+        _branch('Turan Bank', *centre, 'Gəncə ş., Cavadxan küç., 24'),
+        _branch('Ziraat Bank', *centre, 'Gəncə şəh, Heydər Əliyev pr.437'),
+        _branch('BTB', 40.6828, 46.3606, 'Gəncə ş., Nizami küç. 1'),
+        _branch('BTB', 0.0, 0.0, 'Gəncə ş.'),
+    ]
+    assert _placeholders(branches) == [True, True, True, False, True]
+
+
+def test_distinct_per_group():
+    groups = np.array([0, 0, 0, 1, 1, 2])
+    values = np.array([5, 5, 7, 1, 1, 0])
+    np.testing.assert_array_equal(CoordinateValidator.distinct_per_group(groups, values), [2, 1, 1])
+
+
+def _combiner(tmp_path, monkeypatch, rows):
+    """A combiner over one CSV per bank in tmp_path, with every output redirected or recorded."""
+    combiner = BranchCombiner()
+    files = {}
+    for bank, bank_rows in rows.items():
+        name = bank.lower().replace(' ', '_') + '.csv'
+        with open(tmp_path / name, 'w', encoding='utf-8') as f:
+            f.write('latitude,longitude,address\n' + ''.join(f'{lat},{lon},"{address}"\n'
+                                                            for lat, lon, address in bank_rows))
+        files[name] = bank
+    monkeypatch.setattr(combiner, 'BANK_FILES', files)
+    monkeypatch.setattr(combiner, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(combiner, 'OUTPUT_FILE', str(tmp_path / 'combined.csv'))
+    monkeypatch.setattr(combiner.colocation, 'REPORT_FILE', str(tmp_path / 'colocation.csv'))
+    monkeypatch.setattr(combiner.validator, 'REPORT_FILE', str(tmp_path / 'quality.csv'))
+    monkeypatch.setattr(combiner.validator, 'FLAGS_FILE', str(tmp_path / 'flags.csv'))
+    written = []
+    monkeypatch.setattr(combiner, 'save_combined', lambda: written.append('csv'))
+    monkeypatch.setattr(combiner.dashboard_exporter, 'export', lambda branches: written.append('dashboard'))
+    monkeypatch.setattr(combiner.tile_exporter, 'export', lambda branches: written.append('tiles'))
+    return combiner, written
+
+
+GOOD = [(40.4093 + 0.01 * i, 49.8671 + 0.01 * i, f'Bakı ş., Nizami küç. {i}') for i in range(4)]
+
+
+def test_gate_passes_and_writes_outputs(tmp_path, monkeypatch):
+    combiner, written = _combiner(tmp_path, monkeypatch, {'Bank A': GOOD, 'Bank B': GOOD[:2]})
+    assert combiner.run()
+    assert written == ['csv', 'dashboard', 'tiles']
+    assert all(e['quality_score'] == 100.0 for e in combiner.validator.bank_scores)
+
+
+def test_gate_fails_when_a_bank_scores_below_the_minimum(tmp_path, monkeypatch):
+    # Three of Bank B's four rows are outside the country or whole-degree fill values
+    bad = GOOD[:1] + [(48.8566, 2.3522, 'Paris'), (40.0, 49.0, 'Bakı'), (41.0, 48.0, 'Quba')]
+    combiner, written = _combiner(tmp_path, monkeypatch, {'Bank A': GOOD, 'Bank B': bad})
+    assert not combiner.run()
+    assert written == []
+    scores = {e['bank_name']: e['quality_score'] for e in combiner.validator.bank_scores}
+    assert scores['Bank A'] == 100.0 and scores['Bank B'] < combiner.validator.min_bank_score
+    assert (tmp_path / 'quality.csv').exists() and not (tmp_path / 'combined.csv').exists()